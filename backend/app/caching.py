@@ -0,0 +1,181 @@
+"""
+Caching helpers shared by the route/weather/plan caches.
+
+- CacheStats: thread-safe hit/miss/coalesced counters
+- SingleFlight: coalesces concurrent loads of the same key into one call
+- ByteBoundedLocMemCache: Django LocMemCache backend that also bounds the
+  total pickled size in bytes, evicting least-recently-used entries first
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class CacheStats:
+    """
+    Thread-safe counters for a cache wrapper.
+
+    `coalesced` counts lookups that missed but joined an in-flight load
+    instead of calling upstream; they count toward the hit ratio.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def coalesce(self) -> None:
+        with self._lock:
+            self.coalesced += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self.hits + self.coalesced
+            lookups = served + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """
+    Run at most one load per key at a time; concurrent callers share it.
+
+    `do` / `ado` return (result, shared): shared is False for the caller
+    whose load ran and True for callers that joined it. Exceptions reach
+    every caller of that flight. Async flights run as their own task, so a
+    cancelled caller never cancels the load other callers are waiting on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args) -> Tuple[Any, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            shared = call is not None
+            if not shared:
+                call = self._calls[key] = Future()
+        if shared:
+            return call.result(), True
+
+        try:
+            result = func(*args)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(
+        self, key: Hashable, func: Callable[..., Awaitable[Any]], *args
+    ) -> Tuple[Any, bool]:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        task = self._tasks.get(flight_key)
+        shared = task is not None
+        if not shared:
+            task = self._tasks[flight_key] = loop.create_task(func(*args))
+            task.add_done_callback(lambda t: self._finish(flight_key, t))
+        return await asyncio.shield(task), shared
+
+    def _finish(self, flight_key, task: asyncio.Task) -> None:
+        self._tasks.pop(flight_key, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every caller gave up
+
+
+# Per-name byte accounting, shared like LocMemCache's own module-level stores
+_sizes: Dict[str, Dict[str, int]] = {}
+_usage: Dict[str, Dict[str, int]] = {}
+
+
+class ByteBoundedLocMemCache(LocMemCache):
+    """
+    LocMemCache with a byte budget on top of MAX_ENTRIES.
+
+    OPTIONS:
+        MAX_BYTES: Total pickled bytes kept (default 64 MiB). Entries larger
+            than the budget are not stored.
+    """
+
+    def __init__(self, name, params):
+        options = dict(params.get("OPTIONS") or {})
+        self._max_bytes = int(options.pop("MAX_BYTES", 64 * 1024 * 1024))
+        super().__init__(name, {**params, "OPTIONS": options})
+        self._sizes = _sizes.setdefault(name, {})
+        self._usage = _usage.setdefault(name, {"bytes": 0, "evictions": 0})
+
+    # In-memory operations never block on I/O, so skip the sync_to_async
+    # thread hop BaseCache uses for its async API.
+    async def aget(self, key, default=None, version=None):
+        return self.get(key, default, version)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.set(key, value, timeout, version)
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        size = len(value)
+        self._delete(key)
+        if size > self._max_bytes:
+            return
+        super()._set(key, value, timeout)
+        self._sizes[key] = size
+        self._usage["bytes"] += size
+        # Front of the OrderedDict is most recently used; evict from the back
+        while self._usage["bytes"] > self._max_bytes and len(self._cache) > 1:
+            lru_key = next(reversed(self._cache))
+            self._delete(lru_key)
+            self._usage["evictions"] += 1
+
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        for key in [k for k in self._sizes if k not in self._cache]:
+            self._usage["bytes"] -= self._sizes.pop(key)
+        self._usage["evictions"] += before - len(self._cache)
+
+    def _delete(self, key):
+        deleted = super()._delete(key)
+        if deleted:
+            self._usage["bytes"] -= self._sizes.pop(key, 0)
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._sizes.clear()
+            self._usage["bytes"] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "bytes": self._usage["bytes"],
+                "max_bytes": self._max_bytes,
+                "evictions": self._usage["evictions"],
+            }
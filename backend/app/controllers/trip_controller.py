@@ -2,19 +2,73 @@
 Trip Controller — Orchestrate trip planning workflow
 
 Coordinates:
-1. ComputeRouteHandler — Fetch route from OSRM
-2. HosRulesHandler — Apply HOS rules (breaks, resets, cycle)
+1. ComputeRouteHandler — Fetch route (OSRM or the local graph engine)
+2. HosRulesHandler — Apply HOS rules (breaks, resets, cycle); or
+   SleeperSplitPlanner when sleeper-berth splits are requested
 3. EldLogGenerator — Generate daily logs
 
+`plan_replan` resumes a trip from a mid-trip checkpoint plus the driver's
+actual ELD events, routing and re-simulating only what is left.
+
+`plan_trip_cached` serves identical requests from PlanCache (one computation
+per canonical request, shared by concurrent callers).
+
+Plans from `plan_trip` (and its async/stream variants) and `plan_replan` are
+kept in PlanStore under a `plan_id`; `plan_positions` answers "where should
+the truck be at time T?" from the stored plan without re-planning.
+
 This controller is the single source of truth for trip planning logic.
 """
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    wait,
+)
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional
+
+import django
+from django.conf import settings
+
 from ..handlers import (
     ComputeRouteHandler,
     HosRulesHandler,
+    SleeperSplitPlanner,
+    HosGridSimulator,
+    DepartureOptimizer,
     EldLogGenerator,
     WeatherHandler,
+    RouteCache,
+    PlanStore,
+    PlanCache,
+    get_facility_index,
+    get_routing_provider,
+    get_rule_set,
+)
+from ..handlers.facilities import METERS_PER_MILE, STOP_KINDS
+from ..handlers.segments import (
+    Segment,
+    serialize_daily_log,
+    serialize_daily_logs,
+    serialize_segments,
+)
+from ..handlers.geometry import (
+    RouteIndex,
+    resolve_tolerance,
+    simplify_route,
+)
+
+# Stops of a plan_trip skeleton, after the drive from start
+_TRIP_STOPS = (
+    {"type": "pickup", "duration_hours": 1.0},
+    {"type": "dropoff", "duration_hours": 1.0},
 )
 
 
@@ -29,7 +83,20 @@ def plan_trip(data: dict) -> dict:
             "dropoff": {"lat": float, "lng": float},
             "start_datetime": "ISO8601 (optional, default 08:00 local)",
             "current_cycle_used_hours": float,
-            "routing_provider": "osrm" (optional)
+            "cycle_history_hours": [float, ...] (optional, on-duty hours for
+                up to 7 prior days, oldest first; enables the rolling 8-day
+                window and replaces current_cycle_used_hours),
+            "routing_provider": "osrm" | "local" (optional),
+            "rule_set": str (optional, default "property_70_8"),
+            "fuel_interval_miles": float (optional, rule set default 1000),
+            "sleeper_berth_split": bool (optional, default False; use 7/3
+                and 8/2 sleeper-berth splits where they arrive earlier),
+            "include_leg_geometry": bool (optional, default True),
+            "simplify_tolerance_m": float (optional),
+            "simplify_zoom": float (optional, map zoom → 1-pixel tolerance),
+            "route_weather_samples": int (optional, forecasts at N route
+                points plus every stop, matched to ETA),
+            "debug": bool (optional, adds per-stage "timings" in ms)
         }
 
     Returns:
@@ -38,33 +105,82 @@ def plan_trip(data: dict) -> dict:
             "stops": [...],
             "segments": [...],
             "daily_logs": [...],
+            "plan_id": str (omitted when the plan store is disabled),
             "warnings": [...]
         }
     """
+    plan_started = time.perf_counter()
+    timings = {}
     warnings = []
 
     # Parse inputs
     start = data.get("start", {})
     pickup = data.get("pickup", {})
     dropoff = data.get("dropoff", {})
-    start_datetime_str = data.get("start_datetime", None)
-    current_cycle_used_hours = data.get("current_cycle_used_hours", 0)
+    include_leg_geometry = data.get("include_leg_geometry", True)
+    start_datetime = _parse_start_datetime(data.get("start_datetime", None))
 
-    # Default start time to 08:00 if not provided
-    if start_datetime_str:
-        start_datetime = datetime.fromisoformat(
-            start_datetime_str.replace("Z", "+00:00")
-        )
-        if start_datetime.tzinfo is None:
-            start_datetime = start_datetime.replace(tzinfo=timezone.utc)
-    else:
-        start_datetime = datetime.now(timezone.utc).replace(
-            hour=8, minute=0, second=0, microsecond=0
+    # Step 1: Fetch route and weather concurrently under one deadline.
+    # Weather is optional enrichment and degrades to None when slow.
+    try:
+        route_data, start_weather, dropoff_weather = _fetch_upstream(
+            start,
+            pickup,
+            dropoff,
+            include_leg_geometry,
+            data.get("routing_provider"),
+            timings,
         )
+    except Exception as e:
+        warnings.append(f"Routing failed: {str(e)}")
+        return {
+            "route": None,
+            "stops": [],
+            "segments": [],
+            "daily_logs": [],
+            "warnings": warnings,
+        }
+
+    return _build_plan(
+        data,
+        route_data,
+        start_weather,
+        dropoff_weather,
+        start_datetime,
+        timings,
+        warnings,
+        plan_started,
+        store_plan=True,
+    )
+
+
+async def plan_trip_async(data: dict) -> dict:
+    """
+    Async variant of `plan_trip` with the same input and output.
+
+    Upstream calls run on the event loop through the async clients, so
+    waiting on OSRM/Open-Meteo holds no thread. The CPU-bound HOS, log and
+    stop stages run in a worker thread to keep the loop responsive.
+    """
+    plan_started = time.perf_counter()
+    timings = {}
+    warnings = []
+
+    start = data.get("start", {})
+    pickup = data.get("pickup", {})
+    dropoff = data.get("dropoff", {})
+    include_leg_geometry = data.get("include_leg_geometry", True)
+    start_datetime = _parse_start_datetime(data.get("start_datetime", None))
 
-    # Step 1: Fetch route from OSRM
     try:
-        route_data = ComputeRouteHandler.execute(start, pickup, dropoff)
+        route_data, start_weather, dropoff_weather = await _afetch_upstream(
+            start,
+            pickup,
+            dropoff,
+            include_leg_geometry,
+            data.get("routing_provider"),
+            timings,
+        )
     except Exception as e:
         warnings.append(f"Routing failed: {str(e)}")
         return {
@@ -75,136 +191,1121 @@ def plan_trip(data: dict) -> dict:
             "warnings": warnings,
         }
 
-    # Optional: Enrich with simple current weather for start & dropoff
-    start_weather = WeatherHandler.get_current_weather(
-        start.get("lat"), start.get("lng")
-    )
-    dropoff_weather = WeatherHandler.get_current_weather(
-        dropoff.get("lat"), dropoff.get("lng")
+    return await asyncio.to_thread(
+        _build_plan,
+        data,
+        route_data,
+        start_weather,
+        dropoff_weather,
+        start_datetime,
+        timings,
+        warnings,
+        plan_started,
+        True,
     )
 
-    # Step 2: Build skeleton timeline
-    # start → pickup (drive), pickup (1h ON), pickup → dropoff (drive), dropoff (1h ON)
-    skeleton_segments = []
 
-    if len(route_data["legs"]) >= 1:
-        leg1 = route_data["legs"][0]
-        skeleton_segments.append(
-            {
-                "status": "D",
-                "duration_hours": leg1["duration_hours"],
-                "miles": leg1["distance_miles"],
-                "note": "Start → Pickup",
-            }
+def plan_trip_cached(data: dict) -> dict:
+    """
+    `plan_trip` through PlanCache: identical requests share one computation.
+
+    Debug requests (their timings are per run) and a disabled cache go
+    straight to `plan_trip`.
+
+    Returns:
+        {"tag": str | None, "result": plan_trip output}; tag is new for every
+        computation (None when not cached), for ETags
+    """
+    if data.get("debug") or not PlanCache.enabled():
+        return {"tag": None, "result": plan_trip(data)}
+    data = PlanCache.canonical(_with_start_datetime(data))
+    key = PlanCache.key_for(data)
+    entry = PlanCache.get(key)
+    return entry if entry is not None else PlanCache.fill(key, plan_trip, data)
+
+
+async def plan_trip_cached_async(data: dict) -> dict:
+    """Async variant of `plan_trip_cached`, computing with `plan_trip_async`."""
+    if data.get("debug") or not PlanCache.enabled():
+        return {"tag": None, "result": await plan_trip_async(data)}
+    data = PlanCache.canonical(_with_start_datetime(data))
+    key = PlanCache.key_for(data)
+    entry = await PlanCache.aget(key)
+    if entry is not None:
+        return entry
+    return await PlanCache.afill(key, plan_trip_async, data)
+
+
+def plan_trip_stream(data: dict) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of `plan_trip`: yield the plan as separate records.
+
+    Same input as `plan_trip`. Daily logs are generated and serialized one
+    day at a time as the caller consumes them, so the first day can be sent
+    before later days exist and no full daily_logs list is held.
+
+    Yields, in order:
+        {"type": "route", "route": {...} | None}
+        {"type": "segments", "segments": [...]}
+        {"type": "stops", "stops": [...]}
+        {"type": "weather", "weather": {...}}
+        {"type": "daily_log", "daily_log": {...}}  (one per day)
+        {"type": "end", "warnings": [...], "plan_id": str (when stored),
+            "timings": {...} (debug only)}
+    """
+    plan_started = time.perf_counter()
+    timings = {}
+    warnings = []
+
+    try:
+        route_data, start_weather, dropoff_weather = _fetch_upstream(
+            data.get("start", {}),
+            data.get("pickup", {}),
+            data.get("dropoff", {}),
+            data.get("include_leg_geometry", True),
+            data.get("routing_provider"),
+            timings,
         )
+    except Exception as e:
+        warnings.append(f"Routing failed: {str(e)}")
+        yield {"type": "route", "route": None}
+        yield {"type": "end", "warnings": warnings}
+        return
+
+    coords = route_data["geometry"]["coordinates"]
+    route_data, segments, stops, along_route = _plan_stages(
+        data,
+        route_data,
+        _parse_start_datetime(data.get("start_datetime", None)),
+        timings,
+        warnings,
+    )
+    plan_id = _timed(timings, "plan_store", PlanStore.save, segments, coords)
+    yield {"type": "route", "route": route_data}
+    yield {"type": "segments", "segments": serialize_segments(segments)}
+    yield {"type": "stops", "stops": stops}
+    yield {
+        "type": "weather",
+        "weather": _weather_summary(start_weather, dropoff_weather, along_route),
+    }
+
+    # Step 7 runs lazily; its timing covers generation, not time spent sending
+    days = EldLogGenerator.iter_days(segments)
+    elapsed = 0.0
+    while True:
+        started = time.perf_counter()
+        daily_log = next(days, None)
+        elapsed += time.perf_counter() - started
+        if daily_log is None:
+            break
+        yield {"type": "daily_log", "daily_log": serialize_daily_log(daily_log)}
+    timings["daily_logs"] = round(elapsed * 1000.0, 2)
+
+    end = {"type": "end", "warnings": warnings}
+    if plan_id is not None:
+        end["plan_id"] = plan_id
+    if data.get("debug"):
+        timings["total"] = round((time.perf_counter() - plan_started) * 1000.0, 2)
+        end["timings"] = timings
+    yield end
 
-    skeleton_segments.append(
+
+def plan_departure(data: dict) -> dict:
+    """
+    Find the best departure in a window, then plan the trip for it.
+
+    Route and weather are fetched once; DepartureOptimizer searches the
+    window on that route's skeleton and the plan reuses the same route.
+
+    Args:
+        data: plan_trip payload plus {
+            "earliest_departure": "ISO8601",
+            "latest_departure": "ISO8601",
+            "objective": "arrival" | "elapsed" (optional, default "arrival")
+        }
+        `cycle_history_hours` ends the day before `earliest_departure`.
+
+    Returns:
         {
-            "status": "ON",
-            "duration_hours": 1.0,
-            "miles": 0,
-            "note": "Pickup (1 hour)",
+            "departure": {
+                "objective", "departure", "arrival", "elapsed_hours",
+                "pieces": [{"from", "to", "elapsed_hours"}, ...], "evaluated"
+            } | None,
+            "plan": {...plan_trip result for the chosen departure...}
         }
+    """
+    plan_started = time.perf_counter()
+    timings = {}
+    warnings = []
+    earliest = _parse_start_datetime(data["earliest_departure"])
+    latest = _parse_start_datetime(data["latest_departure"])
+    objective = data.get("objective", "arrival")
+
+    try:
+        route_data, start_weather, dropoff_weather = _fetch_upstream(
+            data.get("start", {}),
+            data.get("pickup", {}),
+            data.get("dropoff", {}),
+            data.get("include_leg_geometry", True),
+            data.get("routing_provider"),
+            timings,
+        )
+    except Exception as e:
+        warnings.append(f"Routing failed: {str(e)}")
+        return {
+            "departure": None,
+            "plan": {
+                "route": None,
+                "stops": [],
+                "segments": [],
+                "daily_logs": [],
+                "warnings": warnings,
+            },
+        }
+
+    best = _timed(
+        timings,
+        "departure",
+        DepartureOptimizer.execute,
+        _build_skeleton(route_data),
+        data.get("current_cycle_used_hours", 0),
+        earliest,
+        latest,
+        objective,
+        _rule_set(data),
+        data.get("cycle_history_hours"),
+    )
+    if best["cycle_history_hours"] is not None:
+        # Plan with the history the optimizer simulated this departure with
+        data = dict(data, cycle_history_hours=best["cycle_history_hours"])
+    plan = _build_plan(
+        data,
+        route_data,
+        start_weather,
+        dropoff_weather,
+        best["departure"],
+        timings,
+        warnings,
+        plan_started,
     )
+    return {
+        "departure": {
+            "objective": objective,
+            "departure": best["departure"].isoformat(),
+            "arrival": best["arrival"].isoformat(),
+            "elapsed_hours": round(best["elapsed_hours"], 4),
+            "pieces": [
+                {
+                    "from": piece["from"].isoformat(),
+                    "to": piece["to"].isoformat(),
+                    "elapsed_hours": round(piece["elapsed_hours"], 4),
+                }
+                for piece in best["pieces"]
+            ],
+            "evaluated": best["evaluated"],
+        },
+        "plan": plan,
+    }
 
-    if len(route_data["legs"]) >= 2:
-        leg2 = route_data["legs"][1]
-        skeleton_segments.append(
-            {
-                "status": "D",
-                "duration_hours": leg2["duration_hours"],
-                "miles": leg2["distance_miles"],
-                "note": "Pickup → Dropoff",
-            }
+
+def plan_what_if(data: dict) -> dict:
+    """
+    Evaluate one route over a grid of departure times × cycle hours.
+
+    The route is fetched once; HosGridSimulator then runs the HOS rules for
+    every cycle-hours column in one vectorized pass instead of one plan_trip
+    per variant.
+
+    The grid uses a static cycle (no rolling history), where no rule reads
+    the clock: a column's elapsed hours and stop counts are the same for
+    every departure, and arrivals differ only by the departure itself. Only the
+    cycle-hours axis changes outcomes; `departure_dependent` (always False)
+    says so in the response. Departure-dependent results need the rolling
+    cycle of plan_departure (cycle_history_hours).
+
+    Args:
+        data: {
+            "start", "pickup", "dropoff", "routing_provider", "rule_set",
+            "fuel_interval_miles": as plan_trip,
+            "start_datetimes": ["ISO8601", ...] (grid rows),
+            "current_cycle_used_hours": [float, ...] (grid columns)
+        }
+
+    Returns:
+        {
+            "route": {"total_distance_miles", "total_duration_hours"} | None,
+            "start_datetimes": [...],
+            "current_cycle_used_hours": [...],
+            "arrivals": [["ISO8601", ...], ...],  # [row][column]
+            "elapsed_hours": [[float, ...], ...],
+            "breaks": [[int, ...], ...],
+            "resets": [[int, ...], ...],
+            "restarts": [[int, ...], ...],
+            "fuel_stops": [[int, ...], ...],
+            "departure_dependent": False,
+            "warnings": [...]
+        }
+    """
+    warnings = []
+    start_datetimes = [
+        _parse_start_datetime(value) for value in data["start_datetimes"]
+    ]
+    cycle_used_hours = list(data["current_cycle_used_hours"])
+    result = {
+        "route": None,
+        "start_datetimes": [start.isoformat() for start in start_datetimes],
+        "current_cycle_used_hours": cycle_used_hours,
+        "departure_dependent": False,
+        "warnings": warnings,
+    }
+
+    try:
+        route_data = ComputeRouteHandler.execute(
+            data.get("start", {}),
+            data.get("pickup", {}),
+            data.get("dropoff", {}),
+            include_leg_geometry=False,
+            routing_provider=data.get("routing_provider"),
         )
+    except Exception as e:
+        warnings.append(f"Routing failed: {str(e)}")
+        return result
 
-    skeleton_segments.append(
+    grid = HosGridSimulator.execute(
+        _build_skeleton(route_data),
+        start_datetimes,
+        cycle_used_hours,
+        _rule_set(data),
+    )
+    result["route"] = {
+        "total_distance_miles": route_data["total_distance_miles"],
+        "total_duration_hours": route_data["total_duration_hours"],
+    }
+    result["arrivals"] = [
+        [arrival.isoformat() for arrival in row] for row in grid["arrivals"]
+    ]
+    result["elapsed_hours"] = grid["elapsed_hours"].round(2).tolist()
+    for key in ("breaks", "resets", "restarts", "fuel_stops"):
+        result[key] = grid[key].tolist()
+    return result
+
+
+def plan_replan(data: dict) -> dict:
+    """
+    Re-plan the rest of a trip from a mid-trip checkpoint.
+
+    The driver's actual duty-status events since the checkpoint are replayed
+    first (HosRulesHandler.record), so the re-plan starts from the real
+    shift, break, fuel and cycle counters. Only current_position → remaining
+    stops is routed, and only the days from the first event (or the
+    checkpoint) onward get new daily logs; earlier days are unchanged.
+    Events before the checkpoint are already counted in it: they are not
+    replayed and only fill in the first day's log.
+
+    Args:
+        data: {
+            "checkpoint": {...} (optional; "checkpoint" from an earlier
+                replan, or HosRulesHandler output),
+            "current_cycle_used_hours", "cycle_history_hours": as
+                plan_trip, used only without a checkpoint,
+            "events": [{"status", "start_datetime": "ISO8601",
+                "end_datetime": "ISO8601", "miles", "note"}, ...] (actual
+                events in time order; those before the checkpoint must
+                end by it),
+            "current_position": {"lat": float, "lng": float},
+            "remaining_stops": [{"lat", "lng", "type": "pickup" | "dropoff"
+                | "stop", "duration_hours": float}, ...],
+            "routing_provider", "rule_set", "fuel_interval_miles",
+            "sleeper_berth_split", "include_leg_geometry", "debug": as
+                plan_trip
+        }
+
+    Returns:
         {
-            "status": "ON",
-            "duration_hours": 1.0,
-            "miles": 0,
-            "note": "Dropoff (1 hour)",
+            "route": {...} (remaining distance only) | None,
+            "stops": [...],
+            "segments": [...] replayed events, then the re-planned rest,
+            "daily_logs": [...] affected days only, each with "partial":
+                true when a checkpoint's first day does not start at
+                midnight because earlier events were not sent,
+            "checkpoint": {...} counters after the replayed events (send
+                it with later events for the next re-plan),
+            "plan_id": str (the re-planned rest; omitted when the plan
+                store is disabled or routing failed),
+            "warnings": [...]
         }
+    """
+    plan_started = time.perf_counter()
+    timings = {}
+    warnings = []
+    rule_set = _rule_set(data)
+    events = [
+        {
+            "status": event["status"],
+            "start": _parse_iso(event["start_datetime"]),
+            "end": _parse_iso(event["end_datetime"]),
+            "miles": event.get("miles", 0.0),
+            "note": event.get("note", ""),
+        }
+        for event in data.get("events", [])
+    ]
+    checkpoint = data.get("checkpoint")
+    checkpoint_at = None
+    logged = []
+    if checkpoint is not None:
+        checkpoint_at = _parse_iso(checkpoint["at"])
+        while events and events[0]["start"] < checkpoint_at:
+            logged.append(events.pop(0))
+
+    # Step 1: Replay actual events from the checkpoint (or a fresh clock)
+    recorded = _timed(
+        timings,
+        "record",
+        HosRulesHandler.record,
+        events,
+        data.get("current_cycle_used_hours", 0),
+        events[0]["start"] if events else None,
+        data.get("cycle_history_hours"),
+        rule_set,
+        checkpoint,
     )
+    result = {
+        "route": None,
+        "stops": [],
+        "segments": [],
+        "daily_logs": [],
+        "checkpoint": recorded["checkpoint"],
+        "warnings": warnings,
+    }
 
-    # Step 3: Apply HOS rules
-    hos_result = HosRulesHandler.execute(
-        skeleton_segments, current_cycle_used_hours, start_datetime
+    # Step 2: Route the remaining distance only
+    remaining_stops = data["remaining_stops"]
+    try:
+        route_data = _timed(
+            timings,
+            "route",
+            ComputeRouteHandler.execute_locations,
+            [data["current_position"]] + list(remaining_stops),
+            data.get("include_leg_geometry", True),
+            data.get("routing_provider"),
+        )
+    except Exception as e:
+        warnings.append(f"Routing failed: {str(e)}")
+        return result
+
+    # Step 3: HOS from the replayed counters over the remaining stops
+    skeleton_segments = _build_skeleton(
+        route_data, remaining_stops, origin="Current position"
+    )
+    hos_result = _timed(
+        timings,
+        "hos",
+        (
+            SleeperSplitPlanner.execute
+            if data.get("sleeper_berth_split")
+            else HosRulesHandler.execute
+        ),
+        skeleton_segments,
+        0.0,
+        None,
+        rule_set=rule_set,
+        checkpoint=recorded["checkpoint"],
     )
-    segments = hos_result["segments"]
     warnings.extend(hos_result["warnings"])
 
-    # Step 4: Generate daily logs
-    daily_logs = EldLogGenerator.execute(segments)
+    # Step 4: Stops along the new route; logs for the affected days
+    segments = recorded["segments"] + hos_result["segments"]
+    stops = _timed(
+        timings,
+        "stops",
+        _generate_stops,
+        hos_result["segments"],
+        _route_index(route_data),
+    )
+    daily_logs = _timed(
+        timings,
+        "daily_logs",
+        EldLogGenerator.execute,
+        _logged_segments(logged, checkpoint_at) + segments,
+    )
+    for daily_log in daily_logs:
+        day_start = datetime.combine(
+            datetime.fromisoformat(daily_log["date"]).date(),
+            datetime.min.time(),
+            tzinfo=timezone.utc,
+        )
+        daily_log["partial"] = (
+            checkpoint is not None and daily_log["segments"][0].start > day_start
+        )
 
-    # Step 5: Generate stops (fuel, rest, restart points)
-    stops = _generate_stops(segments, route_data)
+    result.update(
+        route=route_data,
+        stops=stops,
+        segments=serialize_segments(segments),
+        daily_logs=serialize_daily_logs(daily_logs),
+    )
+    plan_id = _timed(
+        timings,
+        "plan_store",
+        PlanStore.save,
+        hos_result["segments"],
+        route_data["geometry"]["coordinates"],
+    )
+    if plan_id is not None:
+        result["plan_id"] = plan_id
+    if data.get("debug"):
+        timings["total"] = round((time.perf_counter() - plan_started) * 1000.0, 2)
+        result["timings"] = timings
+    return result
 
-    return {
+
+def _logged_segments(events: List[dict], until: datetime) -> List[Segment]:
+    """Events before a checkpoint as log segments; gaps up to `until` are off duty."""
+    segments = []
+    for event in events:
+        if segments and segments[-1].end < event["start"]:
+            segments.append(
+                Segment(
+                    segments[-1].end,
+                    event["start"],
+                    "OFF",
+                    0.0,
+                    "Off duty (not logged)",
+                )
+            )
+        segments.append(
+            Segment(
+                event["start"],
+                event["end"],
+                event["status"],
+                event["miles"],
+                event["note"],
+            )
+        )
+    if segments and segments[-1].end < until:
+        segments.append(
+            Segment(segments[-1].end, until, "OFF", 0.0, "Off duty (not logged)")
+        )
+    return segments
+
+
+def plan_positions(plan_id: str, times: List[str]) -> Optional[list]:
+    """
+    Planned positions of a stored plan at the given times.
+
+    Args:
+        plan_id: "plan_id" from a plan_trip or plan_replan response
+        times: ISO8601 datetimes
+
+    Returns:
+        [{"at", "phase", "status", "note", "miles", "lat", "lng"}, ...] in
+        input order (see PlanPositions.at), or None if the plan is unknown
+        or expired
+    """
+    positions = PlanStore.get(plan_id)
+    if positions is None:
+        return None
+    return positions.at([_parse_iso(value) for value in times])
+
+
+def _parse_start_datetime(start_datetime_str):
+    """Parse the ISO start time; default to 08:00 UTC today if not provided."""
+    if start_datetime_str:
+        start_datetime = datetime.fromisoformat(
+            start_datetime_str.replace("Z", "+00:00")
+        )
+        if start_datetime.tzinfo is None:
+            start_datetime = start_datetime.replace(tzinfo=timezone.utc)
+        return start_datetime
+    return datetime.now(timezone.utc).replace(hour=8, minute=0, second=0, microsecond=0)
+
+
+def _with_start_datetime(data: dict) -> dict:
+    """Copy of `data` with the start time resolved (default applied), as ISO."""
+    start_datetime = _parse_start_datetime(data.get("start_datetime", None))
+    return {**data, "start_datetime": start_datetime.isoformat()}
+
+
+def _build_plan(
+    data,
+    route_data,
+    start_weather,
+    dropoff_weather,
+    start_datetime,
+    timings,
+    warnings,
+    plan_started,
+    store_plan=False,
+):
+    """
+    Post-routing stages shared by the sync, async and batch paths (steps 2–7).
+
+    With `store_plan`, the plan is also saved in PlanStore for position
+    lookups. Batch items are not stored: they are built in worker processes,
+    where an in-process plan cache is out of the web workers' reach.
+    """
+    coords = route_data["geometry"]["coordinates"]
+    route_data, segments, stops, along_route = _plan_stages(
+        data, route_data, start_datetime, timings, warnings
+    )
+
+    # Step 7: Generate daily logs
+    daily_logs = _timed(timings, "daily_logs", EldLogGenerator.execute, segments)
+
+    # Segment records become ISO dicts only here, at the response boundary
+    result = {
         "route": route_data,
         "stops": stops,
-        "segments": segments,
-        "daily_logs": daily_logs,
-        "weather": {
-            "start": start_weather,
-            "dropoff": dropoff_weather,
-        },
+        "segments": serialize_segments(segments),
+        "daily_logs": serialize_daily_logs(daily_logs),
+        "weather": _weather_summary(start_weather, dropoff_weather, along_route),
         "warnings": warnings,
     }
+    if store_plan:
+        # Positions follow the full polyline, not the simplified response one
+        plan_id = _timed(timings, "plan_store", PlanStore.save, segments, coords)
+        if plan_id is not None:
+            result["plan_id"] = plan_id
+    if data.get("debug"):
+        timings["total"] = round((time.perf_counter() - plan_started) * 1000.0, 2)
+        result["timings"] = timings
+    return result
 
 
-def _generate_stops(segments: list, route_data: dict) -> list:
-    """Extract stops from segments (fuel, rest, restart) and place them along the route.
+def _plan_stages(data, route_data, start_datetime, timings, warnings):
+    """
+    Steps 2–6: skeleton, HOS, stops, route weather and simplification.
 
-    For this assessment we approximate spatial placement by distributing stops
-    along the overall route geometry. This keeps the implementation simple
-    while still yielding meaningful map markers.
+    Returns:
+        (route_data, segments, stops, along_route) — route_data simplified
+        for the response; along_route is None unless weather sampling is on
     """
+    current_cycle_used_hours = data.get("current_cycle_used_hours", 0)
 
-    stops: list[dict] = []
+    # Step 2: Build skeleton timeline
+    skeleton_segments = _build_skeleton(route_data)
+
+    # Step 3: Apply HOS rules (searching sleeper-berth splits when asked)
+    hos_result = _timed(
+        timings,
+        "hos",
+        (
+            SleeperSplitPlanner.execute
+            if data.get("sleeper_berth_split")
+            else HosRulesHandler.execute
+        ),
+        skeleton_segments,
+        current_cycle_used_hours,
+        start_datetime,
+        data.get("cycle_history_hours"),
+        _rule_set(data),
+    )
+    segments = hos_result["segments"]
+    warnings.extend(hos_result["warnings"])
 
-    # Get full route coordinates (GeoJSON LineString: [lng, lat])
-    coords = []
+    # Step 4: Generate stops (fuel, rest, restart points); stops and route
+    # weather share one distance index over the full polyline
+    route = _route_index(route_data)
+    stops = _timed(timings, "stops", _generate_stops, segments, route)
+
+    # Step 5: Hourly forecasts along the route and at each stop (opt-in)
+    along_route = None
+    if data.get("route_weather_samples"):
+        along_route = _timed(
+            timings,
+            "route_weather",
+            _route_weather,
+            route,
+            segments,
+            stops,
+            data["route_weather_samples"],
+        )
+
+    # Step 6: Simplify geometry for the response (stops use the full polyline)
+    tolerance_m = resolve_tolerance(
+        route_data["geometry"]["coordinates"],
+        data.get("simplify_tolerance_m"),
+        data.get("simplify_zoom"),
+    )
+    if tolerance_m:
+        route_data = _timed(
+            timings, "simplify", simplify_route, route_data, tolerance_m
+        )
+
+    return route_data, segments, stops, along_route
+
+
+def _build_skeleton(route_data: dict, stops=None, origin="Start") -> list:
+    """Skeleton timeline for HOS: drive/on-duty segments from the route legs.
+
+    One drive leg into each stop, then the stop's on-duty time. Stops default
+    to the trip's pickup and dropoff (1 hour each):
+    start → pickup (drive), pickup (1h ON), pickup → dropoff (drive), dropoff (1h ON)
+    """
+    skeleton_segments = []
+    legs = route_data["legs"]
+    previous = origin
+
+    for index, stop in enumerate(stops or _TRIP_STOPS):
+        label = stop.get("type", "stop").capitalize()
+        if index < len(legs):
+            skeleton_segments.append(
+                {
+                    "status": "D",
+                    "duration_hours": legs[index]["duration_hours"],
+                    "miles": legs[index]["distance_miles"],
+                    "note": f"{previous} → {label}",
+                }
+            )
+
+        hours = stop.get("duration_hours", 1.0)
+        skeleton_segments.append(
+            {
+                "status": "ON",
+                "duration_hours": hours,
+                "miles": 0,
+                "note": f"{label} ({hours:g} hour{'' if hours == 1 else 's'})",
+            }
+        )
+        previous = label
+
+    return skeleton_segments
+
+
+def _rule_set(data: dict):
+    """Compiled HOS rule set for a payload's rule_set / fuel_interval_miles."""
+    return get_rule_set(data.get("rule_set"), data.get("fuel_interval_miles"))
+
+
+def _weather_summary(start_weather, dropoff_weather, along_route):
+    weather = {"start": start_weather, "dropoff": dropoff_weather}
+    if along_route is not None:
+        weather["along_route"] = along_route
+    return weather
+
+
+def plan_trip_batch(items):
+    """
+    Plan many trips, yielding each result as soon as it is ready.
+
+    Identical routes (same RouteCache key) and weather points are fetched
+    once, concurrently on the upstream thread pool. HOS simulation, daily
+    logs and stops run on a process pool so CPU work spreads across cores.
+    Current weather that is not ready within PLAN_UPSTREAM_DEADLINE_SECONDS
+    of its first item's route becomes None, as in plan_trip.
+
+    Args:
+        items: [(index, data), ...] where data is a plan_trip payload
+
+    Yields:
+        (index, result_dict) for successes and (index, Exception) for
+        failures, in completion order
+    """
+    upstream = _get_upstream_executor()
+    cpu_pool = _get_batch_process_pool()
+    deadline = getattr(settings, "PLAN_UPSTREAM_DEADLINE_SECONDS", 12.0)
+
+    route_futures = {}
+    weather_futures = {}
+    weather_deadlines = {}
+    items_by_route = {}
+
+    for index, data in items:
+        waypoints = ComputeRouteHandler._waypoints(
+            data["start"], data["pickup"], data["dropoff"]
+        )
+        provider = get_routing_provider(data.get("routing_provider"))
+        key = RouteCache.key_for(waypoints, provider.name)
+        if key not in route_futures:
+            route_futures[key] = upstream.submit(
+                ComputeRouteHandler.execute,
+                data["start"],
+                data["pickup"],
+                data["dropoff"],
+                routing_provider=provider.name,
+            )
+            items_by_route[route_futures[key]] = []
+        items_by_route[route_futures[key]].append((index, data))
+
+        for location in (data["start"], data["dropoff"]):
+            point = (location.get("lat"), location.get("lng"))
+            if point not in weather_futures:
+                weather_futures[point] = upstream.submit(
+                    WeatherHandler.get_current_weather, *point
+                )
+
+    pending = set(items_by_route)
+    plan_futures = {}
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future in plan_futures:
+                index = plan_futures.pop(future)
+                try:
+                    yield index, future.result()
+                except Exception as e:
+                    yield index, e
+                continue
+
+            # A route finished: fan its items out to the process pool
+            try:
+                route_data = future.result()
+            except Exception as e:
+                for index, _ in items_by_route[future]:
+                    yield index, Exception(f"Routing failed: {str(e)}")
+                continue
+
+            for index, data in items_by_route[future]:
+                start_weather, dropoff_weather = (
+                    _batch_weather(
+                        weather_futures, weather_deadlines, location, deadline
+                    )
+                    for location in (data["start"], data["dropoff"])
+                )
+                try:
+                    plan_future = cpu_pool.submit(
+                        _build_batch_item,
+                        data,
+                        route_data,
+                        start_weather,
+                        dropoff_weather,
+                    )
+                except Exception as e:
+                    yield index, e
+                    continue
+                plan_futures[plan_future] = index
+                pending.add(plan_future)
+
+
+def _batch_weather(weather_futures, weather_deadlines, location, deadline):
+    """
+    A batch weather lookup's result, or None if it failed or is not ready
+    `deadline` seconds after the first item waited on it (later items
+    sharing the point then wait no longer than that).
+    """
+    point = (location.get("lat"), location.get("lng"))
+    deadline_at = weather_deadlines.setdefault(point, time.monotonic() + deadline)
     try:
-        coords = route_data.get("geometry", {}).get("coordinates") or []
+        return weather_futures[point].result(
+            timeout=max(0.0, deadline_at - time.monotonic())
+        )
     except Exception:
-        coords = []
+        return None
+
+
+def _build_batch_item(data, route_data, start_weather, dropoff_weather):
+    """Process-pool entry point: the CPU stages of one batch item."""
+    route_data = ComputeRouteHandler._apply_leg_geometry_option(
+        route_data, data.get("include_leg_geometry", True)
+    )
+    return _build_plan(
+        data,
+        route_data,
+        start_weather,
+        dropoff_weather,
+        _parse_start_datetime(data.get("start_datetime", None)),
+        {},
+        [],
+        time.perf_counter(),
+    )
+
+
+_batch_process_pool = None
+_batch_process_pool_lock = Lock()
+
+
+def _get_batch_process_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound batch work (HOS simulation, logs, stops).
+
+    Workers start from a fresh interpreter (forkserver, or spawn where that
+    is unavailable) rather than a fork of the web worker, so they never
+    inherit its upstream sockets, aiohttp sessions or thread-held locks.
+    """
+    global _batch_process_pool
+    if _batch_process_pool is None:
+        with _batch_process_pool_lock:
+            if _batch_process_pool is None:
+                method = (
+                    "forkserver"
+                    if "forkserver" in multiprocessing.get_all_start_methods()
+                    else "spawn"
+                )
+                _batch_process_pool = ProcessPoolExecutor(
+                    max_workers=getattr(settings, "PLAN_BATCH_PROCESSES", None),
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=django.setup,
+                )
+    return _batch_process_pool
+
+
+_upstream_executor = None
+_upstream_executor_lock = Lock()
+
+
+def _get_upstream_executor() -> ThreadPoolExecutor:
+    """Bounded pool shared by all plans for blocking upstream I/O."""
+    global _upstream_executor
+    if _upstream_executor is None:
+        with _upstream_executor_lock:
+            if _upstream_executor is None:
+                _upstream_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "PLAN_UPSTREAM_WORKERS", 16),
+                    thread_name_prefix="plan-upstream",
+                )
+    return _upstream_executor
+
+
+def _fetch_upstream(
+    start, pickup, dropoff, include_leg_geometry, routing_provider, timings
+):
+    """
+    Run the route and both weather lookups concurrently.
+
+    All three share one deadline (settings.PLAN_UPSTREAM_DEADLINE_SECONDS).
+    A route that misses it raises; weather that misses it becomes None and
+    is left to finish in the background.
 
-    # First collect all stop-like segments so we can spread them along the route
-    stop_segments: list[tuple[str, dict]] = []
+    Returns:
+        (route_data, start_weather, dropoff_weather)
+    """
+    deadline = getattr(settings, "PLAN_UPSTREAM_DEADLINE_SECONDS", 12.0)
+    deadline_at = time.monotonic() + deadline
+    fetch_started = time.perf_counter()
+    executor = _get_upstream_executor()
+
+    route_future = executor.submit(
+        _timed,
+        timings,
+        "route",
+        ComputeRouteHandler.execute,
+        start,
+        pickup,
+        dropoff,
+        include_leg_geometry=include_leg_geometry,
+        routing_provider=routing_provider,
+    )
+    weather_futures = [
+        executor.submit(
+            _timed,
+            timings,
+            f"weather_{name}",
+            WeatherHandler.get_current_weather,
+            location.get("lat"),
+            location.get("lng"),
+        )
+        for name, location in (("start", start), ("dropoff", dropoff))
+    ]
+
+    try:
+        route_data = route_future.result(
+            timeout=max(0.0, deadline_at - time.monotonic())
+        )
+    except FutureTimeoutError:
+        raise TimeoutError(f"route not ready within {deadline:.1f}s deadline")
+
+    weather = []
+    for future in weather_futures:
+        try:
+            weather.append(
+                future.result(timeout=max(0.0, deadline_at - time.monotonic()))
+            )
+        except FutureTimeoutError:
+            weather.append(None)
+
+    timings["upstream"] = round((time.perf_counter() - fetch_started) * 1000.0, 2)
+    return route_data, weather[0], weather[1]
+
+
+async def _afetch_upstream(
+    start, pickup, dropoff, include_leg_geometry, routing_provider, timings
+):
+    """
+    Async counterpart of `_fetch_upstream`: same deadline and degradation.
+
+    Returns:
+        (route_data, start_weather, dropoff_weather)
+    """
+    deadline = getattr(settings, "PLAN_UPSTREAM_DEADLINE_SECONDS", 12.0)
+    fetch_started = time.perf_counter()
+
+    route_task = asyncio.ensure_future(
+        _atimed(
+            timings,
+            "route",
+            ComputeRouteHandler.aexecute(
+                start,
+                pickup,
+                dropoff,
+                include_leg_geometry=include_leg_geometry,
+                routing_provider=routing_provider,
+            ),
+        )
+    )
+    weather_tasks = [
+        asyncio.ensure_future(
+            _atimed(
+                timings,
+                f"weather_{name}",
+                WeatherHandler.aget_current_weather(
+                    location.get("lat"), location.get("lng")
+                ),
+            )
+        )
+        for name, location in (("start", start), ("dropoff", dropoff))
+    ]
+
+    done, pending = await asyncio.wait([route_task, *weather_tasks], timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    if route_task not in done:
+        raise TimeoutError(f"route not ready within {deadline:.1f}s deadline")
+    route_data = route_task.result()
+    weather = [task.result() if task in done else None for task in weather_tasks]
+
+    timings["upstream"] = round((time.perf_counter() - fetch_started) * 1000.0, 2)
+    return route_data, weather[0], weather[1]
+
+
+async def _atimed(timings: dict, stage: str, awaitable):
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000.0, 2)
+
+
+def _timed(timings: dict, stage: str, func, *args, **kwargs):
+    """Call func, recording its wall time in ms under timings[stage]."""
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000.0, 2)
+
+
+def _route_index(route_data: dict) -> Optional[RouteIndex]:
+    """Distance index over the full route geometry, or None without one."""
+    coords = route_data.get("geometry", {}).get("coordinates") or []
+    return RouteIndex(coords) if len(coords) else None
+
+
+def _generate_stops(segments: List[Segment], route: Optional[RouteIndex]) -> list:
+    """Extract stops from segments (fuel, rest, restart) and place them along the route.
+
+    Each stop sits where the truck is when it starts: the miles driven
+    before it, as a fraction of the plan's driven miles, mapped onto the
+    route geometry through the plan's cumulative-distance index (`route`,
+    None without geometry). With a
+    facility dataset configured, each stop then snaps to the best facility
+    within the detour budget ("facility" is null when none fits).
+    """
+
+    stops: list[dict] = []
+
+    # Collect stop-like segments with the miles driven before each
+    stop_segments: list[tuple[str, Segment, float]] = []
+    driven_miles = 0.0
     for seg in segments:
-        note = str(seg.get("note", "")).lower()
+        if seg.status == "D":
+            driven_miles += seg.miles
+            continue
+        note = str(seg.note or "").lower()
         if "fuel" in note:
-            stop_segments.append(("fuel", seg))
+            stop_segments.append(("fuel", seg, driven_miles))
         elif "rest" in note or "reset" in note:
-            stop_segments.append(("rest", seg))
-
-    total_stops = len(stop_segments)
+            stop_segments.append(("rest", seg, driven_miles))
 
-    for index, (stop_type, seg) in enumerate(stop_segments):
-        # Default fallback if we cannot derive a coordinate
-        lat = 0.0
-        lng = 0.0
+    # Default fallback if we cannot derive a coordinate
+    positions = [(0.0, 0.0)] * len(stop_segments)
+    distances_m = [0.0] * len(stop_segments)
+    if route is not None and stop_segments:
+        distances_m = [
+            route.length_m * (miles / driven_miles if driven_miles > 0 else 0.0)
+            for _, _, miles in stop_segments
+        ]
+        positions = route.points_at_distances(distances_m)
 
-        if coords:
-            # Distribute stops roughly evenly along the coordinate list.
-            # Example: with one stop we place it near the middle; with N
-            # stops we place them at fractions (1/(N+1)), (2/(N+1)), ...
-            frac = float(index + 1) / float(total_stops + 1)
-            coord_index = max(0, min(int(len(coords) * frac), len(coords) - 1))
-            lng, lat = coords[coord_index]
+    # Snap to a nearby truck stop, fuel station or rest area when configured
+    facilities = get_facility_index() if route is not None else None
+    snap = getattr(settings, "FACILITY_SNAP", {})
 
+    for index, ((stop_type, seg, _), (lng, lat), distance_m) in enumerate(
+        zip(stop_segments, positions, distances_m)
+    ):
         label_prefix = "Fuel Stop" if stop_type == "fuel" else "Rest"
 
-        stops.append(
-            {
-                "type": stop_type,
-                "lat": lat,
-                "lng": lng,
-                "label": f"{label_prefix} {index}",
-                "estimated_arrival": seg["start_datetime"],
-                "estimated_departure": seg["end_datetime"],
-            }
-        )
+        stop = {
+            "type": stop_type,
+            "lat": lat,
+            "lng": lng,
+            "label": f"{label_prefix} {index}",
+            "estimated_arrival": seg.start.isoformat(),
+            "estimated_departure": seg.end.isoformat(),
+        }
+        if facilities is not None:
+            facility = facilities.snap(
+                route,
+                distance_m,
+                snap.get("MAX_DETOUR_MILES", 3.0) * METERS_PER_MILE,
+                snap.get("WINDOW_MILES", 25.0) * METERS_PER_MILE,
+                STOP_KINDS[stop_type],
+            )
+            if facility is not None:
+                stop["lat"], stop["lng"] = facility["lat"], facility["lng"]
+            stop["facility"] = facility
+        stops.append(stop)
 
     return stops
+
+
+def _route_weather(
+    route: Optional[RouteIndex], segments: List[Segment], stops: list, samples: int
+) -> list:
+    """Forecasts at `samples` points along the route and at every stop.
+
+    Sample points are spread evenly by distance along the geometry; each
+    gets the ETA at the same fraction of total driven miles. All points
+    go to WeatherHandler in one batch. Stops gain a "weather" key in place.
+
+    Returns:
+        [{"lat", "lng", "eta", "forecast": {...} | None}, ...]
+    """
+    if route is None:
+        return []
+
+    along_route = []
+    points = []
+    fracs = [float(index + 1) / float(samples + 1) for index in range(samples)]
+    positions = route.points_at_fractions(fracs)
+    for frac, (lng, lat) in zip(fracs, positions):
+        eta = _eta_at_drive_fraction(segments, frac)
+        along_route.append({"lat": lat, "lng": lng, "eta": eta.isoformat()})
+        points.append((lat, lng, eta))
+
+    for stop in stops:
+        points.append((stop["lat"], stop["lng"], _parse_iso(stop["estimated_arrival"])))
+
+    forecasts = WeatherHandler.get_forecast_points(points)
+    for sample, forecast in zip(along_route, forecasts):
+        sample["forecast"] = forecast
+    for stop, forecast in zip(stops, forecasts[samples:]):
+        stop["weather"] = forecast
+    return along_route
+
+
+def _eta_at_drive_fraction(segments: List[Segment], frac: float) -> datetime:
+    """Time at which `frac` of the plan's driven miles has been covered."""
+    drives = [seg for seg in segments if seg.status == "D" and seg.miles]
+    remaining = frac * sum(seg.miles for seg in drives)
+    for seg in drives:
+        if remaining <= seg.miles:
+            return seg.start + (seg.end - seg.start) * (remaining / seg.miles)
+        remaining -= seg.miles
+    return segments[-1].end
+
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
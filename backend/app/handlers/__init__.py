@@ -1,13 +1,51 @@
 """Handlers package — Export all handlers."""
 
 from .compute_route_handler import ComputeRouteHandler
+from .segments import Segment
 from .hos_rules_handler import HosRulesHandler
+from .hos_rule_sets import RuleSet, get_rule_set
+from .sleeper_split import SleeperSplitPlanner
+from .hos_grid import HosGridSimulator
+from .departure_optimizer import DepartureOptimizer
 from .eld_log_generator import EldLogGenerator
 from .weather_handler import WeatherHandler
+from .route_cache import RouteCache
+from .weather_cache import WeatherCache
+from .routing_providers import RoutingProvider, get_routing_provider
+from .local_routing import RoadGraph
+from .facilities import FacilityIndex, get_facility_index
+from .plan_store import PlanPositions, PlanStore
+from .plan_cache import PlanCache
+from .upstream_client import (
+    UpstreamClient,
+    UpstreamError,
+    CircuitOpenError,
+    get_upstream_client,
+)
 
 __all__ = [
     "ComputeRouteHandler",
+    "Segment",
     "HosRulesHandler",
+    "RuleSet",
+    "get_rule_set",
+    "SleeperSplitPlanner",
+    "HosGridSimulator",
+    "DepartureOptimizer",
     "EldLogGenerator",
     "WeatherHandler",
+    "RouteCache",
+    "WeatherCache",
+    "RoutingProvider",
+    "get_routing_provider",
+    "RoadGraph",
+    "FacilityIndex",
+    "get_facility_index",
+    "PlanPositions",
+    "PlanStore",
+    "PlanCache",
+    "UpstreamClient",
+    "UpstreamError",
+    "CircuitOpenError",
+    "get_upstream_client",
 ]
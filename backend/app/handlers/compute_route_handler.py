@@ -1,29 +1,31 @@
 """
-Compute Route Handler — OSRM Integration
+Compute Route Handler — Route lookup through the configured provider
 
-Queries the free OSRM API to fetch route geometry and leg information.
-No authentication required. Handles distance in km → miles conversion.
+Routes come from a pluggable RoutingProvider: the free OSRM API by default
+(no authentication; distance in km → miles) or the in-process local graph
+engine. Repeated lanes are served from RouteCache, keyed per provider.
 """
 
-import requests
-import polyline
-from datetime import timedelta
+from .route_cache import RouteCache
+from .routing_providers import get_routing_provider
 
 
 class ComputeRouteHandler:
-    """Query OSRM for route legs between waypoints."""
-
-    OSRM_BASE_URL = "https://router.project-osrm.org/route/v1/driving"
+    """Route legs between waypoints via the selected provider."""
 
     @staticmethod
-    def execute(start, pickup, dropoff):
+    def execute(
+        start, pickup, dropoff, include_leg_geometry=True, routing_provider=None
+    ):
         """
-        Fetch route from start → pickup → dropoff via OSRM.
+        Fetch route from start → pickup → dropoff.
 
         Args:
             start: {"lat": float, "lng": float, "address": str (optional)}
             pickup: {"lat": float, "lng": float}
             dropoff: {"lat": float, "lng": float}
+            include_leg_geometry: When False, legs carry no "geometry" key
+            routing_provider: "osrm" | "local" (default settings.ROUTING_PROVIDER)
 
         Returns:
             {
@@ -34,81 +36,78 @@ class ComputeRouteHandler:
                     {
                         "distance_miles": float,
                         "duration_hours": float,
-                        "geometry": GeoJSON LineString
+                        "geometry": GeoJSON LineString (this leg's slice only)
                     },
                     ...
                 ]
             }
         """
-        # Build waypoints: start → pickup → dropoff
-        waypoints = [
-            (start["lng"], start["lat"]),  # OSRM uses lng,lat order
-            (pickup["lng"], pickup["lat"]),
-            (dropoff["lng"], dropoff["lat"]),
-        ]
-
-        # Format for OSRM: lng,lat;lng,lat;lng,lat
-        coords_str = ";".join(f"{lng},{lat}" for lng, lat in waypoints)
-        url = f"{ComputeRouteHandler.OSRM_BASE_URL}/{coords_str}"
-
-        # Request with geometry + steps - note: OSRM doesn't return leg geometry by default, so we use full overview
-        params = {"geometries": "polyline", "overview": "full", "steps": "false"}
+        return ComputeRouteHandler.execute_locations(
+            [start, pickup, dropoff], include_leg_geometry, routing_provider
+        )
 
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if data["code"] != "Ok":
-                raise Exception(f"OSRM error: {data['code']}")
-
-            route = data["routes"][0]
-
-            # Decode geometry
-            full_geometry = polyline.decode(route["geometry"])
-            coords = [[lng, lat] for lat, lng in full_geometry]
-
-            # Extract legs: start→pickup, pickup→dropoff
-            legs = []
-            total_distance_m = 0
-            total_duration_s = 0
+    @staticmethod
+    def execute_locations(locations, include_leg_geometry=True, routing_provider=None):
+        """
+        Fetch a route through any number of locations, in order.
 
-            for leg in route["legs"]:
-                distance_m = leg["distance"]
-                duration_s = leg["duration"]
+        Args:
+            locations: [{"lat": float, "lng": float}, ...] (two or more)
+            include_leg_geometry / routing_provider: As for `execute`
 
-                # OSRM doesn't provide leg geometry, so we use the full route geometry for now
-                # In production, could split geometry proportionally by leg distance
+        Returns:
+            Same shape as `execute`, with len(locations) - 1 legs
+        """
+        provider = get_routing_provider(routing_provider)
+        waypoints = [(location["lng"], location["lat"]) for location in locations]
+
+        cache_key = RouteCache.key_for(waypoints, provider.name)
+        cached = RouteCache.get(cache_key)
+        if cached is not None:
+            return ComputeRouteHandler._apply_leg_geometry_option(
+                cached, include_leg_geometry
+            )
+
+        route_data = provider.route(waypoints)
+        RouteCache.set(cache_key, route_data)
+        return ComputeRouteHandler._apply_leg_geometry_option(
+            route_data, include_leg_geometry
+        )
 
-                legs.append(
-                    {
-                        "distance_miles": ComputeRouteHandler._meters_to_miles(
-                            distance_m
-                        ),
-                        "duration_hours": duration_s / 3600.0,
-                        "geometry": {
-                            "type": "LineString",
-                            "coordinates": coords,  # Use full route geometry for now
-                        },
-                    }
-                )
-
-                total_distance_m += distance_m
-                total_duration_s += duration_s
-
-            return {
-                "geometry": {"type": "LineString", "coordinates": coords},
-                "total_distance_miles": ComputeRouteHandler._meters_to_miles(
-                    total_distance_m
-                ),
-                "total_duration_hours": total_duration_s / 3600.0,
-                "legs": legs,
-            }
+    @staticmethod
+    async def aexecute(
+        start, pickup, dropoff, include_leg_geometry=True, routing_provider=None
+    ):
+        """Async variant of `execute` (same arguments and return shape)."""
+        provider = get_routing_provider(routing_provider)
+        waypoints = ComputeRouteHandler._waypoints(start, pickup, dropoff)
+
+        cache_key = RouteCache.key_for(waypoints, provider.name)
+        cached = await RouteCache.aget(cache_key)
+        if cached is not None:
+            return ComputeRouteHandler._apply_leg_geometry_option(
+                cached, include_leg_geometry
+            )
+
+        route_data = await provider.aroute(waypoints)
+        await RouteCache.aset(cache_key, route_data)
+        return ComputeRouteHandler._apply_leg_geometry_option(
+            route_data, include_leg_geometry
+        )
 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"OSRM request failed: {e}")
+    @staticmethod
+    def _waypoints(start, pickup, dropoff):
+        """Build waypoints: start → pickup → dropoff (lng, lat order)."""
+        return [
+            (start["lng"], start["lat"]),
+            (pickup["lng"], pickup["lat"]),
+            (dropoff["lng"], dropoff["lat"]),
+        ]
 
     @staticmethod
-    def _meters_to_miles(meters):
-        """Convert meters to miles."""
-        return meters * 0.000621371
+    def _apply_leg_geometry_option(route_data, include_leg_geometry):
+        """Drop per-leg geometry when the caller asked to omit it."""
+        if not include_leg_geometry:
+            for leg in route_data["legs"]:
+                leg.pop("geometry", None)
+        return route_data
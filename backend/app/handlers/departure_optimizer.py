@@ -0,0 +1,230 @@
+"""
+Departure Optimizer — Best departure time within a window
+
+Departures are searched on a grid of `step` (one minute by default) from the
+window start. Elapsed trip time E(t) is piecewise affine in the departure t:
+inside a piece every inserted break, reset and wait stays the same and only
+moves with the clock, so arrival t + E(t) and E(t) are both affine there and
+each piece's best departure is one of its ends.
+
+- Static cycle (no `cycle_history_hours`): no rule reads the clock, so the
+  whole window is one piece with constant E and the window start is best
+  for both objectives. One HosGridSimulator run gives the answer.
+- Rolling cycle: hours roll off at midnights, and a wait for them to roll
+  off (see RollingCycle.next_room) ends at a midnight rather than a fixed
+  time later. The plan can only change shape when a segment boundary moves
+  across a midnight. The window is swept piece by piece: from a piece
+  start, the next breakpoint is predicted as the nearest departure at which
+  a boundary that moves with the departure (any boundary up to the first
+  wait that ends at a midnight) reaches one. The departure just before it
+  is simulated, and if its shape (each segment's status, note, start day
+  and end day) differs from the piece start, the first departure with a
+  different shape is found by bisection instead.
+
+Each piece costs about two HosRulesHandler runs, instead of one run per
+minute of the window. `cycle_history_hours` is anchored to the window
+start: its last entry is the day before `earliest`, and departing on a
+later day adds zero-hour days for the days waited.
+"""
+
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from .hos_grid import HosGridSimulator
+from .hos_rule_sets import CompiledRuleSet, get_rule_set
+from .hos_rules_handler import HosRulesHandler
+
+OBJECTIVES = ("arrival", "elapsed")
+DEFAULT_STEP = timedelta(minutes=1)
+
+_TICK = timedelta(microseconds=1)
+
+
+class DepartureOptimizer:
+    """Pick the departure minimizing arrival or elapsed time under HOS rules."""
+
+    @staticmethod
+    def execute(
+        skeleton_segments: List[Dict[str, Any]],
+        current_cycle_used_hours: float,
+        earliest: datetime,
+        latest: datetime,
+        objective: str = "arrival",
+        rule_set: Union[str, CompiledRuleSet, None] = None,
+        cycle_history_hours: Optional[List[float]] = None,
+        step: timedelta = DEFAULT_STEP,
+    ) -> Dict[str, Any]:
+        """
+        Search departures in [earliest, latest].
+
+        Args:
+            skeleton_segments: Same skeleton HosRulesHandler takes
+            current_cycle_used_hours: Starting 70-hour cycle usage
+            earliest / latest: Departure window (timezone-aware)
+            objective: "arrival" (earliest arrival) or "elapsed" (shortest trip)
+            rule_set: Rule set name or CompiledRuleSet (default property_70_8)
+            cycle_history_hours: On-duty hours for prior days, oldest first,
+                the last entry being the day before `earliest` (rolling cycle)
+            step: Departure resolution
+
+        Returns:
+            {
+                "departure": datetime,
+                "arrival": datetime,
+                "elapsed_hours": float,
+                "pieces": [{"from": datetime, "to": datetime, "elapsed_hours": float}, ...],
+                "evaluated": int,  # Simulations run
+                "cycle_history_hours": [float, ...] | None  # History the
+                    # chosen departure was simulated with (rolling cycle only)
+            }
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        rules = (
+            rule_set
+            if isinstance(rule_set, CompiledRuleSet)
+            else get_rule_set(rule_set)
+        )
+
+        if cycle_history_hours is None:
+            grid = HosGridSimulator.execute(
+                skeleton_segments, [earliest], [current_cycle_used_hours], rules
+            )
+            starts = [earliest]
+            arrivals = {earliest: grid["arrivals"][0][0]}
+            sweep = None
+        else:
+            sweep = _RollingSweep(
+                skeleton_segments, cycle_history_hours, earliest, step, rules
+            )
+            starts = sweep.piece_starts(latest)
+            arrivals = sweep.arrivals()
+
+        # Piece ends are simulated too; ties go to the earliest departure
+        departures = sorted(arrivals)
+        if objective == "arrival":
+            best = min(departures, key=lambda departure: arrivals[departure])
+        else:
+            best = min(
+                departures, key=lambda departure: arrivals[departure] - departure
+            )
+
+        return {
+            "departure": best,
+            "arrival": arrivals[best],
+            "elapsed_hours": (arrivals[best] - best) / timedelta(hours=1),
+            "pieces": [
+                {
+                    "from": start,
+                    "to": starts[index + 1] if index + 1 < len(starts) else latest,
+                    "elapsed_hours": (arrivals[start] - start) / timedelta(hours=1),
+                }
+                for index, start in enumerate(starts)
+            ],
+            "evaluated": len(arrivals),
+            "cycle_history_hours": sweep and sweep.history_for(best),
+        }
+
+
+class _RollingSweep:
+    """Piece-by-piece search of a departure window under a rolling cycle."""
+
+    __slots__ = ("skeleton", "history", "earliest", "step", "rules", "plans")
+
+    def __init__(
+        self,
+        skeleton_segments: List[Dict[str, Any]],
+        cycle_history_hours: List[float],
+        earliest: datetime,
+        step: timedelta,
+        rules: CompiledRuleSet,
+    ):
+        self.skeleton = skeleton_segments
+        self.history = list(cycle_history_hours)
+        self.earliest = earliest
+        self.step = step
+        self.rules = rules
+        self.plans = {}  # departure -> segments
+
+    def piece_starts(self, latest: datetime) -> List[datetime]:
+        """Departures starting each piece; every piece's last departure is simulated."""
+        last = self.earliest + (latest - self.earliest) // self.step * self.step
+        starts = []
+        start = self.earliest
+        while start <= last:
+            starts.append(start)
+            following = min(self._predicted_breakpoint(start), last + self.step)
+            end = following - self.step
+            if self._shape(end) != self._shape(start):
+                following = self._first_change(start, end)
+            start = following
+        return starts
+
+    def arrivals(self) -> Dict[datetime, datetime]:
+        """Arrival for every departure simulated so far."""
+        return {
+            departure: segments[-1].end if segments else departure
+            for departure, segments in self.plans.items()
+        }
+
+    def history_for(self, departure: datetime) -> List[float]:
+        """Cycle history ending the day before `departure`: zero-hour days for the days waited."""
+        days_waited = (departure.date() - self.earliest.date()).days
+        return self.history + [0.0] * days_waited
+
+    def _segments(self, departure: datetime):
+        segments = self.plans.get(departure)
+        if segments is None:
+            segments = HosRulesHandler.execute(
+                self.skeleton,
+                0.0,
+                departure,
+                self.history_for(departure),
+                self.rules,
+            )["segments"]
+            self.plans[departure] = segments
+        return segments
+
+    def _shape(self, departure: datetime) -> tuple:
+        """What must stay equal inside a piece: statuses, notes and the days boundaries fall on."""
+        return tuple(
+            (seg.status, seg.note, seg.start.date(), (seg.end - _TICK).date())
+            for seg in self._segments(departure)
+        )
+
+    def _predicted_breakpoint(self, start: datetime) -> datetime:
+        """
+        First grid departure after `start` at which a boundary that moves
+        with the departure crosses a midnight. A segment starting at
+        midnight already counts on the new day, one ending there on the old.
+        """
+        roll_off_note = self.rules.roll_off_rest and self.rules.roll_off_rest[1]
+        nearest = None
+        for seg in self._segments(start):
+            crossing = start + (_next_midnight(seg.start) - seg.start)
+            nearest = crossing if nearest is None else min(nearest, crossing)
+            if seg.note == roll_off_note and seg.end.time() == time.min:
+                break  # This wait and everything after it stay put
+            crossing = start + (_next_midnight(seg.end - _TICK) - seg.end) + _TICK
+            nearest = min(nearest, crossing)
+        if nearest is None:
+            return start + self.step
+        steps = -((self.earliest - nearest) // self.step)  # Round up
+        return max(self.earliest + steps * self.step, start + self.step)
+
+    def _first_change(self, start: datetime, end: datetime) -> datetime:
+        """First departure in (start, end] whose shape differs from `start`'s."""
+        shape = self._shape(start)
+        low, high = 0, (end - start) // self.step
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._shape(start + middle * self.step) == shape:
+                low = middle
+            else:
+                high = middle
+        return start + high * self.step
+
+
+def _next_midnight(at: datetime) -> datetime:
+    """First midnight strictly after `at`, in `at`'s timezone."""
+    return datetime.combine(at.date() + timedelta(days=1), time.min, tzinfo=at.tzinfo)
@@ -0,0 +1,228 @@
+"""
+Duty Cycle — 70-hour / 8-day (or 60 / 7) on-duty tracking for HosRulesHandler
+
+Two trackers share one interface (`hours_until_limit`, `next_room`, `add`,
+`restart`, `copy`, `checkpoint`):
+
+- StaticCycle: the original single `current_cycle_used_hours` counter.
+  Hours never roll off, so long trips hit the 70-hour limit early.
+- RollingCycle: per-day on-duty totals for the current day and the prior 7
+  in a ring buffer. Crossing midnight drops the oldest day's hours, so each
+  update costs O(1) per day spanned, and a 34-hour restart is only needed
+  when the true 8-day total reaches 70 hours and waiting off duty for
+  hours to roll off (`next_room`) would take longer than the restart.
+
+Days are calendar days in the timezone of the trip's start time. Limits and
+window length come from the rule set (see hos_rule_sets.py). The window
+total is an exactly rounded sum (math.fsum) of the daily totals, so a
+tracker rebuilt from a checkpoint makes the same limit decisions as the one
+that kept running.
+"""
+
+import math
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+CYCLE_LIMIT_HOURS = 70.0
+CYCLE_DAYS = 8
+
+
+class StaticCycle:
+    """Cycle hours as one counter (no roll-off)."""
+
+    def __init__(self, used_hours: float, limit_hours: float = CYCLE_LIMIT_HOURS):
+        self.used = used_hours
+        self.limit = limit_hours
+
+    def hours_until_limit(self, start: datetime) -> float:
+        """On-duty hours that fit from `start` before the limit is reached."""
+        return self.limit - self.used
+
+    def next_room(self, start: datetime, min_room: float = 0.0) -> Optional[datetime]:
+        """`start` if more than `min_room` hours fit, else None (nothing rolls off)."""
+        return start if self.limit - self.used > min_room else None
+
+    def add(self, start: datetime, hours: float) -> None:
+        self.used += hours
+
+    def restart(self) -> None:
+        self.used = 0.0
+
+    def copy(self) -> "StaticCycle":
+        return StaticCycle(self.used, self.limit)
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """JSON-safe state for `cycle_from_checkpoint`."""
+        return {"used_hours": self.used}
+
+
+class RollingCycle:
+    """
+    Rolling N-day on-duty window kept as a ring buffer of daily totals.
+
+    Args:
+        history_hours: On-duty hours for up to `days - 1` prior days, oldest
+            first (the last entry is the day before `start`)
+        start: Trip start; its date is "today" in the window
+        days / limit_hours: Window length and on-duty limit (8 / 70)
+    """
+
+    def __init__(
+        self,
+        history_hours: List[float],
+        start: datetime,
+        days: int = CYCLE_DAYS,
+        limit_hours: float = CYCLE_LIMIT_HOURS,
+    ):
+        history = list(history_hours)[-(days - 1) :]
+        self.days = days
+        self.limit = limit_hours
+        self._daily = [0.0] * (days - len(history) - 1) + history + [0.0]
+        self._index = days - 1  # Slot of self._day
+        self._day = start.date()
+        self._total = math.fsum(self._daily)
+
+    @property
+    def used(self) -> float:
+        """On-duty hours in the window ending on the current day."""
+        return self._total
+
+    def hours_until_limit(self, start: datetime) -> float:
+        """
+        On-duty hours that fit from `start` before the window total reaches
+        the limit, counting hours that roll off at each midnight on the way.
+        """
+        probe = self.copy()
+        probe._advance(start.date())
+        fits = 0.0
+        at = start
+        while True:
+            midnight = datetime.combine(
+                at.date() + timedelta(days=1), time.min, tzinfo=at.tzinfo
+            )
+            to_midnight = (midnight - at).total_seconds() / 3600.0
+            room = self.limit - probe._total
+            if room <= to_midnight:
+                return fits + room
+            fits += to_midnight
+            probe._daily[probe._index] += to_midnight
+            probe._total = math.fsum(probe._daily)
+            at = midnight
+            probe._advance(at.date())
+
+    def next_room(self, start: datetime, min_room: float = 0.0) -> Optional[datetime]:
+        """
+        Earliest time from `start`, staying off duty, at which more than
+        `min_room` on-duty hours fit: `start` itself, or the first midnight
+        by which enough prior days have rolled out of the window. None only
+        if the limit itself is not above `min_room`.
+        """
+        probe = self.copy()
+        probe._advance(start.date())
+        at = start
+        for _ in range(self.days + 1):
+            if self.limit - probe._total > min_room:
+                return at
+            at = datetime.combine(
+                at.date() + timedelta(days=1), time.min, tzinfo=at.tzinfo
+            )
+            probe._advance(at.date())
+        return None
+
+    def add(self, start: datetime, hours: float) -> None:
+        """Record on-duty time from `start`, split at midnights."""
+        self._advance(start.date())
+        at = start
+        remaining = hours
+        while True:
+            midnight = datetime.combine(
+                at.date() + timedelta(days=1), time.min, tzinfo=at.tzinfo
+            )
+            piece = min(remaining, (midnight - at).total_seconds() / 3600.0)
+            self._daily[self._index] += piece
+            remaining -= piece
+            if remaining <= 0:
+                self._total = math.fsum(self._daily)
+                return
+            at = midnight
+            self._advance(at.date())
+
+    def copy(self) -> "RollingCycle":
+        """Independent copy (the ring buffer is duplicated)."""
+        copy = RollingCycle.__new__(RollingCycle)
+        copy.days = self.days
+        copy.limit = self.limit
+        copy._daily = list(self._daily)
+        copy._index = self._index
+        copy._day = self._day
+        copy._total = self._total
+        return copy
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """JSON-safe state for `cycle_from_checkpoint` (daily hours, oldest first)."""
+        start = self._index + 1
+        return {
+            "day": self._day.isoformat(),
+            "daily_hours": self._daily[start:] + self._daily[:start],
+        }
+
+    def restart(self) -> None:
+        """A 34-hour restart resets the whole window to zero."""
+        self._daily = [0.0] * self.days
+        self._total = 0.0
+
+    def _advance(self, day: date) -> None:
+        """Roll the window forward to `day`, dropping days that fall out."""
+        gap = (day - self._day).days
+        if gap <= 0:
+            return
+        if gap >= self.days:
+            self._daily = [0.0] * self.days
+            self._total = 0.0
+        else:
+            for _ in range(gap):
+                self._index = (self._index + 1) % self.days
+                self._daily[self._index] = 0.0
+            self._total = math.fsum(self._daily)
+        self._day = day
+
+
+def make_cycle(
+    current_cycle_used_hours: float,
+    cycle_history_hours: Optional[List[float]],
+    start: datetime,
+    days: int = CYCLE_DAYS,
+    limit_hours: float = CYCLE_LIMIT_HOURS,
+):
+    """RollingCycle when per-day history is given, else StaticCycle."""
+    if cycle_history_hours is None:
+        return StaticCycle(current_cycle_used_hours, limit_hours)
+    return RollingCycle(cycle_history_hours, start, days, limit_hours)
+
+
+def cycle_from_checkpoint(
+    checkpoint: Dict[str, Any],
+    days: int = CYCLE_DAYS,
+    limit_hours: float = CYCLE_LIMIT_HOURS,
+):
+    """
+    Rebuild a tracker from its `checkpoint()`.
+
+    {"used_hours": float} gives a StaticCycle; {"day": ISO date,
+    "daily_hours": [float, ...]} (oldest first, the last entry is `day`)
+    gives a RollingCycle.
+    """
+    if "daily_hours" not in checkpoint:
+        return StaticCycle(checkpoint["used_hours"], limit_hours)
+    day = checkpoint["day"]
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    daily = list(checkpoint["daily_hours"])[-days:]
+    cycle = RollingCycle.__new__(RollingCycle)
+    cycle.days = days
+    cycle.limit = limit_hours
+    cycle._daily = [0.0] * (days - len(daily)) + daily
+    cycle._index = days - 1
+    cycle._day = day
+    cycle._total = math.fsum(cycle._daily)
+    return cycle
@@ -2,29 +2,39 @@
 ELD Log Generator — Generate Daily Log Sheets
 
 Clips segments at midnight boundaries and computes daily totals.
-Produces one daily_log entry per calendar day the trip spans.
+Produces one daily_log entry per calendar day the trip spans. `iter_days`
+yields them one at a time, so streaming responses can send day 1 before
+later days are computed.
+
+Segments come in time order (as HosRulesHandler emits them), so one pointer
+sweeps them alongside the midnights: each day starts at the first segment
+still running at its midnight and stops at the first one starting after the
+next, instead of testing every segment against every day.
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from itertools import islice
+from typing import Any, Dict, Iterator, List
+
+from .segments import Segment
 
 
 class EldLogGenerator:
     """Generate daily log sheets from segments."""
 
     @staticmethod
-    def execute(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def execute(segments: List[Segment]) -> List[Dict[str, Any]]:
         """
         Clip segments at midnight and compute daily totals.
 
         Args:
-            segments: Full segment list with ISO datetimes
+            segments: Full Segment list from HosRulesHandler
 
         Returns:
             [
                 {
                     "date": "2025-01-22",
-                    "segments": [...clipped to this date...],
+                    "segments": [Segment, ...] clipped to this date,
                     "totals": {"OFF_hours": float, "SB_hours": float, "D_hours": float, "ON_hours": float},
                     "miles": float,
                     "remarks": [...]
@@ -32,23 +42,23 @@ class EldLogGenerator:
                 ...
             ]
         """
-        if not segments:
-            return []
+        return list(EldLogGenerator.iter_days(segments))
 
-        daily_logs = []
+    @staticmethod
+    def iter_days(segments: List[Segment]) -> Iterator[Dict[str, Any]]:
+        """Yield the daily logs of `execute` one day at a time, in date order."""
+        if not segments:
+            return
 
-        # Parse first and last times (ensure timezone aware)
-        first_start = datetime.fromisoformat(
-            segments[0]["start_datetime"].replace("Z", "+00:00")
-        )
-        last_end = datetime.fromisoformat(
-            segments[-1]["end_datetime"].replace("Z", "+00:00")
-        )
+        first_start = segments[0].start
+        last_end = segments[-1].end
 
         # Get date range (use UTC date)
         current_date = first_start.date()
         end_date = last_end.date()
 
+        first = 0  # First segment that may still overlap the current day
+
         while current_date <= end_date:
             # Midnight boundaries for this date (in UTC)
             day_start = datetime.combine(
@@ -71,16 +81,18 @@ class EldLogGenerator:
             total_miles = 0.0
             remarks = set()
 
-            for seg in segments:
-                seg_start = datetime.fromisoformat(
-                    seg["start_datetime"].replace("Z", "+00:00")
-                )
-                seg_end = datetime.fromisoformat(
-                    seg["end_datetime"].replace("Z", "+00:00")
-                )
+            # Segments over by midnight never overlap this day or later ones
+            while first < len(segments) and segments[first].end <= day_start:
+                first += 1
+
+            for seg in islice(segments, first, None):
+                seg_start = seg.start
+                seg_end = seg.end
 
                 # Check if segment overlaps this day
-                if seg_end <= day_start or seg_start >= day_end:
+                if seg_start >= day_end:
+                    break  # It and everything after it start on a later day
+                if seg_end <= day_start:
                     continue
 
                 # Clip segment to day boundaries
@@ -90,29 +102,25 @@ class EldLogGenerator:
                 clipped_duration = (
                     clipped_end - clipped_start
                 ).total_seconds() / 3600.0
-                clipped_miles = seg["miles"] * (
+                clipped_miles = seg.miles * (
                     clipped_duration / ((seg_end - seg_start).total_seconds() / 3600.0)
                     if (seg_end - seg_start).total_seconds() > 0
                     else 0
                 )
 
                 clipped_segments.append(
-                    {
-                        "start_datetime": clipped_start.isoformat(),
-                        "end_datetime": clipped_end.isoformat(),
-                        "status": seg["status"],
-                        "miles": clipped_miles,
-                        "note": seg["note"],
-                    }
+                    Segment(
+                        clipped_start, clipped_end, seg.status, clipped_miles, seg.note
+                    )
                 )
 
                 # Accumulate totals
-                totals[f"{seg['status']}_hours"] += clipped_duration
+                totals[f"{seg.status}_hours"] += clipped_duration
                 total_miles += clipped_miles
 
                 # Add remarks (location/note info)
-                if seg["note"]:
-                    remarks.add(seg["note"])
+                if seg.note:
+                    remarks.add(seg.note)
 
             # Ensure totals sum to 24 hours (within floating-point tolerance)
             total_hours = sum(totals.values())
@@ -125,16 +133,12 @@ class EldLogGenerator:
                 for key in totals:
                     totals[key] *= scale if total_hours > 24 else 1.0
 
-            daily_logs.append(
-                {
-                    "date": current_date.isoformat(),
-                    "segments": clipped_segments,
-                    "totals": {k: round(v, 2) for k, v in totals.items()},
-                    "miles": round(total_miles, 2),
-                    "remarks": sorted(list(remarks)),
-                }
-            )
+            yield {
+                "date": current_date.isoformat(),
+                "segments": clipped_segments,
+                "totals": {k: round(v, 2) for k, v in totals.items()},
+                "miles": round(total_miles, 2),
+                "remarks": sorted(list(remarks)),
+            }
 
             current_date += timedelta(days=1)
-
-        return daily_logs
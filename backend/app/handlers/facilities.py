@@ -0,0 +1,301 @@
+"""
+Facilities — Truck stops, fuel stations and rest areas for snapping HOS stops
+
+Rest and fuel stops fall wherever an HOS limit binds, which is rarely a place
+a truck can park. FacilityIndex holds a local facility dataset in a uniform
+grid over latitude/longitude: records are sorted by cell key, and the cells
+of one grid row are contiguous keys, so a radius lookup is one binary search
+per row of cells plus a distance check on the few records found.
+
+`snap` moves a stop to the best facility near the route: it may only move
+the stop back along the route (driving on past the ideal point would break
+the limit that caused the stop), at most `window_m`, and the facility must
+lie within `max_detour_m` of the route. The choice minimizes the distance
+moved back plus the round trip off the route.
+
+Datasets load from CSV (lat, lng, name, kind columns), GeoJSON Point
+features, or a compiled `.npy` written by `FacilityIndex.save` (see
+`manage.py build_facility_index`). Compiled files are memory-mapped and
+already sorted, so loading only copies the cell keys (8 bytes a facility)
+and record pages are read on demand.
+"""
+
+import csv
+import json
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .geometry import METERS_PER_DEG_LAT, METERS_PER_DEG_LNG_EQUATOR, RouteIndex
+
+METERS_PER_MILE = 1609.344
+CELL_DEG = 0.1
+GRID_COLS = int(round(360.0 / CELL_DEG))
+NAME_LENGTH = 64
+
+# Facility kinds; a record stores the index into this tuple
+KINDS = ("truck_stop", "fuel", "rest_area", "parking", "other")
+KIND_ALIASES = {
+    "truckstop": "truck_stop",
+    "truck stop": "truck_stop",
+    "services": "truck_stop",
+    "travel_center": "truck_stop",
+    "gas_station": "fuel",
+    "fuel_station": "fuel",
+    "rest area": "rest_area",
+    "truck_parking": "parking",
+}
+
+# Facility kinds that can host each type of HOS stop
+STOP_KINDS = {
+    "fuel": ("truck_stop", "fuel"),
+    "rest": ("truck_stop", "rest_area", "parking"),
+}
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("cell", "<i8"),
+        ("lng", "<f8"),
+        ("lat", "<f8"),
+        ("kind", "u1"),
+        ("name", f"<U{NAME_LENGTH}"),
+    ]
+)
+
+
+class FacilityIndex:
+    """Facilities in a lat/lng grid; see the module docstring."""
+
+    def __init__(self, records: np.ndarray):
+        """
+        Args:
+            records: RECORD_DTYPE array sorted by "cell" (may be memory-mapped)
+        """
+        self.records = records
+        # Contiguous copy: searchsorted on the strided field view would copy
+        # every key on each call
+        self._cells = np.ascontiguousarray(records["cell"])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Tuple[float, float, str, str]]
+    ) -> "FacilityIndex":
+        """Build from (lng, lat, name, kind) rows; kinds are normalized."""
+        rows = list(rows)
+        records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+        if rows:
+            lng, lat, names, kinds = zip(*rows)
+            records["lng"] = lng
+            records["lat"] = lat
+            records["name"] = [str(name or "")[:NAME_LENGTH] for name in names]
+            records["kind"] = [KINDS.index(_kind(kind)) for kind in kinds]
+            records["cell"] = _cell_keys(records["lng"], records["lat"])
+            records = records[np.argsort(records["cell"], kind="stable")]
+        return cls(records)
+
+    @classmethod
+    def load(cls, path: str) -> "FacilityIndex":
+        """Load a compiled `.npy` (memory-mapped), CSV or GeoJSON dataset."""
+        path = str(path)
+        if path.endswith(".npy"):
+            return cls(np.load(path, mmap_mode="r"))
+        if path.endswith(".csv"):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                return cls.from_rows(_csv_rows(csv.DictReader(f)))
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_rows(_geojson_rows(json.load(f)))
+
+    def save(self, path: str) -> None:
+        """Write the sorted records as `.npy` (memory-mappable, no re-parsing)."""
+        np.save(path, np.ascontiguousarray(self.records))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def within(
+        self,
+        lng: float,
+        lat: float,
+        radius_m: float,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Facilities within `radius_m` of (lng, lat), nearest first.
+
+        Distances use a local equirectangular projection, accurate to well
+        under 1% at detour-sized radii.
+
+        Returns:
+            (record indices, distances in meters)
+        """
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        lat_span = radius_m / METERS_PER_DEG_LAT
+        lng_span = radius_m / (METERS_PER_DEG_LNG_EQUATOR * cos_lat)
+        row_lo, col_lo = _cell(lng - lng_span, lat - lat_span)
+        row_hi, col_hi = _cell(lng + lng_span, lat + lat_span)
+
+        found = []
+        for row in range(row_lo, row_hi + 1):
+            first = np.searchsorted(self._cells, row * GRID_COLS + col_lo, "left")
+            last = np.searchsorted(self._cells, row * GRID_COLS + col_hi, "right")
+            if last > first:
+                found.append(np.arange(first, last))
+        if not found:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        candidates = np.concatenate(found)
+        records = self.records[candidates]
+        if kinds is not None:
+            codes = [KINDS.index(kind) for kind in kinds]
+            keep = np.isin(records["kind"], codes)
+            candidates, records = candidates[keep], records[keep]
+        dx = (records["lng"] - lng) * METERS_PER_DEG_LNG_EQUATOR * cos_lat
+        dy = (records["lat"] - lat) * METERS_PER_DEG_LAT
+        distances = np.hypot(dx, dy)
+        inside = distances <= radius_m
+        order = np.argsort(distances[inside], kind="stable")
+        return candidates[inside][order], distances[inside][order]
+
+    def snap(
+        self,
+        route: RouteIndex,
+        distance_m: float,
+        max_detour_m: float,
+        window_m: float,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Best facility for a stop ideally at `distance_m` along `route`.
+
+        Off-route distance is measured to the route's vertices between
+        `distance_m - window_m` and `distance_m` (the ideal point included).
+
+        Returns:
+            {"name", "kind", "lat", "lng", "off_route_miles",
+            "miles_before_ideal"}, or None if nothing fits the budget
+        """
+        ideal = route.points_at_distances([distance_m])[0]
+        candidates, _ = self.within(ideal[0], ideal[1], window_m + max_detour_m, kinds)
+        if not len(candidates):
+            return None
+
+        cumulative = route.cumulative_m
+        first = int(np.searchsorted(cumulative, distance_m - window_m, "left"))
+        last = int(np.searchsorted(cumulative, distance_m, "right"))
+        vertices = np.vstack((route.points[first:last], [ideal]))
+        along = np.append(cumulative[first:last], distance_m)
+
+        # Only facilities in the window's bounding box, grown by the detour
+        # budget, can be close enough to the route
+        records = self.records[candidates]
+        cos_lat = max(math.cos(math.radians(ideal[1])), 1e-6)
+        lng_pad = max_detour_m / (METERS_PER_DEG_LNG_EQUATOR * cos_lat)
+        lat_pad = max_detour_m / METERS_PER_DEG_LAT
+        low, high = vertices.min(axis=0), vertices.max(axis=0)
+        records = records[
+            (records["lng"] >= low[0] - lng_pad)
+            & (records["lng"] <= high[0] + lng_pad)
+            & (records["lat"] >= low[1] - lat_pad)
+            & (records["lat"] <= high[1] + lat_pad)
+        ]
+        if not len(records):
+            return None
+
+        dx = (
+            (records["lng"][:, None] - vertices[None, :, 0])
+            * METERS_PER_DEG_LNG_EQUATOR
+            * cos_lat
+        )
+        dy = (records["lat"][:, None] - vertices[None, :, 1]) * METERS_PER_DEG_LAT
+        off_route = np.hypot(dx, dy)
+        nearest = np.argmin(off_route, axis=1)
+        off_route = off_route[np.arange(len(records)), nearest]
+        moved_back = distance_m - along[nearest]
+
+        cost = np.where(off_route <= max_detour_m, moved_back + 2 * off_route, np.inf)
+        best = int(np.argmin(cost))
+        if not np.isfinite(cost[best]):
+            return None
+        record = records[best]
+        return {
+            "name": str(record["name"]),
+            "kind": KINDS[int(record["kind"])],
+            "lat": float(record["lat"]),
+            "lng": float(record["lng"]),
+            "off_route_miles": round(float(off_route[best]) / METERS_PER_MILE, 2),
+            "miles_before_ideal": round(float(moved_back[best]) / METERS_PER_MILE, 2),
+        }
+
+
+def _kind(value) -> str:
+    kind = str(value or "").strip().lower()
+    kind = KIND_ALIASES.get(kind, kind)
+    return kind if kind in KINDS else "other"
+
+
+def _cell(lng: float, lat: float) -> Tuple[int, int]:
+    row = int(math.floor((min(max(lat, -90.0), 90.0) + 90.0) / CELL_DEG))
+    col = int(math.floor((min(max(lng, -180.0), 180.0) + 180.0) / CELL_DEG))
+    return row, min(col, GRID_COLS - 1)
+
+
+def _cell_keys(lng: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    rows = np.floor((np.clip(lat, -90.0, 90.0) + 90.0) / CELL_DEG).astype(np.int64)
+    cols = np.floor((np.clip(lng, -180.0, 180.0) + 180.0) / CELL_DEG).astype(np.int64)
+    return rows * GRID_COLS + np.minimum(cols, GRID_COLS - 1)
+
+
+def _csv_rows(reader: csv.DictReader) -> List[Tuple[float, float, str, str]]:
+    """(lng, lat, name, kind) rows; lat/latitude and lng/lon/longitude accepted."""
+    rows = []
+    for row in reader:
+        row = {key.strip().lower(): value for key, value in row.items() if key}
+        lat = row.get("lat", row.get("latitude"))
+        lng = row.get("lng", row.get("lon", row.get("longitude")))
+        if lat in (None, "") or lng in (None, ""):
+            continue
+        kind = row.get("kind") or row.get("type") or row.get("amenity")
+        rows.append((float(lng), float(lat), row.get("name", ""), kind))
+    return rows
+
+
+def _geojson_rows(collection: Dict[str, Any]) -> List[Tuple[float, float, str, str]]:
+    """(lng, lat, name, kind) rows from Point features (kind, amenity or highway tag)."""
+    rows = []
+    for feature in collection.get("features", []):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") != "Point":
+            continue
+        props = feature.get("properties") or {}
+        lng, lat = geometry["coordinates"][:2]
+        kind = props.get("kind") or props.get("amenity") or props.get("highway")
+        rows.append((float(lng), float(lat), props.get("name", ""), kind))
+    return rows
+
+
+_facility_index = None
+_facility_index_lock = threading.Lock()
+
+
+def get_facility_index() -> Optional[FacilityIndex]:
+    """Process-wide FacilityIndex from settings.FACILITIES_DATASET (None if unset)."""
+    global _facility_index
+    if _facility_index is None:
+        path = getattr(settings, "FACILITIES_DATASET", "")
+        if not path:
+            return None
+        with _facility_index_lock:
+            if _facility_index is None:
+                _facility_index = FacilityIndex.load(path)
+    return _facility_index
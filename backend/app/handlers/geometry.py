@@ -0,0 +1,243 @@
+"""
+Geometry helpers — Route polyline simplification and encoding
+
+Douglas-Peucker simplification vectorized with NumPy. Coordinates are
+projected to a local equirectangular plane in meters so tolerances are
+distances on the ground rather than raw degrees.
+
+`encode_polyline` is a vectorized Google encoded-polyline writer used by the
+compact response format. `cumulative_distances_m` / `points_at_distances`
+place points by distance along a route; a `RouteIndex` holds that prefix
+array for one route, so a plan builds it once and each lookup is one binary
+search.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEG_LAT = 110_540.0
+METERS_PER_DEG_LNG_EQUATOR = 111_320.0
+WEB_MERCATOR_METERS_PER_PIXEL_Z0 = 156_543.03392
+
+
+def tolerance_for_zoom(zoom: float, latitude: float = 0.0) -> float:
+    """Ground size in meters of one web-map pixel at `zoom` and `latitude`."""
+    return (
+        WEB_MERCATOR_METERS_PER_PIXEL_Z0
+        * math.cos(math.radians(latitude))
+        / (2.0**zoom)
+    )
+
+
+def simplify_coordinates(
+    coords: List[List[float]], tolerance_m: float
+) -> List[List[float]]:
+    """
+    Douglas-Peucker simplify a [lng, lat] list, keeping both endpoints.
+
+    Args:
+        coords: GeoJSON LineString coordinates ([lng, lat] pairs)
+        tolerance_m: Max perpendicular deviation in meters
+
+    Returns:
+        Simplified [lng, lat] list (a subset of the input vertices)
+    """
+    if len(coords) < 3 or tolerance_m <= 0:
+        return [list(c) for c in coords]
+
+    points = np.asarray(coords, dtype=np.float64)
+    keep = _douglas_peucker_mask(_project_to_meters(points), tolerance_m)
+    return points[keep].tolist()
+
+
+def simplify_route(route_data: Dict[str, Any], tolerance_m: float) -> Dict[str, Any]:
+    """
+    Return a copy of `route_data` with simplified overview and leg geometry.
+
+    Adds route["simplification"] with the tolerance and point counts.
+    """
+    original = route_data["geometry"]["coordinates"]
+    simplified = simplify_coordinates(original, tolerance_m)
+
+    legs = []
+    for leg in route_data.get("legs", []):
+        leg = dict(leg)
+        if "geometry" in leg:
+            leg["geometry"] = {
+                "type": "LineString",
+                "coordinates": simplify_coordinates(
+                    leg["geometry"]["coordinates"], tolerance_m
+                ),
+            }
+        legs.append(leg)
+
+    return {
+        **route_data,
+        "geometry": {"type": "LineString", "coordinates": simplified},
+        "legs": legs,
+        "simplification": {
+            "tolerance_m": round(tolerance_m, 3),
+            "original_points": len(original),
+            "points": len(simplified),
+        },
+    }
+
+
+def resolve_tolerance(
+    coords: List[List[float]],
+    tolerance_m: Optional[float] = None,
+    zoom: Optional[float] = None,
+) -> Optional[float]:
+    """Pick an explicit tolerance, or derive one pixel's size from `zoom`."""
+    if tolerance_m is not None:
+        return tolerance_m
+    if zoom is None or not coords:
+        return None
+    mean_lat = float(np.mean(np.asarray(coords, dtype=np.float64)[:, 1]))
+    return tolerance_for_zoom(zoom, mean_lat)
+
+
+def encode_polyline(coords: List[List[float]], precision: int = 5) -> str:
+    """
+    Encode [lng, lat] pairs as a Google encoded polyline (lat, lng order).
+
+    Byte-for-byte identical to `polyline.encode`, but vectorized: every value
+    is split into its 5-bit chunks at once instead of looping per character.
+    """
+    if not coords:
+        return ""
+
+    scaled = np.rint(
+        np.asarray(coords, dtype=np.float64)[:, ::-1] * (10**precision)
+    ).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    values = deltas.ravel()  # lat0, lng0, dlat1, dlng1, ...
+
+    # Zig-zag: sign moves to the low bit
+    values = np.where(values < 0, ~(values << 1), values << 1)
+
+    # Up to 7 five-bit chunks per value (enough for 35-bit magnitudes)
+    shifts = np.arange(7, dtype=np.int64) * 5
+    chunks = (values[:, None] >> shifts) & 0x1F
+    chunk_count = np.maximum(
+        1, 7 - np.argmax((values[:, None] >> shifts)[:, ::-1] > 0, axis=1)
+    )
+    chunk_count[values == 0] = 1
+    used = np.arange(7)[None, :] < chunk_count[:, None]
+    more = np.arange(7)[None, :] < (chunk_count - 1)[:, None]
+
+    encoded = (chunks | np.where(more, 0x20, 0)) + 63
+    return encoded[used].astype(np.uint8).tobytes().decode("ascii")
+
+
+def cumulative_distances_m(coords: List[List[float]]) -> np.ndarray:
+    """Great-circle distance in meters from the first [lng, lat] to each one."""
+    if len(coords) == 0:
+        return np.zeros(0)
+    radians = np.radians(np.asarray(coords, dtype=np.float64))
+    lng, lat = radians[:, 0], radians[:, 1]
+    h = (
+        np.sin(np.diff(lat) / 2) ** 2
+        + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    )
+    steps = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+
+def points_at_distances(
+    coords: List[List[float]], cumulative: np.ndarray, distances_m
+) -> List[List[float]]:
+    """[lng, lat] at each distance along the line, interpolated between vertices."""
+    points = np.asarray(coords, dtype=np.float64)
+    distances = np.clip(np.asarray(distances_m, dtype=np.float64), 0, cumulative[-1])
+    upper = np.clip(np.searchsorted(cumulative, distances), 1, len(points) - 1)
+    lower = upper - 1
+    span = cumulative[upper] - cumulative[lower]
+    t = np.divide(
+        distances - cumulative[lower],
+        span,
+        out=np.zeros_like(distances),
+        where=span > 0,
+    )
+    return (points[lower] + (points[upper] - points[lower]) * t[:, None]).tolist()
+
+
+class RouteIndex:
+    """
+    Cumulative-distance index over a route polyline.
+
+    Built once (vectorized haversine and prefix sum); each lookup is a
+    binary search plus one interpolation, so k points cost O(k log n).
+    """
+
+    __slots__ = ("points", "cumulative_m")
+
+    def __init__(self, coords: List[List[float]]):
+        self.points = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.cumulative_m = cumulative_distances_m(self.points)
+
+    @property
+    def length_m(self) -> float:
+        return float(self.cumulative_m[-1]) if len(self.cumulative_m) else 0.0
+
+    def points_at_distances(self, distances_m) -> List[List[float]]:
+        """[lng, lat] at each distance in meters from the start (clamped)."""
+        if len(self.points) == 1:
+            return [self.points[0].tolist() for _ in np.atleast_1d(distances_m)]
+        return points_at_distances(self.points, self.cumulative_m, distances_m)
+
+    def points_at_fractions(self, fractions) -> List[List[float]]:
+        """[lng, lat] at each fraction (0–1) of the route's length."""
+        return self.points_at_distances(
+            np.asarray(fractions, dtype=np.float64) * self.length_m
+        )
+
+
+def _project_to_meters(points: np.ndarray) -> np.ndarray:
+    """Equirectangular projection around the mean latitude ([lng, lat] → [x, y])."""
+    cos_lat = math.cos(math.radians(float(points[:, 1].mean())))
+    return np.column_stack(
+        (
+            points[:, 0] * METERS_PER_DEG_LNG_EQUATOR * cos_lat,
+            points[:, 1] * METERS_PER_DEG_LAT,
+        )
+    )
+
+
+def _douglas_peucker_mask(xy: np.ndarray, tolerance: float) -> np.ndarray:
+    """Iterative Douglas-Peucker; each split scores its whole span in one pass."""
+    n = len(xy)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        start = xy[first]
+        seg = xy[last] - start
+        span = xy[first + 1 : last] - start
+        seg_len_sq = float(seg @ seg)
+
+        if seg_len_sq == 0.0:
+            dist_sq = np.einsum("ij,ij->i", span, span)
+        else:
+            # Distance to the segment (not the infinite line)
+            t = np.clip((span @ seg) / seg_len_sq, 0.0, 1.0)
+            offset = span - np.outer(t, seg)
+            dist_sq = np.einsum("ij,ij->i", offset, offset)
+
+        index = int(np.argmax(dist_sq))
+        if dist_sq[index] > tolerance_sq:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    return keep
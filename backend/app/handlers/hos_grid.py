@@ -0,0 +1,214 @@
+"""
+HOS Grid Simulator — Vectorized what-if runs of HosRulesHandler
+
+Evaluates one skeleton timeline for every combination of departure time ×
+starting cycle hours. Rules, priorities and tolerances are the same as
+HosRulesHandler with a scalar `current_cycle_used_hours` (no rolling
+history), where no rule reads the clock: elapsed time and stop counts depend
+on the cycle hours alone, and a departure only shifts the arrival.
+
+So only the cycle-hours columns are simulated, in a single NumPy pass: the
+HOS state is an array over the columns, and each event of HosRulesHandler's
+queue is one row of an (events, cols) array. Per step, every column takes its
+own next event (argmin over that axis, ties in priority order), then drives
+to it or inserts its rest via boolean masks. The loop runs over skeleton
+segments and over the most events any column emits within a leg, never over
+columns. Each departure row is then its start plus the column's elapsed
+time, accumulated in the same integer microseconds with the same float
+operations, so every cell's arrival matches a full simulation exactly.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from .hos_rule_sets import (
+    BREAK,
+    DRIVE_LIMIT,
+    EPSILON_HOURS,
+    EPSILON_MILES,
+    FUEL,
+    HOUR_US,
+    RESTART,
+    WINDOW,
+    CompiledRuleSet,
+    get_rule_set,
+    to_microseconds,
+)
+
+_NO_SHIFT = -1  # shift_start_us of columns not in a shift
+
+
+class HosGridSimulator:
+    """Run HosRulesHandler's rules over a start_datetime × cycle-hours grid."""
+
+    @staticmethod
+    def execute(
+        skeleton_segments: List[Dict[str, Any]],
+        start_datetimes: List[datetime],
+        cycle_used_hours: List[float],
+        rule_set: Union[str, CompiledRuleSet, None] = None,
+    ) -> Dict[str, Any]:
+        """
+        Simulate every (start_datetime, current_cycle_used_hours) cell.
+
+        Args:
+            skeleton_segments: Same skeleton HosRulesHandler takes
+            start_datetimes: Departure times (rows of the grid)
+            cycle_used_hours: Starting cycle usage (columns)
+            rule_set: Rule set name or CompiledRuleSet (default property_70_8)
+
+        Returns:
+            {
+                "arrivals": [[datetime, ...], ...],  # End of the last segment
+                "elapsed_hours": ndarray (rows, cols),  # Rows are read-only
+                    # broadcasts of one simulated row, as are the counts
+                "breaks": ndarray,     # 30-min breaks (8-hour rule)
+                "resets": ndarray,     # 10-hour resets (11-hour / 14-hour)
+                "restarts": ndarray,   # 34-hour cycle restarts
+                "fuel_stops": ndarray
+            }
+        """
+        rules = (
+            rule_set
+            if isinstance(rule_set, CompiledRuleSet)
+            else get_rule_set(rule_set)
+        )
+        events = rules.events
+        shape = (len(cycle_used_hours),)
+
+        # HOS state, one value per cycle-hours column
+        elapsed_us = np.zeros(shape, dtype=np.int64)
+        shift_start_us = np.full(shape, _NO_SHIFT, dtype=np.int64)
+        drive_in_shift = np.zeros(shape)
+        drive_since_break = np.zeros(shape)
+        distance_since_fuel = np.zeros(shape)
+        cycle_used_total = np.array(cycle_used_hours, dtype=float)
+
+        counts = {event: np.zeros(shape, dtype=np.int64) for event in events}
+
+        for skel_seg in skeleton_segments:
+            status = skel_seg["status"]
+            duration = skel_seg["duration_hours"]
+            miles = skel_seg["miles"]
+            total_us = to_microseconds(duration)
+
+            if status != "D" or total_us <= 0:
+                if status == "ON":
+                    np.copyto(
+                        shift_start_us, elapsed_us, where=shift_start_us == _NO_SHIFT
+                    )
+                    cycle_used_total += total_us / HOUR_US
+                elif status == "OFF":
+                    if total_us >= rules.restart_us:
+                        cycle_used_total[:] = 0.0
+                    if total_us >= rules.reset_us:
+                        shift_start_us[:] = _NO_SHIFT
+                        drive_in_shift[:] = 0.0
+                elif status == "D":
+                    distance_since_fuel += miles
+                if status != "D" and total_us >= rules.break_us:
+                    drive_since_break[:] = 0.0
+                elapsed_us += total_us
+                continue
+
+            remaining_us = np.full(shape, total_us, dtype=np.int64)
+            remaining_miles = np.full(shape, float(miles))
+            while True:
+                active = remaining_us > 0
+                if not active.any():
+                    break
+                np.copyto(
+                    shift_start_us,
+                    elapsed_us,
+                    where=active & (shift_start_us == _NO_SHIFT),
+                )
+
+                # Next event per column: rows in priority order, leg end last
+                pending = []
+                for event in events:
+                    if event == RESTART:
+                        left = rules.cycle_limit_hours - cycle_used_total
+                    elif event == DRIVE_LIMIT:
+                        left = rules.drive_limit_hours - drive_in_shift
+                    elif event == WINDOW:
+                        left = (
+                            rules.duty_window_hours
+                            - (elapsed_us - shift_start_us) / HOUR_US
+                        )
+                    elif event == FUEL:
+                        if miles <= 0:
+                            left = np.full(shape, np.inf)
+                        else:
+                            miles_left = rules.fuel_interval_miles - distance_since_fuel
+                            left = np.where(
+                                miles_left <= EPSILON_MILES,
+                                0.0,
+                                miles_left * duration / miles,
+                            )
+                    else:
+                        left = rules.break_after_drive_hours - drive_since_break
+                    pending.append(np.where(left <= EPSILON_HOURS, 0.0, left))
+                pending.append(remaining_us / HOUR_US)
+                pending = np.stack(pending)
+                chosen = pending.argmin(axis=0)
+                left = np.take_along_axis(pending, chosen[None], axis=0)[0]
+
+                # Nothing binds yet: drive up to the next event
+                drive = active & (left > 0.0)
+                step_us = np.minimum(
+                    np.rint(np.where(drive, left, 0.0) * HOUR_US).astype(np.int64),
+                    remaining_us,
+                )
+                step_miles = np.where(
+                    step_us == remaining_us,
+                    remaining_miles,
+                    miles * step_us / total_us,
+                )
+                step_miles[~drive] = 0.0
+                step_hours = step_us / HOUR_US
+                cycle_used_total += step_hours
+                drive_in_shift += step_hours
+                drive_since_break += step_hours
+                distance_since_fuel += step_miles
+                remaining_miles -= step_miles
+                remaining_us -= step_us
+                elapsed_us += step_us
+
+                # A limit binds now: insert its rest segment
+                for priority, event in enumerate(events):
+                    rest = active & ~drive & (chosen == priority)
+                    if not rest.any():
+                        continue
+                    rest_us = rules.rests[event][1]
+                    counts[event] += rest
+                    elapsed_us[rest] += rest_us
+                    if event == FUEL:
+                        cycle_used_total[rest] += rest_us / HOUR_US
+                        distance_since_fuel[rest] = 0.0
+                        if rest_us >= rules.break_us:
+                            drive_since_break[rest] = 0.0
+                    elif event == BREAK:
+                        drive_since_break[rest] = 0.0
+                    else:
+                        if event == RESTART:
+                            cycle_used_total[rest] = 0.0
+                        shift_start_us[rest] = _NO_SHIFT
+                        drive_in_shift[rest] = 0.0
+                        drive_since_break[rest] = 0.0
+
+        # Every departure row shares the columns' outcome
+        grid = (len(start_datetimes), len(cycle_used_hours))
+        elapsed = [timedelta(microseconds=us) for us in elapsed_us.tolist()]
+        zeros = np.zeros(shape, dtype=np.int64)
+        return {
+            "arrivals": [
+                [start + delta for delta in elapsed] for start in start_datetimes
+            ],
+            "elapsed_hours": np.broadcast_to(elapsed_us / HOUR_US, grid),
+            "breaks": np.broadcast_to(counts.get(BREAK, zeros), grid),
+            "resets": np.broadcast_to(counts[DRIVE_LIMIT] + counts[WINDOW], grid),
+            "restarts": np.broadcast_to(counts[RESTART], grid),
+            "fuel_stops": np.broadcast_to(counts.get(FUEL, zeros), grid),
+        }
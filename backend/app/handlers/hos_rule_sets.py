@@ -0,0 +1,308 @@
+"""
+HOS Rule Sets — Declarative limits compiled for the HOS simulators
+
+A `RuleSet` names the limits of one regulatory regime. `compile()` turns it
+into a `CompiledRuleSet`: the tuple of limit events (one per enabled rule)
+that HosRulesHandler and HosGridSimulator queue while driving, plus the rest
+segment each event inserts (duration in microseconds, note, warning). A
+disabled rule is simply absent from the tuple, so it costs nothing in the
+loop.
+
+Built-in sets (all property-carrying, FMCSA Part 395):
+- property_70_8: 70 hours / 8 days (default; the original hard-coded limits)
+- property_60_7: 60 hours / 7 days
+- short_haul_70_8 / short_haul_60_7: 395.1(e)(1) short-haul exemption,
+  which drops the 30-minute break requirement
+
+`get_rule_set(name, fuel_interval_miles)` returns a compiled set. Built-ins
+compile once at import; a fuel-interval override is applied per call to a
+copy of the compiled built-in, so client-chosen intervals are never cached.
+"""
+
+from typing import Dict, Optional, Tuple
+
+# Limit events, in priority order when several bind at once
+RESTART = "restart"  # Cycle limit reached: 34-hour restart (or wait for roll-off)
+DRIVE_LIMIT = "drive_limit"  # 11 hours driven in the shift: 10-hour reset
+WINDOW = "window"  # 14 hours since shift start: 10-hour reset
+FUEL = "fuel"  # Fuel interval driven: fuel stop
+BREAK = "break"  # 8 hours driven since a break: 30-minute break
+PRIORITY = (RESTART, DRIVE_LIMIT, WINDOW, FUEL, BREAK)
+
+# Simulators keep time in integer microseconds; limits within these
+# tolerances of zero count as reached
+HOUR_US = 3_600_000_000
+EPSILON_HOURS = 1e-9
+EPSILON_MILES = 1e-6
+
+DEFAULT_RULE_SET = "property_70_8"
+
+
+def to_microseconds(hours: float) -> int:
+    """Hours as whole microseconds (round half to even, like numpy.rint)."""
+    return round(hours * HOUR_US)
+
+
+class RuleSet:
+    """Limits of one HOS regime. `None` disables an optional rule."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        break_after_drive_hours: Optional[float] = 8.0,
+        break_minutes: float = 30,
+        drive_limit_hours: float = 11.0,
+        duty_window_hours: float = 14.0,
+        reset_hours: float = 10.0,
+        cycle_limit_hours: float = 70.0,
+        cycle_days: int = 8,
+        restart_hours: float = 34.0,
+        fuel_interval_miles: Optional[float] = 1000.0,
+        fuel_minutes: float = 30,
+        sleeper_min_hours: Optional[float] = 7.0,
+        split_off_min_hours: float = 2.0,
+    ):
+        self.name = name
+        self.description = description
+        self.break_after_drive_hours = break_after_drive_hours
+        self.break_minutes = break_minutes
+        self.drive_limit_hours = drive_limit_hours
+        self.duty_window_hours = duty_window_hours
+        self.reset_hours = reset_hours
+        self.cycle_limit_hours = cycle_limit_hours
+        self.cycle_days = cycle_days
+        self.restart_hours = restart_hours
+        self.fuel_interval_miles = fuel_interval_miles
+        self.fuel_minutes = fuel_minutes
+        self.sleeper_min_hours = sleeper_min_hours
+        self.split_off_min_hours = split_off_min_hours
+
+    def compile(self) -> "CompiledRuleSet":
+        reset_us = to_microseconds(self.reset_hours)
+        reset = f"{self.reset_hours:g}-hour reset"
+        rests = {
+            RESTART: (
+                "OFF",
+                to_microseconds(self.restart_hours),
+                f"{self.restart_hours:g}-hour cycle restart "
+                f"({self.cycle_limit_hours:g}-hour limit)",
+                f"{self.cycle_limit_hours:g}-hour/{self.cycle_days}-day cycle "
+                f"limit reached; {self.restart_hours:g}-hour restart inserted.",
+            ),
+            DRIVE_LIMIT: (
+                "OFF",
+                reset_us,
+                f"{reset} ({self.drive_limit_hours:g}-hour driving limit)",
+                f"{self.drive_limit_hours:g}-hour driving limit reached; "
+                f"{reset} inserted.",
+            ),
+            WINDOW: (
+                "OFF",
+                reset_us,
+                f"{reset} ({self.duty_window_hours:g}-hour window violated)",
+                f"{self.duty_window_hours:g}-hour driving window exceeded; "
+                f"{reset} inserted.",
+            ),
+            FUEL: (
+                "ON",
+                to_microseconds(self.fuel_minutes / 60.0),
+                f"Fuel stop ({self.fuel_minutes:g} min)",
+                None,
+            ),
+        }
+        events = [RESTART, DRIVE_LIMIT, WINDOW]
+        if self.fuel_interval_miles is not None:
+            events.append(FUEL)
+        if self.break_after_drive_hours is not None:
+            events.append(BREAK)
+            rests[BREAK] = (
+                "OFF",
+                to_microseconds(self.break_minutes / 60.0),
+                f"{self.break_minutes:g}-min break "
+                f"({self.break_after_drive_hours:g}-hour rule)",
+                None,
+            )
+        # Rolling cycles: off duty until hours roll off, when that beats the restart
+        roll_off = (
+            "OFF",
+            f"Off duty until cycle hours roll off "
+            f"({self.cycle_limit_hours:g}-hour limit)",
+            f"{self.cycle_limit_hours:g}-hour/{self.cycle_days}-day cycle limit "
+            f"reached; off duty until hours roll off (shorter than a "
+            f"{self.restart_hours:g}-hour restart).",
+        )
+        return CompiledRuleSet(
+            self, tuple(events), rests, self._split_periods(), roll_off
+        )
+
+    def _split_periods(self) -> Tuple[Tuple[str, int, str], ...]:
+        """
+        Sleeper-berth split periods a planner may insert instead of a reset:
+        the shortest qualifying sleeper period with its complement (7/3) and
+        the shortest other period with its complement (8/2).
+        """
+        if self.sleeper_min_hours is None:
+            return ()
+        periods = []
+        for sleeper, off in (
+            (self.sleeper_min_hours, self.reset_hours - self.sleeper_min_hours),
+            (self.reset_hours - self.split_off_min_hours, self.split_off_min_hours),
+        ):
+            split = f"{sleeper:g}/{off:g} split"
+            periods.append(
+                (
+                    "SB",
+                    to_microseconds(sleeper),
+                    f"{sleeper:g}-hour sleeper berth rest ({split})",
+                )
+            )
+            periods.append(
+                ("OFF", to_microseconds(off), f"{off:g}-hour off-duty rest ({split})")
+            )
+        return tuple(periods)
+
+
+class CompiledRuleSet:
+    """
+    A RuleSet ready for the simulators.
+
+    `events` lists the enabled limit events in priority order (the first one
+    wins when several bind at the same instant). `rests[event]` is the
+    (status, duration_us, note, warning) segment inserted when it binds.
+    `split_periods` are (status, duration_us, note) sleeper-berth split
+    periods, empty when the rule set does not allow splits. `roll_off_rest`
+    is the (status, note, warning) of an off-duty wait for rolling-cycle
+    hours to drop out, used instead of the restart when it is shorter.
+    """
+
+    __slots__ = (
+        "name",
+        "events",
+        "rests",
+        "break_after_drive_hours",
+        "drive_limit_hours",
+        "duty_window_hours",
+        "cycle_limit_hours",
+        "cycle_days",
+        "fuel_interval_miles",
+        "break_us",
+        "reset_us",
+        "restart_us",
+        "split_periods",
+        "roll_off_rest",
+        "sleeper_min_us",
+        "split_off_min_us",
+    )
+
+    def __init__(
+        self,
+        rule_set: RuleSet,
+        events: Tuple[str, ...],
+        rests: Dict[str, Tuple[str, int, str, Optional[str]]],
+        split_periods: Tuple[Tuple[str, int, str], ...] = (),
+        roll_off_rest: Optional[Tuple[str, str, str]] = None,
+    ):
+        self.name = rule_set.name
+        self.events = events
+        self.rests = rests
+        self.break_after_drive_hours = rule_set.break_after_drive_hours
+        self.drive_limit_hours = rule_set.drive_limit_hours
+        self.duty_window_hours = rule_set.duty_window_hours
+        self.cycle_limit_hours = rule_set.cycle_limit_hours
+        self.cycle_days = rule_set.cycle_days
+        self.fuel_interval_miles = rule_set.fuel_interval_miles
+        self.break_us = to_microseconds(rule_set.break_minutes / 60.0)
+        self.reset_us = rests[DRIVE_LIMIT][1]
+        self.restart_us = rests[RESTART][1]
+        self.split_periods = split_periods
+        self.roll_off_rest = roll_off_rest
+        self.sleeper_min_us = (
+            None
+            if rule_set.sleeper_min_hours is None
+            else to_microseconds(rule_set.sleeper_min_hours)
+        )
+        self.split_off_min_us = to_microseconds(rule_set.split_off_min_hours)
+
+    def pairs_split(
+        self, first_us: int, first_sleeper: bool, second_us: int, second_sleeper: bool
+    ) -> bool:
+        """
+        Do two rest periods form a qualifying split (395.1(g)(1)(ii)): one in
+        the sleeper berth of at least 7 hours, the other at least 2 hours, 10
+        hours together?
+        """
+        if self.sleeper_min_us is None or first_us + second_us < self.reset_us:
+            return False
+        return (
+            first_sleeper
+            and first_us >= self.sleeper_min_us
+            and second_us >= self.split_off_min_us
+        ) or (
+            second_sleeper
+            and second_us >= self.sleeper_min_us
+            and first_us >= self.split_off_min_us
+        )
+
+    def with_fuel_interval(self, miles: Optional[float]) -> "CompiledRuleSet":
+        """Copy of this compiled set with another fuel interval (None disables it)."""
+        copy = CompiledRuleSet.__new__(CompiledRuleSet)
+        for slot in self.__slots__:
+            setattr(copy, slot, getattr(self, slot))
+        copy.fuel_interval_miles = miles
+        copy.events = tuple(
+            event
+            for event in PRIORITY
+            if (miles is not None if event == FUEL else event in self.events)
+        )
+        return copy
+
+    def __repr__(self) -> str:
+        return f"CompiledRuleSet({self.name!r}, events={self.events})"
+
+
+RULE_SETS: Dict[str, RuleSet] = {
+    rule_set.name: rule_set
+    for rule_set in (
+        RuleSet("property_70_8", "Property-carrying, 70 hours / 8 days"),
+        RuleSet(
+            "property_60_7",
+            "Property-carrying, 60 hours / 7 days",
+            cycle_limit_hours=60.0,
+            cycle_days=7,
+        ),
+        RuleSet(
+            "short_haul_70_8",
+            "Short-haul exemption (no 30-minute break), 70 hours / 8 days",
+            break_after_drive_hours=None,
+        ),
+        RuleSet(
+            "short_haul_60_7",
+            "Short-haul exemption (no 30-minute break), 60 hours / 7 days",
+            break_after_drive_hours=None,
+            cycle_limit_hours=60.0,
+            cycle_days=7,
+        ),
+    )
+}
+
+_compiled = {name: rule_set.compile() for name, rule_set in RULE_SETS.items()}
+
+
+def get_rule_set(
+    name: Optional[str] = None, fuel_interval_miles: Optional[float] = None
+) -> CompiledRuleSet:
+    """
+    Compiled rule set by name (default: property_70_8).
+
+    `fuel_interval_miles` overrides the set's fuel interval on a per-call
+    copy; only the named built-ins are cached.
+    """
+    name = name or DEFAULT_RULE_SET
+    try:
+        compiled = _compiled[name]
+    except KeyError:
+        raise ValueError(f"Unknown rule set: {name}")
+    if fuel_interval_miles is None:
+        return compiled
+    return compiled.with_fuel_interval(fuel_interval_miles)
@@ -0,0 +1,469 @@
+"""
+HOS State — One driver's HOS clock while a skeleton timeline is simulated
+
+HosState holds the event-driven simulation behind HosRulesHandler: the
+elapsed time, shift and break counters, the duty cycle and the position in
+the skeleton. `advance()` runs the timeline forward, cutting drive legs at
+the next binding limit and inserting each limit's rest, and can instead stop
+at chosen limits so a caller decides which rest to take (SleeperSplitPlanner
+does this to try sleeper-berth splits).
+
+States are cheap to fork: `copy()` duplicates the counters and cycle, while
+emitted segments and warnings are shared linked lists, so a branch only
+stores what it adds.
+
+`checkpoint()` exports the driver's counters (shift, break, fuel distance,
+cycle, unpaired split period) as JSON-safe values, and `from_checkpoint()`
+resumes from them on a new skeleton. `record()` applies duty-status events
+as they actually happened, so a mid-trip re-plan starts from the driver's
+real clock instead of the original plan's.
+
+Time is kept in integer microseconds and the float operations mirror
+HosGridSimulator, so both simulators make identical decisions.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .duty_cycle import cycle_from_checkpoint, make_cycle
+from .hos_rule_sets import (
+    BREAK,
+    DRIVE_LIMIT,
+    EPSILON_HOURS,
+    EPSILON_MILES,
+    FUEL,
+    HOUR_US,
+    RESTART,
+    WINDOW,
+    CompiledRuleSet,
+    to_microseconds,
+)
+from .segments import Segment
+
+
+class HosState:
+    """Mutable HOS simulation state; see the module docstring."""
+
+    __slots__ = (
+        "rules",
+        "start_datetime",
+        "elapsed_us",
+        "shift_start_us",
+        "drive_in_shift",
+        "drive_since_break",
+        "distance_since_fuel",
+        "cycle",
+        "position",
+        "leg_remaining_us",
+        "leg_remaining_miles",
+        "split_first",
+        "split_anchor_us",
+        "drive_since_split",
+        "rest_us",
+        "_segments",
+        "_warnings",
+    )
+
+    def __init__(
+        self,
+        rules: CompiledRuleSet,
+        current_cycle_used_hours: float,
+        start_datetime: datetime,
+        cycle_history_hours: Optional[List[float]] = None,
+    ):
+        self.rules = rules
+        self.start_datetime = start_datetime
+        self.elapsed_us = 0
+
+        # Shift state: shift_start_us is None until on-duty time starts a shift
+        self.shift_start_us = None
+        self.drive_in_shift = 0.0
+        self.drive_since_break = 0.0
+        self.distance_since_fuel = 0.0
+        self.cycle = make_cycle(
+            current_cycle_used_hours,
+            cycle_history_hours,
+            start_datetime,
+            rules.cycle_days,
+            rules.cycle_limit_hours,
+        )
+
+        # Skeleton index, and what is left of a drive leg cut by a limit
+        self.position = 0
+        self.leg_remaining_us = None
+        self.leg_remaining_miles = 0.0
+
+        # Sleeper-berth split: the unpaired first period as
+        # (duration_us, in sleeper berth), when it ended, driving since then
+        self.split_first = None
+        self.split_anchor_us = 0
+        self.drive_since_split = 0.0
+
+        self.rest_us = 0  # Inserted rest, breaks and fuel stops
+        self._segments = None  # (Segment, previous) linked list, newest first
+        self._warnings = None
+
+    @staticmethod
+    def start(
+        rules: CompiledRuleSet,
+        current_cycle_used_hours: float,
+        start_datetime: datetime,
+        cycle_history_hours: Optional[List[float]] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ) -> "HosState":
+        """A fresh state, or one resumed from `checkpoint` when given."""
+        if checkpoint is not None:
+            return HosState.from_checkpoint(rules, checkpoint)
+        return HosState(
+            rules, current_cycle_used_hours, start_datetime, cycle_history_hours
+        )
+
+    @staticmethod
+    def from_checkpoint(
+        rules: CompiledRuleSet, checkpoint: Dict[str, Any]
+    ) -> "HosState":
+        """
+        Resume from `checkpoint()` output; the clock starts at its "at".
+
+        Times may be ISO strings or datetimes. Counters that started before
+        "at" (shift start, unpaired split period) sit at negative offsets.
+        """
+        start_datetime = _as_datetime(checkpoint["at"])
+        state = HosState(rules, 0.0, start_datetime)
+        if checkpoint.get("shift_started_at") is not None:
+            state.shift_start_us = _microseconds_between(
+                start_datetime, _as_datetime(checkpoint["shift_started_at"])
+            )
+        state.drive_in_shift = checkpoint.get("drive_in_shift_hours", 0.0)
+        state.drive_since_break = checkpoint.get("drive_since_break_hours", 0.0)
+        state.distance_since_fuel = checkpoint.get("distance_since_fuel_miles", 0.0)
+        state.cycle = cycle_from_checkpoint(
+            checkpoint["cycle"], rules.cycle_days, rules.cycle_limit_hours
+        )
+        split = checkpoint.get("split")
+        if split is not None:
+            state.split_first = (
+                to_microseconds(split["hours"]),
+                split["sleeper_berth"],
+            )
+            state.split_anchor_us = _microseconds_between(
+                start_datetime, _as_datetime(split["ended_at"])
+            )
+            state.drive_since_split = split.get("drive_since_hours", 0.0)
+        return state
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """
+        The driver's counters at the current time, JSON-safe.
+
+        Only the clock is exported, not the skeleton position, so a plan
+        can resume from it on another skeleton (see `from_checkpoint`).
+        """
+        split = None
+        if self.split_first is not None:
+            split = {
+                "hours": self.split_first[0] / HOUR_US,
+                "sleeper_berth": self.split_first[1],
+                "ended_at": self._at(self.split_anchor_us).isoformat(),
+                "drive_since_hours": self.drive_since_split,
+            }
+        return {
+            "at": self._now().isoformat(),
+            "shift_started_at": (
+                None
+                if self.shift_start_us is None
+                else self._at(self.shift_start_us).isoformat()
+            ),
+            "drive_in_shift_hours": self.drive_in_shift,
+            "drive_since_break_hours": self.drive_since_break,
+            "distance_since_fuel_miles": self.distance_since_fuel,
+            "cycle": self.cycle.checkpoint(),
+            "split": split,
+        }
+
+    def copy(self) -> "HosState":
+        """Fork this state; the copy shares emitted segments, not counters."""
+        copy = HosState.__new__(HosState)
+        for name in HosState.__slots__:
+            setattr(copy, name, getattr(self, name))
+        copy.cycle = self.cycle.copy()
+        return copy
+
+    def result(self) -> Dict[str, Any]:
+        """Segments and warnings in timeline order, plus the end checkpoint."""
+        return {
+            "segments": _unlink(self._segments),
+            "warnings": _unlink(self._warnings),
+            "checkpoint": self.checkpoint(),
+        }
+
+    def advance(
+        self, skeleton_segments: List[Dict[str, Any]], choices: tuple = ()
+    ) -> Optional[str]:
+        """
+        Simulate from the current position.
+
+        Args:
+            skeleton_segments: The skeleton this state was started on
+            choices: Limit events to hand back instead of resting
+
+        Returns:
+            The binding event from `choices` (the state stops right before
+            its rest), or None once the whole skeleton has been simulated
+        """
+        rules = self.rules
+        events = rules.events
+        leg_end = len(events)  # Lowest priority: drive to the end of the leg
+
+        while self.position < len(skeleton_segments):
+            skel_seg = skeleton_segments[self.position]
+            status = skel_seg["status"]
+            duration = skel_seg["duration_hours"]
+            miles = skel_seg["miles"]
+            note = skel_seg.get("note", "")
+            total_us = to_microseconds(duration)
+
+            if status != "D" or total_us <= 0:
+                now = self._now()
+                self._emit(now, total_us, status, miles, note)
+                if status == "ON":
+                    if self.shift_start_us is None:
+                        self.shift_start_us = self.elapsed_us
+                    self.cycle.add(now, total_us / HOUR_US)
+                elif status == "OFF":
+                    if total_us >= rules.restart_us:
+                        self.cycle.restart()
+                    if total_us >= rules.reset_us:
+                        self._end_shift()
+                elif status == "D":
+                    self.distance_since_fuel += miles
+                if status != "D" and total_us >= rules.break_us:
+                    self.drive_since_break = 0.0
+                self.elapsed_us += total_us
+                self.position += 1
+                continue
+
+            if self.leg_remaining_us is None:
+                self.leg_remaining_us = total_us
+                self.leg_remaining_miles = miles
+
+            while self.leg_remaining_us > 0:
+                now = self._now()
+                if self.shift_start_us is None:
+                    self.shift_start_us = self.elapsed_us
+
+                # Next event: driving hours left until each limit binds
+                pending = [(self.leg_remaining_us / HOUR_US, leg_end, None)]
+                for priority, event in enumerate(events):
+                    if event == RESTART:
+                        left = self.cycle.hours_until_limit(now)
+                    elif event == DRIVE_LIMIT:
+                        left = rules.drive_limit_hours - self.drive_in_shift
+                    elif event == WINDOW:
+                        left = (
+                            rules.duty_window_hours
+                            - (self.elapsed_us - self.shift_start_us) / HOUR_US
+                        )
+                    elif event == FUEL:
+                        if miles <= 0:
+                            continue
+                        miles_left = (
+                            rules.fuel_interval_miles - self.distance_since_fuel
+                        )
+                        left = (
+                            0.0
+                            if miles_left <= EPSILON_MILES
+                            else miles_left * duration / miles
+                        )
+                    else:
+                        left = rules.break_after_drive_hours - self.drive_since_break
+                    pending.append(
+                        (0.0 if left <= EPSILON_HOURS else left, priority, event)
+                    )
+                left, _, event = min(pending)
+
+                if left > 0.0:
+                    # Nothing binds yet: drive up to the next event
+                    self._drive(now, left, total_us, miles, note)
+                elif event in choices:
+                    return event
+                else:
+                    self.rest(event)
+
+            self.leg_remaining_us = None
+            self.position += 1
+        return None
+
+    def rest(self, event: str) -> None:
+        """
+        Insert the rule set's rest for a binding limit event.
+
+        At the cycle limit, a rolling cycle may free hours sooner than a
+        restart: the driver then stays off duty until enough hours roll off,
+        but for at least a reset, whenever that is shorter than the restart.
+        """
+        rules = self.rules
+        rest_status, rest_us, rest_note, warning = rules.rests[event]
+        now = self._now()
+        restart = event == RESTART
+        if restart and rules.roll_off_rest is not None:
+            room_at = self.cycle.next_room(now, EPSILON_HOURS)
+            if room_at is not None:
+                wait_us = max(_microseconds_between(now, room_at), rules.reset_us)
+                if wait_us < rest_us:
+                    rest_status, rest_note, warning = rules.roll_off_rest
+                    rest_us = wait_us
+                    restart = False
+        self._emit(now, rest_us, rest_status, 0, rest_note)
+        if warning:
+            self._warnings = (warning, self._warnings)
+        self.elapsed_us += rest_us
+        self.rest_us += rest_us
+        if event == FUEL:
+            self.cycle.add(now, rest_us / HOUR_US)
+            self.distance_since_fuel = 0.0
+            if rest_us >= rules.break_us:
+                self.drive_since_break = 0.0
+        elif event == BREAK:
+            self.drive_since_break = 0.0
+        else:
+            if restart:
+                self.cycle.restart()
+            self._end_shift()
+
+    def split_rest(self, status: str, rest_us: int, note: str) -> None:
+        """
+        Insert one sleeper-berth split period ("SB" or "OFF").
+
+        When it pairs with the previous unpaired period, the 11-hour and
+        14-hour limits are recalculated from the end of that earlier period:
+        only driving and time since then count, excluding this period. This
+        period then becomes the first of the next possible pair.
+        """
+        start_us = self.elapsed_us
+        self._emit(self._now(), rest_us, status, 0, note)
+        self.elapsed_us += rest_us
+        self.rest_us += rest_us
+        if rest_us >= self.rules.break_us:
+            self.drive_since_break = 0.0
+        self._pair_split(start_us, rest_us, status == "SB")
+
+    def record(
+        self,
+        status: str,
+        start: datetime,
+        end: datetime,
+        miles: float = 0.0,
+        note: str = "",
+    ) -> None:
+        """
+        Apply a duty-status event as it actually happened (e.g. from an ELD).
+
+        Counters advance exactly as logged; limits are not enforced on
+        recorded time. An on-duty event noted as a fuel stop resets the fuel
+        distance. A gap between the clock and `start` is recorded as off duty. Raises ValueError for events out of time order.
+        """
+        start_us = _microseconds_between(self.start_datetime, start)
+        duration_us = _microseconds_between(start, end)
+        if start_us < self.elapsed_us or duration_us < 0:
+            raise ValueError("Recorded events must be in time order and not overlap.")
+        if start_us > self.elapsed_us:
+            self.record("OFF", self._now(), start, note="Off duty (not logged)")
+
+        rules = self.rules
+        now = self._now()
+        hours = duration_us / HOUR_US
+        self._emit(now, duration_us, status, miles, note)
+        self.elapsed_us += duration_us
+        if status in ("D", "ON"):
+            if self.shift_start_us is None:
+                self.shift_start_us = start_us
+            self.cycle.add(now, hours)
+        if status == "D":
+            self.drive_in_shift += hours
+            self.drive_since_break += hours
+            self.drive_since_split += hours
+            self.distance_since_fuel += miles
+            return
+        if status == "ON" and "fuel" in note.lower():
+            self.distance_since_fuel = 0.0
+        if duration_us >= rules.break_us:
+            self.drive_since_break = 0.0
+        if status in ("OFF", "SB"):
+            if duration_us >= rules.restart_us:
+                self.cycle.restart()
+            if duration_us >= rules.reset_us:
+                self._end_shift()
+            elif rules.split_periods and duration_us >= rules.split_off_min_us:
+                self._pair_split(start_us, duration_us, status == "SB")
+
+    def _pair_split(self, start_us: int, rest_us: int, sleeper: bool) -> None:
+        """Pair a split period that just ended with the unpaired one, if any."""
+        if self.split_first is not None and self.rules.pairs_split(
+            *self.split_first, rest_us, sleeper
+        ):
+            self.drive_in_shift = self.drive_since_split
+            self.shift_start_us = self.elapsed_us - (start_us - self.split_anchor_us)
+        self.split_first = (rest_us, sleeper)
+        self.split_anchor_us = self.elapsed_us
+        self.drive_since_split = 0.0
+
+    def _drive(
+        self, now: datetime, hours: float, total_us: int, miles: float, note: str
+    ) -> None:
+        step_us = min(to_microseconds(hours), self.leg_remaining_us)
+        if step_us == self.leg_remaining_us:
+            step_miles = self.leg_remaining_miles
+        else:
+            step_miles = miles * step_us / total_us
+        step_hours = step_us / HOUR_US
+        self._emit(now, step_us, "D", step_miles, note)
+        self.cycle.add(now, step_hours)
+        self.drive_in_shift += step_hours
+        self.drive_since_break += step_hours
+        self.drive_since_split += step_hours
+        self.distance_since_fuel += step_miles
+        self.leg_remaining_miles -= step_miles
+        self.leg_remaining_us -= step_us
+        self.elapsed_us += step_us
+
+    def _end_shift(self) -> None:
+        """A 10-hour reset (or longer): the next on-duty time starts a shift."""
+        self.shift_start_us = None
+        self.drive_in_shift = 0.0
+        self.drive_since_break = 0.0
+        self.split_first = None
+        self.drive_since_split = 0.0
+
+    def _now(self) -> datetime:
+        return self.start_datetime + timedelta(microseconds=self.elapsed_us)
+
+    def _at(self, offset_us: int) -> datetime:
+        return self.start_datetime + timedelta(microseconds=offset_us)
+
+    def _emit(
+        self, now: datetime, duration_us: int, status: str, miles: float, note: str
+    ) -> None:
+        segment = Segment(
+            now, now + timedelta(microseconds=duration_us), status, miles, note
+        )
+        self._segments = (segment, self._segments)
+
+
+def _unlink(linked) -> list:
+    items = []
+    while linked is not None:
+        item, linked = linked
+        items.append(item)
+    items.reverse()
+    return items
+
+
+def _microseconds_between(start: datetime, end: datetime) -> int:
+    return (end - start) // timedelta(microseconds=1)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
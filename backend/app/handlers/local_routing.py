@@ -0,0 +1,403 @@
+"""
+Local Routing — In-process road graph and shortest-path engine
+
+Backs the "local" routing provider so plans can be routed without the
+network. The road graph is held in compressed sparse row (CSR) arrays:
+
+- indptr[n] .. indptr[n + 1] indexes node n's outgoing edges
+- indices / durations_s / lengths_m hold edge heads, travel time and length
+- a mirrored reverse CSR serves the backward search
+
+Queries run bidirectional A* on travel time, with the symmetric "average"
+potential (Ikeda et al.) built from a straight-line / max-speed lower bound,
+so both searches stay consistent and may stop as soon as their frontiers
+together pass the best meeting point.
+
+Graphs load from an OSM-derived GeoJSON export (LineString features with
+`highway`, `maxspeed` and `oneway` tags) or from a compiled `.npz` written by
+`RoadGraph.save` (see `manage.py build_road_graph`).
+"""
+
+import heapq
+import json
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+EARTH_RADIUS_M = 6_371_008.8
+KMH_TO_MPS = 1000.0 / 3600.0
+MPH_TO_KMH = 1.609344
+
+# Free-flow speeds (km/h) by OSM highway class when `maxspeed` is missing
+DEFAULT_SPEEDS_KMH = {
+    "motorway": 105.0,
+    "motorway_link": 60.0,
+    "trunk": 90.0,
+    "trunk_link": 50.0,
+    "primary": 80.0,
+    "primary_link": 45.0,
+    "secondary": 70.0,
+    "secondary_link": 40.0,
+    "tertiary": 60.0,
+    "tertiary_link": 35.0,
+    "unclassified": 50.0,
+    "residential": 40.0,
+    "living_street": 15.0,
+    "service": 20.0,
+}
+FALLBACK_SPEED_KMH = 50.0
+COORD_PRECISION = 7
+
+
+class RoadGraph:
+    """Directed road graph in CSR form, with node coordinates."""
+
+    def __init__(self, lng, lat, sources, targets, lengths_m, durations_s):
+        """
+        Args:
+            lng, lat: Node coordinates (degrees), one entry per node
+            sources, targets: Edge endpoints as node ids
+            lengths_m: Edge length in meters
+            durations_s: Edge travel time in seconds
+        """
+        self.lng = np.ascontiguousarray(lng, dtype=np.float64)
+        self.lat = np.ascontiguousarray(lat, dtype=np.float64)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        lengths_m = np.asarray(lengths_m, dtype=np.float32)
+        durations_s = np.asarray(durations_s, dtype=np.float32)
+
+        (
+            self.indptr,
+            self.indices,
+            self.durations_s,
+            self.lengths_m,
+        ) = self._compress(sources, targets, durations_s, lengths_m)
+        (
+            self.rev_indptr,
+            self.rev_indices,
+            self.rev_durations_s,
+            self.rev_lengths_m,
+        ) = self._compress(targets, sources, durations_s, lengths_m)
+
+        moving = durations_s > 0
+        self.max_speed_mps = (
+            float(np.max(lengths_m[moving] / durations_s[moving]))
+            if moving.any()
+            else FALLBACK_SPEED_KMH * KMH_TO_MPS
+        )
+        # Earth-centred coordinates: straight-line (chord) distance never
+        # exceeds the great-circle length of any road, so chord / max speed
+        # is an admissible, consistent travel-time bound for A*
+        lng_rad, lat_rad = np.radians(self.lng), np.radians(self.lat)
+        self._xyz = EARTH_RADIUS_M * np.column_stack(
+            (
+                np.cos(lat_rad) * np.cos(lng_rad),
+                np.cos(lat_rad) * np.sin(lng_rad),
+                np.sin(lat_rad),
+            )
+        )
+        # Snap only to nodes that can both be left and reached
+        self._routable = np.flatnonzero(
+            (np.diff(self.indptr) > 0) & (np.diff(self.rev_indptr) > 0)
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.lng)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def _compress(self, sources, targets, durations_s, lengths_m):
+        """Sort edges by source and build (indptr, heads, durations, lengths)."""
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.node_count), out=indptr[1:])
+        return (
+            indptr,
+            targets[order].astype(np.int32),
+            durations_s[order],
+            lengths_m[order],
+        )
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        """Load a compiled `.npz` graph or an OSM-derived GeoJSON file."""
+        if str(path).endswith(".npz"):
+            with np.load(path) as data:
+                return cls(
+                    data["lng"],
+                    data["lat"],
+                    data["sources"],
+                    data["targets"],
+                    data["lengths_m"],
+                    data["durations_s"],
+                )
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_geojson(json.load(f))
+
+    def save(self, path: str) -> None:
+        """Write the compiled graph as `.npz` (fast to load, no re-parsing)."""
+        counts = np.diff(self.indptr)
+        np.savez_compressed(
+            path,
+            lng=self.lng,
+            lat=self.lat,
+            sources=np.repeat(np.arange(self.node_count, dtype=np.int64), counts),
+            targets=self.indices,
+            lengths_m=self.lengths_m,
+            durations_s=self.durations_s,
+        )
+
+    @classmethod
+    def from_geojson(cls, collection: Dict[str, Any]) -> "RoadGraph":
+        """
+        Build a graph from a GeoJSON FeatureCollection of road lines.
+
+        Every line vertex becomes a node; vertices shared between features
+        (same coordinate to 1e-7 degrees) join the roads. Per-feature tags:
+            highway: Road class, used for the default speed
+            maxspeed: "90" (km/h) or "55 mph"
+            oneway: "yes"/"true"/"1" (forward only) or "-1" (reverse only)
+        """
+        node_ids: Dict[Tuple[float, float], int] = {}
+        lng: List[float] = []
+        lat: List[float] = []
+        sources: List[int] = []
+        targets: List[int] = []
+        lengths: List[float] = []
+        durations: List[float] = []
+
+        def node_for(coord):
+            key = (round(coord[0], COORD_PRECISION), round(coord[1], COORD_PRECISION))
+            node = node_ids.get(key)
+            if node is None:
+                node = node_ids[key] = len(lng)
+                lng.append(key[0])
+                lat.append(key[1])
+            return node
+
+        for feature in collection.get("features", []):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "LineString":
+                lines = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiLineString":
+                lines = geometry["coordinates"]
+            else:
+                continue
+
+            props = feature.get("properties") or {}
+            speed_mps = _speed_kmh(props) * KMH_TO_MPS
+            forward, backward = _directions(props.get("oneway"))
+
+            for line in lines:
+                nodes = [node_for(coord) for coord in line]
+                for a, b in zip(nodes, nodes[1:]):
+                    if a == b:
+                        continue
+                    length = haversine_m(lng[a], lat[a], lng[b], lat[b])
+                    for u, v, allowed in ((a, b, forward), (b, a, backward)):
+                        if allowed:
+                            sources.append(u)
+                            targets.append(v)
+                            lengths.append(length)
+                            durations.append(length / speed_mps)
+
+        return cls(lng, lat, sources, targets, lengths, durations)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def nearest_node(self, lng: float, lat: float) -> int:
+        """Id of the routable node closest to (lng, lat)."""
+        if not len(self._routable):
+            raise ValueError("road graph has no routable nodes")
+        candidates = self._routable
+        cos_lat = math.cos(math.radians(lat))
+        dx = (self.lng[candidates] - lng) * cos_lat
+        dy = self.lat[candidates] - lat
+        return int(candidates[np.argmin(dx * dx + dy * dy)])
+
+    def shortest_path(
+        self, source: int, target: int
+    ) -> Optional[Tuple[List[int], float, float]]:
+        """
+        Fastest path from `source` to `target` by bidirectional A*.
+
+        Returns:
+            (node ids, duration seconds, length meters), or None if
+            `target` is unreachable
+        """
+        if source == target:
+            return [source], 0.0, 0.0
+
+        # p_f(v) = (h_target(v) - h_source(v)) / 2; the reverse search uses
+        # -p_f, which keeps both reduced graphs non-negative
+        # One vectorized pass over all nodes is cheaper than per-node
+        # potentials in the Python loop
+        to_target = self._xyz - self._xyz[target]
+        to_source = self._xyz - self._xyz[source]
+        potential = (
+            (0.5 / self.max_speed_mps)
+            * (
+                np.sqrt(np.einsum("ij,ij->i", to_target, to_target))
+                - np.sqrt(np.einsum("ij,ij->i", to_source, to_source))
+            )
+        ).tolist()
+
+        searches = (
+            (self.indptr, self.indices, self.durations_s, 1.0),
+            (self.rev_indptr, self.rev_indices, self.rev_durations_s, -1.0),
+        )
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: None}, {target: None})
+        settled = (set(), set())
+        heaps = (
+            [(potential[source], source)],
+            [(-potential[target], target)],
+        )
+
+        best = math.inf
+        meeting = -1
+        while heaps[0] and heaps[1]:
+            # Keys are g + p_f (forward) and g - p_f (reverse): their sum
+            # bounds every path not yet seen, so stop once it reaches best
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+
+            indptr, heads, weights, sign = searches[side]
+            own, other = dist[side], dist[1 - side]
+            g_u = own[u]
+            first, last = int(indptr[u]), int(indptr[u + 1])
+            for offset, (v, cost) in enumerate(
+                zip(heads[first:last].tolist(), weights[first:last].tolist())
+            ):
+                g_v = g_u + cost
+                if g_v < own.get(v, math.inf):
+                    own[v] = g_v
+                    parent[side][v] = (u, first + offset)
+                    heapq.heappush(heaps[side], (g_v + sign * potential[v], v))
+                    if v in other and g_v + other[v] < best:
+                        best = g_v + other[v]
+                        meeting = v
+
+        if meeting < 0:
+            return None
+
+        # Walk both parent chains out from the meeting node
+        forward_nodes, length = [meeting], 0.0
+        node = meeting
+        while parent[0][node] is not None:
+            node, edge = parent[0][node]
+            forward_nodes.append(node)
+            length += float(self.lengths_m[edge])
+        forward_nodes.reverse()
+
+        node = meeting
+        while parent[1][node] is not None:
+            node, edge = parent[1][node]
+            forward_nodes.append(node)
+            length += float(self.rev_lengths_m[edge])
+
+        return forward_nodes, best, length
+
+    def route(self, waypoints: Iterable[Tuple[float, float]]) -> List[Dict[str, Any]]:
+        """
+        Route through (lng, lat) waypoints in order.
+
+        Returns:
+            One {"coordinates", "duration_s", "distance_m"} dict per leg;
+            adjacent legs share their boundary coordinate
+        """
+        nodes = [self.nearest_node(lng, lat) for lng, lat in waypoints]
+        legs = []
+        for source, target in zip(nodes, nodes[1:]):
+            path = self.shortest_path(source, target)
+            if path is None:
+                raise LookupError(f"no route between graph nodes {source} and {target}")
+            path_nodes, duration_s, distance_m = path
+            if len(path_nodes) == 1:
+                # Both waypoints snapped to one node: keep a valid 2-point line
+                path_nodes = path_nodes * 2
+            legs.append(
+                {
+                    "coordinates": np.column_stack(
+                        (self.lng[path_nodes], self.lat[path_nodes])
+                    ).tolist(),
+                    "duration_s": duration_s,
+                    "distance_m": distance_m,
+                }
+            )
+        return legs
+
+
+def haversine_m(lng1: float, lat1: float, lng2: float, lat2: float) -> float:
+    """Great-circle distance in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    h = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _speed_kmh(props: Dict[str, Any]) -> float:
+    """Edge speed from `maxspeed`, else the highway-class default."""
+    maxspeed = props.get("maxspeed")
+    if maxspeed is not None:
+        text = str(maxspeed).strip().lower()
+        try:
+            if text.endswith("mph"):
+                return float(text[:-3]) * MPH_TO_KMH
+            return float(text.removesuffix("km/h").removesuffix("kmh"))
+        except ValueError:
+            pass
+    return DEFAULT_SPEEDS_KMH.get(props.get("highway"), FALLBACK_SPEED_KMH)
+
+
+def _directions(oneway) -> Tuple[bool, bool]:
+    """(forward allowed, backward allowed) for an OSM `oneway` tag."""
+    value = str(oneway).strip().lower() if oneway is not None else ""
+    if value in ("yes", "true", "1"):
+        return True, False
+    if value == "-1":
+        return False, True
+    return True, True
+
+
+_road_graph = None
+_road_graph_lock = threading.Lock()
+
+
+def get_road_graph() -> RoadGraph:
+    """Process-wide RoadGraph loaded once from settings.LOCAL_ROUTING_GRAPH."""
+    global _road_graph
+    if _road_graph is None:
+        with _road_graph_lock:
+            if _road_graph is None:
+                path = getattr(settings, "LOCAL_ROUTING_GRAPH", "")
+                if not path:
+                    raise ValueError(
+                        "LOCAL_ROUTING_GRAPH is not set (expected a road graph "
+                        ".geojson or .npz)"
+                    )
+                _road_graph = RoadGraph.load(path)
+    return _road_graph
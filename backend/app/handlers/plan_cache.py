@@ -0,0 +1,180 @@
+"""
+Plan Cache — Serve identical /api/trips/plan requests from one computation
+
+Refreshes and retries send the same trip again. Requests are canonicalized
+first: coordinates are rounded to `PLAN_CACHE["COORD_PRECISION"]` decimal
+degrees (5 ≈ 1 m), cycle hours to `PLAN_CACHE["HOURS_PRECISION"]`, the
+start time is the resolved one (so "no start_datetime" means today's
+default), and fields that do not change the plan (addresses, `debug`) are
+dropped. The plan is computed from the canonical payload, so every request
+with the same key gets exactly the response it would have computed.
+
+The key is a SHA-256 digest of the canonical payload. Entries live in a
+Django cache alias (`PLAN_CACHE["ALIAS"]`) for the alias TIMEOUT, keep
+current weather only minutes old, and carry a tag that is new for every
+computation: the views build ETags from it, so a recomputed response never
+reuses an old ETag. Concurrent misses for the same key are coalesced.
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..caching import CacheStats, SingleFlight
+
+
+class PlanCache:
+    """Canonical-request cache in front of plan_trip."""
+
+    DEFAULT_ALIAS = "plan_responses"
+    DEFAULT_COORD_PRECISION = 5
+    DEFAULT_HOURS_PRECISION = 2
+    KEY_VERSION = 1
+
+    # Payload keys that never change the plan
+    IGNORED_FIELDS = ("debug",)
+    LOCATION_FIELDS = ("start", "pickup", "dropoff")
+
+    _stats = CacheStats()
+    _flight = SingleFlight()
+    _not_modified = 0
+    _not_modified_lock = threading.Lock()
+
+    @classmethod
+    def canonical(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalized copy of a plan_trip payload.
+
+        `start_datetime` must already be resolved (ISO8601, not None); the
+        controller fills in its default first.
+        """
+        coord_precision = cls._config().get(
+            "COORD_PRECISION", cls.DEFAULT_COORD_PRECISION
+        )
+        hours_precision = cls._config().get(
+            "HOURS_PRECISION", cls.DEFAULT_HOURS_PRECISION
+        )
+        canonical = {
+            key: value
+            for key, value in data.items()
+            if key not in cls.IGNORED_FIELDS and value is not None
+        }
+        for field in cls.LOCATION_FIELDS:
+            location = data[field]
+            canonical[field] = {
+                "lat": round(float(location["lat"]), coord_precision),
+                "lng": round(float(location["lng"]), coord_precision),
+            }
+        canonical["current_cycle_used_hours"] = round(
+            float(data.get("current_cycle_used_hours", 0.0)), hours_precision
+        )
+        if data.get("cycle_history_hours") is not None:
+            canonical["cycle_history_hours"] = [
+                round(float(hours), hours_precision)
+                for hours in data["cycle_history_hours"]
+            ]
+        canonical["start_datetime"] = datetime.fromisoformat(
+            data["start_datetime"].replace("Z", "+00:00")
+        ).isoformat()
+        return canonical
+
+    @classmethod
+    def key_for(cls, canonical: Dict[str, Any]) -> str:
+        """Cache key for a canonical payload (see `canonical`)."""
+        encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        return f"plan-response:v{cls.KEY_VERSION}:{digest}"
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Dict[str, Any]]:
+        """Cached {"tag", "result"} entry, or None. Misses are counted by `fill`."""
+        entry = cls._cache().get(key)
+        if entry is not None:
+            cls._stats.hit()
+        return entry
+
+    @classmethod
+    def fill(
+        cls, key: str, compute: Callable[..., Dict[str, Any]], *args
+    ) -> Dict[str, Any]:
+        """Compute through single-flight; store results that have a route."""
+        entry, shared = cls._flight.do(key, cls._compute_and_store, key, compute, *args)
+        cls._record(shared)
+        return entry
+
+    @classmethod
+    async def aget(cls, key: str) -> Optional[Dict[str, Any]]:
+        entry = await cls._cache().aget(key)
+        if entry is not None:
+            cls._stats.hit()
+        return entry
+
+    @classmethod
+    async def afill(
+        cls, key: str, compute: Callable[..., Awaitable[Dict[str, Any]]], *args
+    ) -> Dict[str, Any]:
+        """Async variant of `fill`; `compute` is a coroutine function."""
+        entry, shared = await cls._flight.ado(
+            key, cls._acompute_and_store, key, compute, *args
+        )
+        cls._record(shared)
+        return entry
+
+    @classmethod
+    def not_modified(cls) -> None:
+        """Count a request answered with 304 Not Modified."""
+        with cls._not_modified_lock:
+            cls._not_modified += 1
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls._config().get("ENABLED", True)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Hit/miss/coalesced/304 counters plus backend size/eviction stats."""
+        stats = cls._stats.snapshot()
+        stats["not_modified"] = cls._not_modified
+        backend = cls._cache()
+        if hasattr(backend, "stats"):
+            stats.update(backend.stats())
+        return stats
+
+    @classmethod
+    def _compute_and_store(cls, key, compute, *args):
+        entry = cls._entry(compute(*args))
+        if entry["result"].get("route") is not None:
+            cls._cache().set(key, entry)
+        return entry
+
+    @classmethod
+    async def _acompute_and_store(cls, key, compute, *args):
+        entry = cls._entry(await compute(*args))
+        if entry["result"].get("route") is not None:
+            await cls._cache().aset(key, entry)
+        return entry
+
+    @staticmethod
+    def _entry(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {"tag": uuid.uuid4().hex, "result": result}
+
+    @classmethod
+    def _record(cls, shared: bool) -> None:
+        if shared:
+            cls._stats.coalesce()
+        else:
+            cls._stats.miss()
+
+    @classmethod
+    def _cache(cls):
+        return caches[cls._config().get("ALIAS", cls.DEFAULT_ALIAS)]
+
+    @staticmethod
+    def _config() -> Dict[str, Any]:
+        return getattr(settings, "PLAN_CACHE", {})
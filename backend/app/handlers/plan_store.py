@@ -0,0 +1,247 @@
+"""
+Plan Store — Where a planned truck should be at any time
+
+Tracking pages ask "where should the truck be at time T?" for a plan that
+was already computed. PlanStore keeps each plan's position index under a
+`plan_id` in a Django cache alias (`PLAN_STORE["ALIAS"]`), and a per-process
+LRU bounded by bytes (`PLAN_STORE["INDEX_CACHE_MAX_BYTES"]`) keeps built
+indexes so repeated queries skip unpickling; evicted ones are rebuilt from
+the alias on their next lookup.
+
+PlanPositions answers a lookup in two binary searches: segment start
+times → the segment containing T (miles interpolated inside it, constant
+while stopped), then the plan's driven-miles fraction → a point on the route
+through its cumulative-distance index. Batches are vectorized end to end.
+"""
+
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+from ..caching import CacheStats
+from .geometry import RouteIndex
+from .segments import Segment
+
+
+class PlanPositions:
+    """Time → driven miles → [lng, lat] index over one plan's segments."""
+
+    __slots__ = (
+        "starts_s",
+        "ends_s",
+        "start_miles",
+        "end_miles",
+        "statuses",
+        "notes",
+        "route",
+        "driven_miles",
+        "nbytes",
+    )
+
+    def __init__(self, payload: Dict[str, Any]):
+        """
+        Args:
+            payload: `PlanPositions.payload()` output (what PlanStore caches)
+        """
+        self.starts_s = payload["starts_s"]
+        self.ends_s = payload["ends_s"]
+        self.end_miles = np.cumsum(payload["miles"])
+        self.start_miles = self.end_miles - payload["miles"]
+        self.statuses = payload["statuses"]
+        self.notes = payload["notes"]
+        self.route = RouteIndex(payload["coords"])
+        self.driven_miles = float(self.end_miles[-1]) if len(self.end_miles) else 0.0
+        # Approximate memory held: the arrays plus the status and note strings
+        self.nbytes = (
+            sum(
+                array.nbytes
+                for array in (
+                    self.starts_s,
+                    self.ends_s,
+                    self.start_miles,
+                    self.end_miles,
+                    self.route.points,
+                    self.route.cumulative_m,
+                )
+            )
+            + sum(sys.getsizeof(text) for text in self.statuses)
+            + sum(sys.getsizeof(text) for text in self.notes)
+        )
+
+    @staticmethod
+    def payload(segments: List[Segment], coords: List[List[float]]) -> Dict[str, Any]:
+        """Compact, picklable form of a plan: segment times/miles and the route."""
+        return {
+            "starts_s": np.array([seg.start.timestamp() for seg in segments]),
+            "ends_s": np.array([seg.end.timestamp() for seg in segments]),
+            "miles": np.array(
+                [seg.miles if seg.status == "D" else 0.0 for seg in segments],
+                dtype=np.float64,
+            ),
+            "statuses": [seg.status for seg in segments],
+            "notes": [seg.note for seg in segments],
+            "coords": np.asarray(coords, dtype=np.float64).reshape(-1, 2),
+        }
+
+    def at(self, times: List[datetime]) -> List[Dict[str, Any]]:
+        """
+        Planned position at each time.
+
+        Returns:
+            [{"at", "phase": "not_started" | "en_route" | "completed",
+            "status", "note" (null unless en route), "miles", "lat", "lng"},
+            ...] in input order
+        """
+        t = np.array([at.timestamp() for at in times], dtype=np.float64)
+        last = len(self.starts_s) - 1
+        index = np.clip(np.searchsorted(self.starts_s, t, side="right") - 1, 0, last)
+        span = self.ends_s[index] - self.starts_s[index]
+        within = np.divide(
+            t - self.starts_s[index],
+            span,
+            out=np.zeros_like(t),
+            where=span > 0,
+        )
+        within = np.clip(within, 0.0, 1.0)
+        miles = (
+            self.start_miles[index]
+            + (self.end_miles[index] - self.start_miles[index]) * within
+        )
+        fractions = (
+            miles / self.driven_miles if self.driven_miles > 0 else np.zeros_like(t)
+        )
+        points = self.route.points_at_fractions(fractions)
+
+        before = t < self.starts_s[0]
+        after = t >= self.ends_s[-1]
+        positions = []
+        for at, i, mile, (lng, lat), early, done in zip(
+            times, index.tolist(), miles.tolist(), points, before, after
+        ):
+            en_route = not (early or done)
+            positions.append(
+                {
+                    "at": at.isoformat(),
+                    "phase": (
+                        "not_started" if early else "completed" if done else "en_route"
+                    ),
+                    "status": self.statuses[i] if en_route else None,
+                    "note": self.notes[i] if en_route else None,
+                    "miles": round(mile, 3),
+                    "lat": lat,
+                    "lng": lng,
+                }
+            )
+        return positions
+
+
+class PlanStore:
+    """plan_id → PlanPositions, in a Django cache plus a per-process LRU."""
+
+    DEFAULT_ALIAS = "plans"
+    DEFAULT_INDEX_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    KEY_VERSION = 1
+
+    _stats = CacheStats()
+    _indexes = OrderedDict()  # plan_id → (PlanPositions, expires), LRU order
+    _index_bytes = 0
+    _indexes_lock = threading.Lock()
+
+    @classmethod
+    def save(cls, segments: List[Segment], coords: List[List[float]]) -> Optional[str]:
+        """Store a plan's position index; returns its plan_id (None if disabled)."""
+        if not cls.enabled() or not segments or not coords:
+            return None
+        plan_id = uuid.uuid4().hex
+        payload = PlanPositions.payload(segments, coords)
+        cls._cache().set(cls.key_for(plan_id), payload)
+        cls._remember(plan_id, PlanPositions(payload))
+        return plan_id
+
+    @classmethod
+    def get(cls, plan_id: str) -> Optional[PlanPositions]:
+        """The plan's index, or None if unknown or expired."""
+        if not cls.enabled():
+            return None
+        with cls._indexes_lock:
+            entry = cls._indexes.get(plan_id)
+            if entry is not None and entry[1] < time.monotonic():
+                cls._forget(plan_id)
+                entry = None
+            elif entry is not None:
+                cls._indexes.move_to_end(plan_id)
+        if entry is not None:
+            cls._stats.hit()
+            return entry[0]
+
+        payload = cls._cache().get(cls.key_for(plan_id))
+        if payload is None:
+            cls._stats.miss()
+            return None
+        cls._stats.hit()
+        positions = PlanPositions(payload)
+        cls._remember(plan_id, positions)
+        return positions
+
+    @classmethod
+    def key_for(cls, plan_id: str) -> str:
+        return f"plan:v{cls.KEY_VERSION}:{plan_id}"
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls._config().get("ENABLED", True)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Hit/miss counters plus backend size/eviction stats when available."""
+        stats = cls._stats.snapshot()
+        stats["indexes"] = len(cls._indexes)
+        stats["index_bytes"] = cls._index_bytes
+        backend = cls._cache()
+        if hasattr(backend, "stats"):
+            stats.update(backend.stats())
+        return stats
+
+    @classmethod
+    def _remember(cls, plan_id: str, positions: PlanPositions) -> None:
+        """
+        Keep a built index, no longer than the cache alias keeps the plan,
+        evicting least recently used ones beyond the byte budget. An index
+        larger than the whole budget is not kept.
+        """
+        max_bytes = cls._config().get(
+            "INDEX_CACHE_MAX_BYTES", cls.DEFAULT_INDEX_CACHE_MAX_BYTES
+        )
+        if positions.nbytes > max_bytes:
+            return
+        timeout = cls._cache().default_timeout
+        expires = time.monotonic() + timeout if timeout is not None else float("inf")
+        with cls._indexes_lock:
+            cls._forget(plan_id)
+            cls._indexes[plan_id] = (positions, expires)
+            cls._index_bytes += positions.nbytes
+            while cls._index_bytes > max_bytes:
+                cls._forget(next(iter(cls._indexes)))
+
+    @classmethod
+    def _forget(cls, plan_id: str) -> None:
+        """Drop a kept index (caller holds `_indexes_lock`)."""
+        entry = cls._indexes.pop(plan_id, None)
+        if entry is not None:
+            cls._index_bytes -= entry[0].nbytes
+
+    @classmethod
+    def _cache(cls):
+        return caches[cls._config().get("ALIAS", cls.DEFAULT_ALIAS)]
+
+    @staticmethod
+    def _config() -> Dict[str, Any]:
+        return getattr(settings, "PLAN_STORE", {})
@@ -0,0 +1,93 @@
+"""
+Route Cache — Reuse OSRM routes for repeated lanes
+
+Routes are keyed on the routing provider and waypoints rounded to `ROUTE_CACHE["PRECISION"]` decimal
+degrees (3 ≈ 110 m), so geocoding noise around the same terminal, shipper and
+consignee maps to one entry.
+
+Storage is a Django cache alias (`ROUTE_CACHE["ALIAS"]`): a byte-bounded LRU
+LocMemCache in dev, or any shared backend (Redis, Memcached) in production.
+TTL comes from the alias TIMEOUT.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..caching import CacheStats
+
+
+class RouteCache:
+    """Quantized-waypoint cache in front of ComputeRouteHandler."""
+
+    DEFAULT_ALIAS = "routes"
+    DEFAULT_PRECISION = 3
+    KEY_VERSION = 2
+
+    _stats = CacheStats()
+
+    @classmethod
+    def key_for(
+        cls, waypoints: Iterable[Tuple[float, float]], provider: str = "osrm"
+    ) -> str:
+        """Build a cache key from the provider name and (lng, lat) waypoints."""
+        precision = cls._config().get("PRECISION", cls.DEFAULT_PRECISION)
+        parts = ";".join(
+            f"{round(lng, precision):.{precision}f},{round(lat, precision):.{precision}f}"
+            for lng, lat in waypoints
+        )
+        return f"route:v{cls.KEY_VERSION}:{provider}:{parts}"
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Dict[str, Any]]:
+        if not cls.enabled():
+            return None
+        route = cls._cache().get(key)
+        if route is None:
+            cls._stats.miss()
+        else:
+            cls._stats.hit()
+        return route
+
+    @classmethod
+    def set(cls, key: str, route: Dict[str, Any]) -> None:
+        if cls.enabled():
+            cls._cache().set(key, route)
+
+    @classmethod
+    async def aget(cls, key: str) -> Optional[Dict[str, Any]]:
+        if not cls.enabled():
+            return None
+        route = await cls._cache().aget(key)
+        if route is None:
+            cls._stats.miss()
+        else:
+            cls._stats.hit()
+        return route
+
+    @classmethod
+    async def aset(cls, key: str, route: Dict[str, Any]) -> None:
+        if cls.enabled():
+            await cls._cache().aset(key, route)
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls._config().get("ENABLED", True)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Hit/miss counters plus backend size/eviction stats when available."""
+        stats = cls._stats.snapshot()
+        backend = cls._cache()
+        if hasattr(backend, "stats"):
+            stats.update(backend.stats())
+        return stats
+
+    @classmethod
+    def _cache(cls):
+        return caches[cls._config().get("ALIAS", cls.DEFAULT_ALIAS)]
+
+    @staticmethod
+    def _config() -> Dict[str, Any]:
+        return getattr(settings, "ROUTE_CACHE", {})
@@ -0,0 +1,212 @@
+"""
+Routing Providers — Pluggable backends behind ComputeRouteHandler
+
+Every provider turns (lng, lat) waypoints into the same route_data shape:
+
+    {
+        "geometry": GeoJSON LineString,
+        "total_distance_miles": float,
+        "total_duration_hours": float,
+        "legs": [{"distance_miles", "duration_hours", "geometry"}, ...]
+    }
+
+Providers:
+- "osrm": OSRM HTTP API (public demo server by default, settings.OSRM_BASE_URL)
+- "local": in-process RoadGraph (see local_routing.py), no network access
+
+settings.ROUTING_PROVIDER picks the default; requests may override it with
+`routing_provider`.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import polyline
+import requests
+from django.conf import settings
+
+from .local_routing import get_road_graph
+from .upstream_client import get_upstream_client
+
+Waypoints = List[Tuple[float, float]]
+
+
+class RoutingProvider:
+    """Base class: route (lng, lat) waypoints into route_data."""
+
+    name = ""
+
+    def route(self, waypoints: Waypoints) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def aroute(self, waypoints: Waypoints) -> Dict[str, Any]:
+        """Async variant; CPU-bound providers run in a worker thread."""
+        return await asyncio.to_thread(self.route, waypoints)
+
+
+class OsrmRoutingProvider(RoutingProvider):
+    """OSRM route service over the shared pooled UpstreamClient."""
+
+    name = "osrm"
+    BASE_URL = "https://router.project-osrm.org/route/v1/driving"
+
+    def route(self, waypoints: Waypoints) -> Dict[str, Any]:
+        url, params = self._request(waypoints)
+        try:
+            data = get_upstream_client().get_json(url, params=params, timeout=10)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"OSRM request failed: {e}")
+        return self._parse_response(data)
+
+    async def aroute(self, waypoints: Waypoints) -> Dict[str, Any]:
+        url, params = self._request(waypoints)
+        try:
+            data = await get_upstream_client().aget_json(url, params=params, timeout=10)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"OSRM request failed: {e}")
+        return self._parse_response(data)
+
+    def _request(self, waypoints):
+        """Return (url, params) for an OSRM route query."""
+        # Format for OSRM: lng,lat;lng,lat;lng,lat
+        coords_str = ";".join(f"{lng},{lat}" for lng, lat in waypoints)
+        base_url = getattr(settings, "OSRM_BASE_URL", self.BASE_URL)
+        url = f"{base_url}/{coords_str}"
+
+        # Request full overview geometry; OSRM doesn't return per-leg geometry
+        # without steps, so legs are sliced from it at the snapped waypoints
+        params = {"geometries": "polyline", "overview": "full", "steps": "false"}
+        return url, params
+
+    def _parse_response(self, data):
+        """Convert an OSRM route response into the route_data shape."""
+        if data["code"] != "Ok":
+            raise Exception(f"OSRM error: {data['code']}")
+
+        route = data["routes"][0]
+
+        # Decode geometry
+        full_geometry = polyline.decode(route["geometry"])
+        coords = [[lng, lat] for lat, lng in full_geometry]
+
+        leg_bounds = self._leg_boundaries(
+            coords,
+            [wp.get("location") for wp in data.get("waypoints") or []],
+            [leg["distance"] for leg in route["legs"]],
+        )
+        legs = [
+            (leg["distance"], leg["duration"], coords[first : last + 1])
+            for leg, (first, last) in zip(route["legs"], leg_bounds)
+        ]
+        return build_route_data(coords, legs)
+
+    @staticmethod
+    def _leg_boundaries(coords, waypoint_locations, leg_distances):
+        """
+        Return (first_index, last_index) into `coords` for each leg.
+
+        Legs are split at the geometry point nearest each intermediate snapped
+        waypoint (OSRM `waypoints[i].location`, [lng, lat]), searching forward
+        from the previous split. Without usable waypoints, splits fall back to
+        cumulative leg distance. Adjacent legs share their boundary point.
+        """
+        if not coords or not leg_distances:
+            return [(0, max(len(coords) - 1, 0))] * len(leg_distances)
+
+        last_index = len(coords) - 1
+        splits = []
+
+        if len(waypoint_locations) == len(leg_distances) + 1 and all(
+            waypoint_locations
+        ):
+            search_from = 0
+            for lng, lat in waypoint_locations[1:-1]:
+                best_index = search_from
+                best_dist = float("inf")
+                for index in range(search_from, len(coords)):
+                    c_lng, c_lat = coords[index]
+                    dist = (c_lng - lng) ** 2 + (c_lat - lat) ** 2
+                    if dist < best_dist:
+                        best_index, best_dist = index, dist
+                splits.append(best_index)
+                search_from = best_index
+        else:
+            # Fall back to cumulative-distance fractions of the point count
+            total = sum(leg_distances) or 1.0
+            running = 0.0
+            for distance in leg_distances[:-1]:
+                running += distance
+                splits.append(int(round(last_index * running / total)))
+
+        starts = [0] + splits
+        ends = splits + [last_index]
+        return list(zip(starts, ends))
+
+
+class LocalRoutingProvider(RoutingProvider):
+    """Bidirectional A* over the in-process RoadGraph."""
+
+    name = "local"
+
+    def route(self, waypoints: Waypoints) -> Dict[str, Any]:
+        try:
+            legs = get_road_graph().route(waypoints)
+        except (LookupError, ValueError, OSError) as e:
+            raise Exception(f"Local routing failed: {e}")
+
+        coords = []
+        for leg in legs:
+            for point in leg["coordinates"]:
+                # Adjacent legs share their boundary point
+                if not coords or point != coords[-1]:
+                    coords.append(point)
+        return build_route_data(
+            coords,
+            [
+                (leg["distance_m"], leg["duration_s"], leg["coordinates"])
+                for leg in legs
+            ],
+        )
+
+
+PROVIDERS = {
+    OsrmRoutingProvider.name: OsrmRoutingProvider(),
+    LocalRoutingProvider.name: LocalRoutingProvider(),
+}
+
+
+def get_routing_provider(name=None) -> RoutingProvider:
+    """Look up a provider by name (default: settings.ROUTING_PROVIDER)."""
+    name = name or getattr(settings, "ROUTING_PROVIDER", OsrmRoutingProvider.name)
+    try:
+        return PROVIDERS[name]
+    except KeyError:
+        raise Exception(f"Unknown routing provider: {name}")
+
+
+def build_route_data(coords, legs) -> Dict[str, Any]:
+    """
+    Assemble route_data from the full coordinate list and per-leg parts.
+
+    Args:
+        coords: [lng, lat] list for the whole route
+        legs: [(distance_m, duration_s, leg_coords), ...]
+    """
+    return {
+        "geometry": {"type": "LineString", "coordinates": coords},
+        "total_distance_miles": meters_to_miles(sum(leg[0] for leg in legs)),
+        "total_duration_hours": sum(leg[1] for leg in legs) / 3600.0,
+        "legs": [
+            {
+                "distance_miles": meters_to_miles(distance_m),
+                "duration_hours": duration_s / 3600.0,
+                "geometry": {"type": "LineString", "coordinates": leg_coords},
+            }
+            for distance_m, duration_s, leg_coords in legs
+        ],
+    }
+
+
+def meters_to_miles(meters):
+    """Convert meters to miles."""
+    return meters * 0.000621371
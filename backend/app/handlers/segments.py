@@ -0,0 +1,61 @@
+"""
+Segments — Compact duty-status records shared by the planning pipeline
+
+HosRulesHandler emits `Segment` objects, and EldLogGenerator, stop placement
+and weather sampling read them directly. Times stay aware `datetime`s the
+whole way, so nothing is formatted to ISO strings and parsed back between
+stages; `to_dict` serializes once at the response boundary.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+
+class Segment:
+    """One duty-status interval: [start, end), status, miles and note."""
+
+    __slots__ = ("start", "end", "status", "miles", "note")
+
+    def __init__(
+        self, start: datetime, end: datetime, status: str, miles: float, note: str
+    ):
+        self.start = start
+        self.end = end
+        self.status = status
+        self.miles = miles
+        self.note = note
+
+    @property
+    def duration_hours(self) -> float:
+        return (self.end - self.start).total_seconds() / 3600.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Response shape (ISO8601 start/end)."""
+        return {
+            "start_datetime": self.start.isoformat(),
+            "end_datetime": self.end.isoformat(),
+            "status": self.status,
+            "miles": self.miles,
+            "note": self.note,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"Segment({self.status} {self.start.isoformat()} → "
+            f"{self.end.isoformat()}, {self.miles:.1f} mi, {self.note!r})"
+        )
+
+
+def serialize_segments(segments: Iterable[Segment]) -> List[Dict[str, Any]]:
+    """Segment records → response dicts."""
+    return [segment.to_dict() for segment in segments]
+
+
+def serialize_daily_log(daily_log: Dict[str, Any]) -> Dict[str, Any]:
+    """One daily log holding Segment records → response dict."""
+    return {**daily_log, "segments": serialize_segments(daily_log["segments"])}
+
+
+def serialize_daily_logs(daily_logs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Daily logs holding Segment records → response dicts."""
+    return [serialize_daily_log(log) for log in daily_logs]
@@ -0,0 +1,194 @@
+"""
+Sleeper Split Planner — Place 7/3 and 8/2 sleeper-berth splits
+
+HosRulesHandler always answers an 11-hour or 14-hour limit with a 10-hour
+OFF reset and the 8-hour rule with a 30-minute break. Under 395.1(g)(1)(ii)
+a driver may instead split the 10 hours into a sleeper-berth period of at
+least 7 hours and another period of at least 2, in either order. The pair is
+excluded from the 14-hour window, and the short period also counts as the
+30-minute break. Where each period goes decides how much time the splits save.
+
+The planner searches those placements as a best-first dynamic program
+over decision points: a decision is a limit binding while driving, and its
+options are the rule set's rest or one of the split periods. Each state is
+an HosState fork; expanding one simulates up to its next decision.
+
+- A state equal to an earlier one in everything but the clock (position,
+  counters, unpaired split period) is kept only if it is earlier;
+- states are expanded in order of estimated arrival (clock + skeleton time
+  left + 10-hour rests still needed for the driving left), and the search
+  stops once no state can beat the best complete plan;
+- at most `max_expansions` states are expanded, so the cost per request is
+  bounded (each expansion forks 1 + len(split_periods) states).
+
+The standard HosRulesHandler plan is the initial best, so the result is
+never slower than it.
+"""
+
+import heapq
+from datetime import datetime
+from itertools import count
+from typing import Any, Dict, List, Optional, Union
+
+from django.conf import settings
+
+from .hos_rule_sets import (
+    BREAK,
+    DRIVE_LIMIT,
+    HOUR_US,
+    WINDOW,
+    CompiledRuleSet,
+    get_rule_set,
+    to_microseconds,
+)
+from .hos_state import HosState
+
+# Limits where the planner may choose a split period instead of the rest
+CHOICES = (DRIVE_LIMIT, WINDOW, BREAK)
+
+
+class SleeperSplitPlanner:
+    """HOS simulation that uses sleeper-berth splits where they save time."""
+
+    @staticmethod
+    def execute(
+        skeleton_segments: List[Dict[str, Any]],
+        current_cycle_used_hours: float,
+        start_datetime: datetime,
+        cycle_history_hours: Optional[List[float]] = None,
+        rule_set: Union[str, CompiledRuleSet, None] = None,
+        max_expansions: Optional[int] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Same arguments and result as HosRulesHandler.execute, plus:
+
+        Args:
+            max_expansions: Decision states to expand at most (default
+                settings.HOS_SPLIT_MAX_EXPANSIONS)
+
+        Returns:
+            {
+                "segments": [Segment, ...] with "SB"/"OFF" split periods
+                    where they arrive earlier than 10-hour resets,
+                "warnings": [...],
+                "checkpoint": {...}
+            }
+        """
+        rules = (
+            rule_set
+            if isinstance(rule_set, CompiledRuleSet)
+            else get_rule_set(rule_set)
+        )
+        if max_expansions is None:
+            max_expansions = getattr(settings, "HOS_SPLIT_MAX_EXPANSIONS", 500)
+
+        best = HosState.start(
+            rules,
+            current_cycle_used_hours,
+            start_datetime,
+            cycle_history_hours,
+            checkpoint,
+        )
+        best.advance(skeleton_segments)
+        if not rules.split_periods:
+            return best.result()
+
+        # Skeleton time and driving still ahead of each position
+        remaining_us = [0] * (len(skeleton_segments) + 1)
+        remaining_drive_us = [0] * (len(skeleton_segments) + 1)
+        for index in range(len(skeleton_segments) - 1, -1, -1):
+            skel_seg = skeleton_segments[index]
+            duration_us = max(to_microseconds(skel_seg["duration_hours"]), 0)
+            remaining_us[index] = remaining_us[index + 1] + duration_us
+            remaining_drive_us[index] = remaining_drive_us[index + 1] + (
+                duration_us if skel_seg["status"] == "D" else 0
+            )
+
+        def ahead(state):
+            """(skeleton time, driving time) not yet simulated."""
+            if state.leg_remaining_us is None:
+                return (
+                    remaining_us[state.position],
+                    remaining_drive_us[state.position],
+                )
+            return (
+                remaining_us[state.position + 1] + state.leg_remaining_us,
+                remaining_drive_us[state.position + 1] + state.leg_remaining_us,
+            )
+
+        def estimate(state):
+            """Arrival estimate: clock, skeleton left, 10-hour rests still needed."""
+            skeleton_us, drive_us = ahead(state)
+            window_used = (
+                0.0
+                if state.shift_start_us is None
+                else (state.elapsed_us - state.shift_start_us) / HOUR_US
+            )
+            available = max(
+                0.0,
+                min(
+                    rules.drive_limit_hours - state.drive_in_shift,
+                    rules.duty_window_hours - window_used,
+                ),
+            )
+            shifts = max(0.0, drive_us / HOUR_US - available) / rules.drive_limit_hours
+            return state.elapsed_us + skeleton_us + shifts * rules.reset_us
+
+        root = HosState.start(
+            rules,
+            current_cycle_used_hours,
+            start_datetime,
+            cycle_history_hours,
+            checkpoint,
+        )
+        order = count()  # Heap tie-break: first pushed, first expanded
+        queue = [(estimate(root), next(order), root)]
+        seen = {}
+        expansions = 0
+        while queue and expansions < max_expansions:
+            bound, _, state = heapq.heappop(queue)
+            if bound >= best.elapsed_us:
+                break
+            expansions += 1
+            event = state.advance(skeleton_segments, CHOICES)
+            if event is None:
+                if state.elapsed_us < best.elapsed_us:
+                    best = state
+                continue
+            options = [(event, None)] + [
+                (None, period) for period in rules.split_periods
+            ]
+            for rest_event, period in options:
+                child = state.copy()
+                if period is None:
+                    child.rest(rest_event)
+                else:
+                    child.split_rest(*period)
+                if child.elapsed_us + ahead(child)[0] >= best.elapsed_us:
+                    continue
+                key = _state_key(child)
+                kept = seen.get(key)
+                if kept is None or child.elapsed_us < kept:
+                    seen[key] = child.elapsed_us
+                    heapq.heappush(queue, (estimate(child), next(order), child))
+        return best.result()
+
+
+def _state_key(state: HosState) -> tuple:
+    """Everything but the clock: equal keys differ only in arrival time."""
+    return (
+        state.position,
+        state.leg_remaining_us,
+        (
+            None
+            if state.shift_start_us is None
+            else state.elapsed_us - state.shift_start_us
+        ),
+        round(state.drive_in_shift, 6),
+        round(state.drive_since_break, 6),
+        round(state.drive_since_split, 6),
+        state.split_first,
+        round(state.distance_since_fuel, 3),
+        round(state.cycle.used, 6),
+    )
@@ -0,0 +1,463 @@
+"""
+Upstream Client — Pooled, keep-alive HTTP access to OSRM and Open-Meteo
+
+One shared `requests.Session` per process with per-host connection pools, so
+repeated plans reuse TCP+TLS connections instead of paying a fresh handshake
+on every call.
+
+Features:
+- Configurable pool sizes (settings.UPSTREAM_HTTP)
+- Retries with full-jitter exponential backoff on connect errors, timeouts
+  and 429/5xx responses
+- Per-call deadline covering all attempts and backoff sleeps
+- Per-host circuit breaker (closed → open → half-open); a half-open probe
+  that is cancelled or fails outside the retry policy is handed back
+- Pool hit/miss, retry, error and latency counters via `stats()`
+
+`aget_json` is the asyncio twin backed by an `aiohttp.ClientSession` per
+event loop; it shares breakers, retry policy and counters with the sync path.
+A loop that ends with its request (an async view under WSGI, where each call
+runs in a fresh loop) must wrap the request in `request_session()` instead,
+so the session is closed with it rather than kept alive with its dead loop.
+"""
+
+import asyncio
+import contextlib
+import random
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_CONFIG = {
+    "POOL_CONNECTIONS": 10,  # Number of per-host pools kept alive
+    "POOL_MAXSIZE": 20,  # Max keep-alive connections per host
+    "MAX_RETRIES": 2,  # Retries after the first attempt
+    "BACKOFF_BASE_SECONDS": 0.2,
+    "BACKOFF_MAX_SECONDS": 2.0,
+    "BREAKER_FAILURE_THRESHOLD": 5,  # Consecutive failures before opening
+    "BREAKER_RESET_SECONDS": 30.0,  # Open duration before a half-open probe
+}
+
+
+# (client, session) for the request scoped by UpstreamClient.request_session
+_scoped_session: ContextVar[Optional[tuple]] = ContextVar(
+    "upstream_scoped_session", default=None
+)
+
+
+class UpstreamError(requests.exceptions.RequestException):
+    """Upstream call failed after retries, or its deadline expired."""
+
+
+class CircuitOpenError(UpstreamError):
+    """Circuit breaker for the upstream host is open; call not attempted."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for a single upstream host."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed (half-open admits one probe)."""
+        with self._lock:
+            state = self._state_locked()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                # Trip (or re-trip after a failed probe)
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """
+        End a call that gave no verdict on the host (cancelled, or failed
+        outside the retry policy): counters are unchanged, but a half-open
+        probe is handed back so the next call can probe.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class UpstreamClient:
+    """Shared HTTP client with per-host pools, retries and circuit breakers."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config["POOL_CONNECTIONS"],
+            pool_maxsize=self.config["POOL_MAXSIZE"],
+            max_retries=0,  # Retries are handled here, under the call deadline
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._async_sessions: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10.0,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """
+        GET `url` and return the decoded JSON body.
+
+        Args:
+            url: Absolute upstream URL
+            params: Query parameters
+            timeout: Per-attempt connect/read timeout in seconds
+            deadline: Overall budget in seconds for all attempts and backoff
+                (defaults to `timeout` × attempts)
+
+        Raises:
+            CircuitOpenError: Host breaker is open
+            UpstreamError: Retries exhausted, deadline expired, or non-retryable
+                HTTP error / invalid JSON
+        """
+        host = urlsplit(url).netloc
+        breaker = self._breaker(host)
+        stats = self._host_stats(host)
+
+        if not breaker.allow():
+            self._incr(stats, "circuit_rejections")
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        attempts = self.config["MAX_RETRIES"] + 1
+        if deadline is None:
+            deadline = timeout * attempts
+        deadline_at = time.monotonic() + deadline
+        last_error: Optional[Exception] = None
+
+        try:
+            for attempt in range(attempts):
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                if attempt > 0:
+                    self._incr(stats, "retries")
+
+                try:
+                    response = self._send(url, params, min(timeout, remaining), stats)
+                except (
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                ) as e:
+                    last_error = e
+                else:
+                    if response.status_code in RETRYABLE_STATUS_CODES:
+                        last_error = UpstreamError(
+                            f"{host} returned HTTP {response.status_code}"
+                        )
+                    else:
+                        try:
+                            response.raise_for_status()
+                            data = response.json()
+                        except (requests.exceptions.HTTPError, ValueError) as e:
+                            # Client errors / bad payloads are not host outages
+                            breaker.record_success()
+                            self._incr(stats, "errors")
+                            raise UpstreamError(f"{host} request failed: {e}") from e
+                        breaker.record_success()
+                        return data
+
+                if attempt + 1 < attempts:
+                    self._sleep_backoff(attempt, deadline_at)
+
+            breaker.record_failure()
+            self._incr(stats, "errors")
+            if last_error is None:
+                raise UpstreamError(f"{host} deadline of {deadline:.2f}s exceeded")
+            raise UpstreamError(f"{host} request failed: {last_error}") from last_error
+        except UpstreamError:
+            raise  # Outcome already recorded on the breaker
+        except BaseException:
+            breaker.release()
+            raise
+
+    async def aget_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10.0,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Async variant of `get_json` with the same retry/deadline/breaker policy."""
+        host = urlsplit(url).netloc
+        breaker = self._breaker(host)
+        stats = self._host_stats(host)
+
+        if not breaker.allow():
+            self._incr(stats, "circuit_rejections")
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        attempts = self.config["MAX_RETRIES"] + 1
+        if deadline is None:
+            deadline = timeout * attempts
+        deadline_at = time.monotonic() + deadline
+        last_error: Optional[Exception] = None
+
+        try:
+            for attempt in range(attempts):
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                if attempt > 0:
+                    self._incr(stats, "retries")
+
+                try:
+                    status_code, data = await self._asend(
+                        url, params, min(timeout, remaining), stats
+                    )
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    last_error = e
+                except (aiohttp.ClientResponseError, ValueError) as e:
+                    # Client errors / bad payloads are not host outages
+                    breaker.record_success()
+                    self._incr(stats, "errors")
+                    raise UpstreamError(f"{host} request failed: {e}") from e
+                else:
+                    if status_code in RETRYABLE_STATUS_CODES:
+                        last_error = UpstreamError(
+                            f"{host} returned HTTP {status_code}"
+                        )
+                    else:
+                        breaker.record_success()
+                        return data
+
+                if attempt + 1 < attempts:
+                    await asyncio.sleep(self._backoff_delay(attempt, deadline_at))
+
+            breaker.record_failure()
+            self._incr(stats, "errors")
+            if last_error is None:
+                raise UpstreamError(f"{host} deadline of {deadline:.2f}s exceeded")
+            raise UpstreamError(f"{host} request failed: {last_error}") from last_error
+        except UpstreamError:
+            raise  # Outcome already recorded on the breaker
+        except BaseException:
+            breaker.release()
+            raise
+
+    async def aclose(self) -> None:
+        """Close the running loop's session (call before the loop shuts down)."""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    @contextlib.asynccontextmanager
+    async def request_session(self) -> AsyncIterator[None]:
+        """
+        Serve this context's async calls from one ClientSession, closed on
+        exit, instead of the cached per-loop session.
+        """
+        session = self._new_async_session()
+        token = _scoped_session.set((self, session))
+        try:
+            yield
+        finally:
+            _scoped_session.reset(token)
+            await session.close()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host counters: requests, pool hits/misses, retries, errors, latency."""
+        with self._lock:
+            snapshot = {}
+            for host, counters in self._stats.items():
+                host_stats = dict(counters)
+                sent = host_stats["requests"]
+                host_stats["latency_ms_avg"] = (
+                    round(host_stats["latency_ms_total"] / sent, 2) if sent else 0.0
+                )
+                host_stats["circuit_state"] = self._breakers[host].state
+                snapshot[host] = host_stats
+            return snapshot
+
+    def _send(self, url, params, timeout, stats) -> requests.Response:
+        """Issue one attempt, recording latency and pool reuse."""
+        connections_before = self._connections_opened(url)
+        started = time.perf_counter()
+        try:
+            return self._session.get(url, params=params, timeout=timeout)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            reused = self._connections_opened(url) == connections_before
+            with self._lock:
+                stats["requests"] += 1
+                stats["pool_hits" if reused else "pool_misses"] += 1
+                stats["latency_ms_total"] += elapsed_ms
+                stats["latency_ms_max"] = max(stats["latency_ms_max"], elapsed_ms)
+
+    async def _asend(self, url, params, timeout, stats):
+        """Issue one async attempt; returns (status_code, decoded JSON or None)."""
+        trace_ctx = {"reused": True}
+        started = time.perf_counter()
+        try:
+            async with self._async_session().get(
+                url,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                trace_request_ctx=trace_ctx,
+            ) as response:
+                if response.status in RETRYABLE_STATUS_CODES:
+                    return response.status, None
+                response.raise_for_status()
+                return response.status, await response.json(content_type=None)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with self._lock:
+                stats["requests"] += 1
+                stats["pool_hits" if trace_ctx["reused"] else "pool_misses"] += 1
+                stats["latency_ms_total"] += elapsed_ms
+                stats["latency_ms_max"] = max(stats["latency_ms_max"], elapsed_ms)
+
+    def _async_session(self) -> aiohttp.ClientSession:
+        """The request-scoped session, else one keep-alive session per running loop."""
+        scoped = _scoped_session.get()
+        if scoped is not None and scoped[0] is self:
+            return scoped[1]
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            session = self._new_async_session()
+            self._async_sessions[loop] = session
+        return session
+
+    def _new_async_session(self) -> aiohttp.ClientSession:
+        async def on_connection_create_start(session, trace_config_ctx, params):
+            trace_config_ctx.trace_request_ctx["reused"] = False
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+
+        return aiohttp.ClientSession(
+            # One loop multiplexes many plans, so allow more concurrent
+            # keep-alive connections than a single sync worker needs.
+            connector=aiohttp.TCPConnector(
+                limit=self.config["POOL_CONNECTIONS"] * self.config["POOL_MAXSIZE"],
+            ),
+            trace_configs=[trace_config],
+        )
+
+    def _connections_opened(self, url: str) -> int:
+        """Total connections ever opened by the pools serving `url`'s host."""
+        hostname = urlsplit(url).hostname
+        pools = self._session.get_adapter(url).poolmanager.pools
+        return sum(
+            pools[key].num_connections
+            for key in pools.keys()
+            if key.key_host == hostname
+        )
+
+    def _sleep_backoff(self, attempt: int, deadline_at: float) -> None:
+        delay = self._backoff_delay(attempt, deadline_at)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _backoff_delay(self, attempt: int, deadline_at: float) -> float:
+        """Full-jitter exponential backoff, never sleeping past the deadline."""
+        cap = min(
+            self.config["BACKOFF_MAX_SECONDS"],
+            self.config["BACKOFF_BASE_SECONDS"] * (2**attempt),
+        )
+        return min(random.uniform(0, cap), max(0.0, deadline_at - time.monotonic()))
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    self.config["BREAKER_FAILURE_THRESHOLD"],
+                    self.config["BREAKER_RESET_SECONDS"],
+                )
+                self._breakers[host] = breaker
+            return breaker
+
+    def _host_stats(self, host: str) -> Dict[str, float]:
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = {
+                    "requests": 0,
+                    "pool_hits": 0,
+                    "pool_misses": 0,
+                    "retries": 0,
+                    "errors": 0,
+                    "circuit_rejections": 0,
+                    "latency_ms_total": 0.0,
+                    "latency_ms_max": 0.0,
+                }
+                self._stats[host] = stats
+            return stats
+
+    def _incr(self, stats: Dict[str, float], key: str) -> None:
+        with self._lock:
+            stats[key] += 1
+
+
+_client: Optional[UpstreamClient] = None
+_client_lock = threading.Lock()
+
+
+def get_upstream_client() -> UpstreamClient:
+    """Return the process-wide client, built lazily from settings.UPSTREAM_HTTP."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpstreamClient(getattr(settings, "UPSTREAM_HTTP", None))
+    return _client
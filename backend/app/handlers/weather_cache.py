@@ -0,0 +1,170 @@
+"""
+Weather Cache — Share Open-Meteo lookups across nearby, near-simultaneous trips
+
+Lookups are keyed on a geo-tile (`WEATHER_CACHE["TILE_DEGREES"]` square,
+0.1° ≈ 11 km by default, close to Open-Meteo's model grid) and a time bucket
+(`WEATHER_CACHE["BUCKET_SECONDS"]`, 15 minutes by default, Open-Meteo's
+current-conditions refresh interval). Weather is fetched for the tile center,
+so every trip in a tile sees the same answer, and entries expire at the end
+of their bucket, when the upstream data would have changed anyway.
+
+Concurrent misses for the same key are coalesced: one caller fetches,
+the rest wait for its result.
+
+Hourly forecasts for route sampling are cached per tile and UTC day
+(`forecast_key_for`), in the same buckets, so later plans crossing the same
+tiles on the same days reuse them.
+"""
+
+import math
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..caching import CacheStats, SingleFlight
+
+
+class WeatherCache:
+    """Geo-tile / time-bucket cache in front of WeatherHandler."""
+
+    DEFAULT_ALIAS = "weather"
+    DEFAULT_TILE_DEGREES = 0.1
+    DEFAULT_BUCKET_SECONDS = 900
+    KEY_VERSION = 1
+
+    _stats = CacheStats()
+    _flight = SingleFlight()
+
+    @classmethod
+    def tile_for(cls, lat: float, lng: float) -> Tuple[int, int]:
+        """(row, col) of the tile containing (lat, lng)."""
+        size = cls._tile_degrees()
+        return math.floor(lat / size), math.floor(lng / size)
+
+    @classmethod
+    def tile_center(cls, tile: Tuple[int, int]) -> Tuple[float, float]:
+        """(lat, lng) at the middle of a tile."""
+        size = cls._tile_degrees()
+        row, col = tile
+        return round((row + 0.5) * size, 4), round((col + 0.5) * size, 4)
+
+    @classmethod
+    def key_for(cls, tile: Tuple[int, int], now: Optional[float] = None) -> str:
+        """Cache key for a tile in the current (or `now`'s) time bucket."""
+        bucket = int((time.time() if now is None else now) // cls._bucket_seconds())
+        row, col = tile
+        return f"weather:v{cls.KEY_VERSION}:{cls._tile_degrees()}:{row}:{col}:{bucket}"
+
+    @classmethod
+    def forecast_key_for(
+        cls, tile: Tuple[int, int], day: date, now: Optional[float] = None
+    ) -> str:
+        """Cache key for one tile's hourly forecast on one UTC day."""
+        return f"{cls.key_for(tile, now)}:{day.isoformat()}"
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Dict[str, Any]]:
+        """Cached weather, or None. Misses are counted by `fill`."""
+        weather = cls._cache().get(key)
+        if weather is not None:
+            cls._stats.hit()
+        return weather
+
+    @classmethod
+    def fill(
+        cls, key: str, fetch: Callable[..., Optional[Dict[str, Any]]], *args
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch through single-flight and store non-empty results."""
+        weather, shared = cls._flight.do(key, cls._fetch_and_store, key, fetch, *args)
+        cls._record(shared)
+        return weather
+
+    @classmethod
+    def get_many(cls, keys: List[str]) -> Dict[str, Any]:
+        """Cached entries for `keys`; every key not found counts as a miss."""
+        found = cls._cache().get_many(keys)
+        for key in keys:
+            if key in found:
+                cls._stats.hit()
+            else:
+                cls._stats.miss()
+        return found
+
+    @classmethod
+    def set_many(cls, entries: Dict[str, Any]) -> None:
+        cls._cache().set_many(entries, timeout=cls._ttl())
+
+    @classmethod
+    async def aget(cls, key: str) -> Optional[Dict[str, Any]]:
+        weather = await cls._cache().aget(key)
+        if weather is not None:
+            cls._stats.hit()
+        return weather
+
+    @classmethod
+    async def afill(cls, key: str, fetch, *args) -> Optional[Dict[str, Any]]:
+        """Async variant of `fill`; `fetch` is a coroutine function."""
+        weather, shared = await cls._flight.ado(
+            key, cls._afetch_and_store, key, fetch, *args
+        )
+        cls._record(shared)
+        return weather
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls._config().get("ENABLED", True)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Hit/miss/coalesced counters plus backend size/eviction stats."""
+        stats = cls._stats.snapshot()
+        backend = cls._cache()
+        if hasattr(backend, "stats"):
+            stats.update(backend.stats())
+        return stats
+
+    @classmethod
+    def _fetch_and_store(cls, key, fetch, *args):
+        weather = fetch(*args)
+        if weather is not None:
+            cls._cache().set(key, weather, timeout=cls._ttl())
+        return weather
+
+    @classmethod
+    async def _afetch_and_store(cls, key, fetch, *args):
+        weather = await fetch(*args)
+        if weather is not None:
+            await cls._cache().aset(key, weather, timeout=cls._ttl())
+        return weather
+
+    @classmethod
+    def _record(cls, shared: bool) -> None:
+        if shared:
+            cls._stats.coalesce()
+        else:
+            cls._stats.miss()
+
+    @classmethod
+    def _ttl(cls) -> int:
+        """Seconds left in the current bucket (entries die at the refresh)."""
+        bucket_seconds = cls._bucket_seconds()
+        return max(1, math.ceil(bucket_seconds - time.time() % bucket_seconds))
+
+    @classmethod
+    def _tile_degrees(cls) -> float:
+        return float(cls._config().get("TILE_DEGREES", cls.DEFAULT_TILE_DEGREES))
+
+    @classmethod
+    def _bucket_seconds(cls) -> int:
+        return int(cls._config().get("BUCKET_SECONDS", cls.DEFAULT_BUCKET_SECONDS))
+
+    @classmethod
+    def _cache(cls):
+        return caches[cls._config().get("ALIAS", cls.DEFAULT_ALIAS)]
+
+    @staticmethod
+    def _config() -> Dict[str, Any]:
+        return getattr(settings, "WEATHER_CACHE", {})
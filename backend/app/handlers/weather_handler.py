@@ -1,18 +1,37 @@
 """Simple weather handler using Open-Meteo public API.
 
 This enriches trips with basic current weather for start and dropoff
-locations without requiring an API key.
+locations without requiring an API key. Requests go through the shared
+pooled UpstreamClient; nearby lookups in the same 15-minute window are
+served from WeatherCache.
+
+`get_forecast_points` returns the hourly forecast at many (point, ETA)
+pairs — route samples and HOS stops — from one multi-location request.
 """
 
 from __future__ import annotations
 
-from typing import Optional, Dict, Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+from django.conf import settings
 
-import requests
+from .upstream_client import get_upstream_client
+from .weather_cache import WeatherCache
 
 
 class WeatherHandler:
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
+    # Open-Meteo hourly variable → response field
+    HOURLY_FIELDS = {
+        "temperature_2m": "temperature_c",
+        "precipitation": "precipitation_mm",
+        "weathercode": "weathercode",
+        "windspeed_10m": "windspeed_kmh",
+        "winddirection_10m": "winddirection_deg",
+    }
+    FORECAST_DAYS = 16  # Open-Meteo's forecast horizon
+    PAST_DAYS = 92  # How far back the forecast endpoint still serves
 
     @classmethod
     def get_current_weather(cls, lat: float, lng: float) -> Optional[Dict[str, Any]]:
@@ -24,21 +43,173 @@ class WeatherHandler:
         if lat is None or lng is None:
             return None
 
+        if not WeatherCache.enabled():
+            return cls._fetch_current(lat, lng)
+
+        tile = WeatherCache.tile_for(lat, lng)
+        key = WeatherCache.key_for(tile)
+        cached = WeatherCache.get(key)
+        if cached is not None:
+            return cached
+        return WeatherCache.fill(
+            key, cls._fetch_current, *WeatherCache.tile_center(tile)
+        )
+
+    @classmethod
+    async def aget_current_weather(
+        cls, lat: float, lng: float
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of `get_current_weather`."""
+
+        if lat is None or lng is None:
+            return None
+
+        if not WeatherCache.enabled():
+            return await cls._afetch_current(lat, lng)
+
+        tile = WeatherCache.tile_for(lat, lng)
+        key = WeatherCache.key_for(tile)
+        cached = await WeatherCache.aget(key)
+        if cached is not None:
+            return cached
+        return await WeatherCache.afill(
+            key, cls._afetch_current, *WeatherCache.tile_center(tile)
+        )
+
+    @classmethod
+    def _fetch_current(cls, lat: float, lng: float) -> Optional[Dict[str, Any]]:
+        """Uncached Open-Meteo lookup; None on failure."""
         try:
-            resp = requests.get(
-                cls.BASE_URL,
+            data = get_upstream_client().get_json(
+                getattr(settings, "OPEN_METEO_BASE_URL", cls.BASE_URL),
+                params=cls._params(lat, lng),
+                timeout=5,
+            )
+        except Exception:
+            return None
+
+        return cls._parse_current(data)
+
+    @classmethod
+    async def _afetch_current(cls, lat: float, lng: float) -> Optional[Dict[str, Any]]:
+        """Async variant of `_fetch_current`."""
+        try:
+            data = await get_upstream_client().aget_json(
+                getattr(settings, "OPEN_METEO_BASE_URL", cls.BASE_URL),
+                params=cls._params(lat, lng),
+                timeout=5,
+            )
+        except Exception:
+            return None
+
+        return cls._parse_current(data)
+
+    @classmethod
+    def get_forecast_points(
+        cls, points: List[Tuple[float, float, datetime]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Hourly forecast at each (lat, lng, eta), matched to the ETA's hour.
+
+        Points are grouped into WeatherCache tiles; tile-days not in the cache
+        are fetched together in a single multi-location request, then cached
+        per tile and UTC day. Returns one payload (or None) per point.
+
+        Points whose ETA day is outside the range Open-Meteo serves are None
+        and never requested, since one such day in the shared request would
+        make it fail for every point.
+        """
+
+        if not points:
+            return []
+
+        today = datetime.now(timezone.utc).date()
+        earliest = today - timedelta(days=cls.PAST_DAYS)
+        horizon = today + timedelta(days=cls.FORECAST_DAYS - 1)
+        wanted = []  # (key, tile, day, hour) per point
+        for lat, lng, eta in points:
+            hour = eta.astimezone(timezone.utc).replace(
+                minute=0, second=0, microsecond=0
+            )
+            tile = WeatherCache.tile_for(lat, lng)
+            if not earliest <= hour.date() <= horizon:
+                wanted.append(None)
+                continue
+            key = WeatherCache.forecast_key_for(tile, hour.date())
+            wanted.append((key, tile, hour.date(), hour.strftime("%Y-%m-%dT%H:00")))
+
+        keys = list(dict.fromkeys(w[0] for w in wanted if w))
+        days = WeatherCache.get_many(keys) if WeatherCache.enabled() else {}
+
+        missing = {w[0]: w for w in wanted if w and w[0] not in days}
+        if missing:
+            tiles = list(dict.fromkeys(w[1] for w in missing.values()))
+            start = min(w[2] for w in missing.values())
+            end = max(w[2] for w in missing.values())
+            fetched = cls._fetch_hourly(tiles, start, end)
+            if WeatherCache.enabled():
+                WeatherCache.set_many(fetched)
+            days.update(fetched)
+
+        return [(days.get(w[0]) or {}).get(w[3]) if w else None for w in wanted]
+
+    @classmethod
+    def _fetch_hourly(
+        cls, tiles: List[Tuple[int, int]], start: date, end: date
+    ) -> Dict[str, Dict[str, Any]]:
+        """One Open-Meteo call for all tiles; returns {forecast_key: {hour: payload}}."""
+        centers = [WeatherCache.tile_center(tile) for tile in tiles]
+        try:
+            data = get_upstream_client().get_json(
+                getattr(settings, "OPEN_METEO_BASE_URL", cls.BASE_URL),
                 params={
-                    "latitude": lat,
-                    "longitude": lng,
-                    "current_weather": "true",
+                    "latitude": ",".join(str(lat) for lat, _ in centers),
+                    "longitude": ",".join(str(lng) for _, lng in centers),
+                    "hourly": ",".join(cls.HOURLY_FIELDS),
+                    "start_date": start.isoformat(),
+                    "end_date": end.isoformat(),
+                    "timezone": "GMT",
                 },
                 timeout=5,
             )
-            resp.raise_for_status()
-            data = resp.json()
         except Exception:
-            return None
+            return {}
+
+        # A single location comes back as an object, several as a list
+        locations = data if isinstance(data, list) else [data]
+        entries: Dict[str, Dict[str, Any]] = {}
+        for tile, location in zip(tiles, locations):
+            for time_str, payload in cls._parse_hourly(location).items():
+                day = date.fromisoformat(time_str[:10])
+                key = WeatherCache.forecast_key_for(tile, day)
+                entries.setdefault(key, {})[time_str] = payload
+        return entries
+
+    @classmethod
+    def _parse_hourly(cls, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        hourly = data.get("hourly") or {}
+        times = hourly.get("time") or []
+        columns = {
+            field: hourly.get(variable) or [None] * len(times)
+            for variable, field in cls.HOURLY_FIELDS.items()
+        }
+        return {
+            time_str: {
+                "forecast_time": f"{time_str}:00Z",
+                **{field: values[i] for field, values in columns.items()},
+            }
+            for i, time_str in enumerate(times)
+        }
+
+    @staticmethod
+    def _params(lat: float, lng: float) -> Dict[str, Any]:
+        return {
+            "latitude": lat,
+            "longitude": lng,
+            "current_weather": "true",
+        }
 
+    @staticmethod
+    def _parse_current(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         current = data.get("current_weather") or {}
         if not current:
             return None
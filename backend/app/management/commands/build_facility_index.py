@@ -0,0 +1,29 @@
+"""Compile a truck stop / fuel / rest area dataset into a memory-mappable .npy."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.handlers.facilities import FacilityIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a compiled facility index for stop snapping "
+        "(set FACILITIES_DATASET to the output path)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Facility CSV or GeoJSON (Points)")
+        parser.add_argument("output", help="Destination .npy file")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = FacilityIndex.load(options["source"])
+        index.save(options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['output']}: {len(index)} facilities "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,29 @@
+"""Compile an OSM-derived road GeoJSON into the local router's .npz graph."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.handlers.local_routing import RoadGraph
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a compiled road graph for the local routing provider "
+        "(set LOCAL_ROUTING_GRAPH to the output path)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Road network GeoJSON (LineStrings)")
+        parser.add_argument("output", help="Destination .npz file")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        graph = RoadGraph.load(options["source"])
+        graph.save(options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['output']}: {graph.node_count} nodes, "
+                f"{graph.edge_count} edges in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,121 @@
+"""
+Compact plan renderer — opt-in dense encoding for /api/trips/plan
+
+Selected with `?format=compact` or
+`Accept: application/vnd.trip-plan.compact+json`; plain JSON stays default.
+
+- GeoJSON LineStrings become Google encoded polylines (precision 5, the same
+  precision OSRM returns, so no detail is lost)
+- Segment lists become columnar arrays: epoch-second offsets and durations,
+  status/miles columns and a note dictionary instead of repeated ISO strings
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from rest_framework.renderers import JSONRenderer
+
+from .handlers.geometry import encode_polyline
+
+POLYLINE_PRECISION = 5
+
+
+class CompactPlanRenderer(JSONRenderer):
+    media_type = "application/vnd.trip-plan.compact+json"
+    format = "compact"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and "segments" in data:
+            data = compact_plan(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def compact_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the compact encoding of a plan_trip result."""
+    compact = dict(plan)
+    compact["encoding"] = "compact-v1"
+
+    route = plan.get("route")
+    if route:
+        route = dict(route)
+        route["geometry"] = encode_line(route["geometry"])
+        route["legs"] = [
+            (
+                {**leg, "geometry": encode_line(leg["geometry"])}
+                if "geometry" in leg
+                else leg
+            )
+            for leg in route.get("legs", [])
+        ]
+        compact["route"] = route
+
+    compact["segments"] = columnar_segments(plan.get("segments") or [])
+    compact["daily_logs"] = [
+        {**log, "segments": columnar_segments(log["segments"])}
+        for log in plan.get("daily_logs") or []
+    ]
+    return compact
+
+
+def encode_line(geometry: Dict[str, Any]) -> Dict[str, Any]:
+    """GeoJSON LineString ([lng, lat]) → encoded polyline (lat, lng order)."""
+    return {
+        "type": "EncodedPolyline",
+        "precision": POLYLINE_PRECISION,
+        "polyline": encode_polyline(geometry["coordinates"], POLYLINE_PRECISION),
+    }
+
+
+def columnar_segments(segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pack segment dicts into parallel arrays.
+
+    Returns:
+        {
+            "base_epoch_s": int,       # Start of the first segment (UTC epoch)
+            "offset_s": [int, ...],    # Segment start relative to base
+            "duration_s": [int, ...],
+            "status": [str, ...],
+            "miles": [float, ...],
+            "note_index": [int, ...],  # Index into "notes"
+            "notes": [str, ...]
+        }
+    """
+    if not segments:
+        return {
+            "base_epoch_s": None,
+            "offset_s": [],
+            "duration_s": [],
+            "status": [],
+            "miles": [],
+            "note_index": [],
+            "notes": [],
+        }
+
+    starts = [_epoch_seconds(seg["start_datetime"]) for seg in segments]
+    ends = [_epoch_seconds(seg["end_datetime"]) for seg in segments]
+    base = starts[0]
+
+    notes: List[str] = []
+    note_lookup: Dict[str, int] = {}
+    note_index = []
+    for seg in segments:
+        note = seg.get("note", "")
+        if note not in note_lookup:
+            note_lookup[note] = len(notes)
+            notes.append(note)
+        note_index.append(note_lookup[note])
+
+    return {
+        "base_epoch_s": base,
+        "offset_s": [start - base for start in starts],
+        "duration_s": [end - start for start, end in zip(starts, ends)],
+        "status": [seg["status"] for seg in segments],
+        "miles": [round(seg["miles"], 2) for seg in segments],
+        "note_index": note_index,
+        "notes": notes,
+    }
+
+
+def _epoch_seconds(value: str) -> int:
+    return round(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
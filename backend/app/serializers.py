@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from .handlers.hos_rule_sets import DEFAULT_RULE_SET, RULE_SETS
+
 
 class LocationSerializer(serializers.Serializer):
     lat = serializers.FloatField()
@@ -12,4 +15,210 @@ class TripPlanSerializer(serializers.Serializer):
     pickup = LocationSerializer()
     dropoff = LocationSerializer()
     current_cycle_used_hours = serializers.FloatField(required=False, default=0.0)
+    cycle_history_hours = serializers.ListField(
+        child=serializers.FloatField(min_value=0.0, max_value=24.0),
+        required=False,
+        max_length=7,
+    )
     start_datetime = serializers.DateTimeField(required=False, allow_null=True)
+    rule_set = serializers.ChoiceField(
+        choices=list(RULE_SETS), required=False, default=DEFAULT_RULE_SET
+    )
+    fuel_interval_miles = serializers.FloatField(required=False, min_value=1.0)
+    sleeper_berth_split = serializers.BooleanField(required=False, default=False)
+    routing_provider = serializers.ChoiceField(
+        choices=["osrm", "local"], required=False
+    )
+    include_leg_geometry = serializers.BooleanField(required=False, default=True)
+    simplify_tolerance_m = serializers.FloatField(required=False, min_value=0.0)
+    simplify_zoom = serializers.FloatField(
+        required=False, min_value=0.0, max_value=22.0
+    )
+    route_weather_samples = serializers.IntegerField(
+        required=False, default=0, min_value=0, max_value=48
+    )
+    debug = serializers.BooleanField(required=False, default=False)
+
+
+class TripDepartureSerializer(TripPlanSerializer):
+    earliest_departure = serializers.DateTimeField()
+    latest_departure = serializers.DateTimeField()
+    objective = serializers.ChoiceField(
+        choices=["arrival", "elapsed"], required=False, default="arrival"
+    )
+
+    def validate(self, attrs):
+        if attrs.get("sleeper_berth_split"):
+            raise serializers.ValidationError(
+                "sleeper_berth_split is not supported here."
+            )
+        if attrs["latest_departure"] < attrs["earliest_departure"]:
+            raise serializers.ValidationError(
+                "latest_departure must not be before earliest_departure."
+            )
+        return attrs
+
+
+class TripWhatIfSerializer(serializers.Serializer):
+    start = LocationSerializer()
+    pickup = LocationSerializer()
+    dropoff = LocationSerializer()
+    routing_provider = serializers.ChoiceField(
+        choices=["osrm", "local"], required=False
+    )
+    start_datetimes = serializers.ListField(
+        child=serializers.DateTimeField(), min_length=1
+    )
+    current_cycle_used_hours = serializers.ListField(
+        child=serializers.FloatField(min_value=0.0, max_value=70.0), min_length=1
+    )
+    rule_set = serializers.ChoiceField(
+        choices=list(RULE_SETS), required=False, default=DEFAULT_RULE_SET
+    )
+    fuel_interval_miles = serializers.FloatField(required=False, min_value=1.0)
+
+    def validate(self, attrs):
+        if "cycle_history_hours" in self.initial_data:
+            raise serializers.ValidationError(
+                "The what-if grid uses a static cycle; use "
+                "/api/trips/plan/departure to compare departures with "
+                "cycle_history_hours."
+            )
+        max_cells = getattr(settings, "PLAN_WHAT_IF_MAX_CELLS", 10000)
+        cells = len(attrs["start_datetimes"]) * len(attrs["current_cycle_used_hours"])
+        if cells > max_cells:
+            raise serializers.ValidationError(
+                f"Grid is limited to {max_cells} cells (got {cells})."
+            )
+        return attrs
+
+
+class PlanPositionsSerializer(serializers.Serializer):
+    times = serializers.ListField(child=serializers.DateTimeField(), min_length=1)
+
+    def validate(self, attrs):
+        max_times = getattr(settings, "PLAN_POSITIONS_MAX_TIMES", 10000)
+        if len(attrs["times"]) > max_times:
+            raise serializers.ValidationError(
+                f"Lookups are limited to {max_times} times per request "
+                f"(got {len(attrs['times'])})."
+            )
+        return attrs
+
+
+class HosCycleCheckpointSerializer(serializers.Serializer):
+    used_hours = serializers.FloatField(required=False, min_value=0.0)
+    day = serializers.DateField(required=False)
+    daily_hours = serializers.ListField(
+        child=serializers.FloatField(min_value=0.0, max_value=24.0),
+        required=False,
+        min_length=1,
+        max_length=8,
+    )
+
+    def validate(self, attrs):
+        if "daily_hours" in attrs:
+            if "day" not in attrs:
+                raise serializers.ValidationError("day is required with daily_hours.")
+        elif "used_hours" not in attrs:
+            raise serializers.ValidationError(
+                "Send used_hours, or day and daily_hours."
+            )
+        return attrs
+
+
+class HosSplitCheckpointSerializer(serializers.Serializer):
+    hours = serializers.FloatField(min_value=0.0)
+    sleeper_berth = serializers.BooleanField()
+    ended_at = serializers.DateTimeField()
+    drive_since_hours = serializers.FloatField(
+        required=False, default=0.0, min_value=0.0
+    )
+
+
+class HosCheckpointSerializer(serializers.Serializer):
+    at = serializers.DateTimeField()
+    shift_started_at = serializers.DateTimeField(required=False, allow_null=True)
+    drive_in_shift_hours = serializers.FloatField(
+        required=False, default=0.0, min_value=0.0
+    )
+    drive_since_break_hours = serializers.FloatField(
+        required=False, default=0.0, min_value=0.0
+    )
+    distance_since_fuel_miles = serializers.FloatField(
+        required=False, default=0.0, min_value=0.0
+    )
+    cycle = HosCycleCheckpointSerializer()
+    split = HosSplitCheckpointSerializer(required=False, allow_null=True)
+
+
+class DutyEventSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=["OFF", "SB", "D", "ON"])
+    start_datetime = serializers.DateTimeField()
+    end_datetime = serializers.DateTimeField()
+    miles = serializers.FloatField(required=False, default=0.0, min_value=0.0)
+    note = serializers.CharField(required=False, default="", allow_blank=True)
+
+
+class StopSerializer(LocationSerializer):
+    type = serializers.ChoiceField(
+        choices=["pickup", "dropoff", "stop"], required=False, default="stop"
+    )
+    duration_hours = serializers.FloatField(
+        required=False, default=1.0, min_value=0.0, max_value=24.0
+    )
+
+
+class TripReplanSerializer(serializers.Serializer):
+    checkpoint = HosCheckpointSerializer(required=False)
+    current_cycle_used_hours = serializers.FloatField(required=False, default=0.0)
+    cycle_history_hours = serializers.ListField(
+        child=serializers.FloatField(min_value=0.0, max_value=24.0),
+        required=False,
+        max_length=7,
+    )
+    events = DutyEventSerializer(many=True, required=False, max_length=1000)
+    current_position = LocationSerializer()
+    remaining_stops = StopSerializer(many=True, min_length=1, max_length=25)
+    rule_set = serializers.ChoiceField(
+        choices=list(RULE_SETS), required=False, default=DEFAULT_RULE_SET
+    )
+    fuel_interval_miles = serializers.FloatField(required=False, min_value=1.0)
+    sleeper_berth_split = serializers.BooleanField(required=False, default=False)
+    routing_provider = serializers.ChoiceField(
+        choices=["osrm", "local"], required=False
+    )
+    include_leg_geometry = serializers.BooleanField(required=False, default=True)
+    debug = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        checkpoint = attrs.get("checkpoint")
+        events = attrs.get("events", [])
+        if checkpoint is None and not events:
+            raise serializers.ValidationError(
+                "Send a checkpoint, or the duty-status events so far."
+            )
+        if checkpoint is not None and "cycle_history_hours" in attrs:
+            raise serializers.ValidationError(
+                "cycle_history_hours is not used with a checkpoint; "
+                "the checkpoint carries the cycle."
+            )
+        at = checkpoint["at"] if checkpoint is not None else None
+        clock = None
+        for event in events:
+            start, end = event["start_datetime"], event["end_datetime"]
+            if end < start:
+                raise serializers.ValidationError(
+                    "Each event must end at or after its start."
+                )
+            if clock is not None and start < clock:
+                raise serializers.ValidationError(
+                    "Events must be in time order and must not overlap."
+                )
+            if at is not None and start < at < end:
+                raise serializers.ValidationError(
+                    "An event must not span the checkpoint; split it at "
+                    "checkpoint.at."
+                )
+            clock = end
+        return attrs
@@ -0,0 +1,111 @@
+"""Departure search: piece ends must match a per-minute search."""
+
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.handlers import DepartureOptimizer, HosRulesHandler
+
+EARLIEST = datetime(2025, 1, 15, 22, 30, tzinfo=timezone.utc)
+LATEST = datetime(2025, 1, 16, 1, 30, tzinfo=timezone.utc)
+SKELETON = [
+    {"status": "D", "duration_hours": 20.0, "miles": 1100.0, "note": "Leg"},
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff"},
+]
+# 70 hours in the window: nothing fits until the oldest day rolls off
+HISTORY = [10.0] * 7
+
+
+def per_minute(objective):
+    best = None
+    departure = EARLIEST
+    while departure <= LATEST:
+        days_waited = (departure.date() - EARLIEST.date()).days
+        arrival = HosRulesHandler.execute(
+            SKELETON, 0.0, departure, HISTORY + [0.0] * days_waited
+        )["segments"][-1].end
+        score = arrival if objective == "arrival" else arrival - departure
+        if best is None or score < best[0]:
+            best = (score, departure, arrival)
+        departure += timedelta(minutes=1)
+    return best[1], best[2]
+
+
+class DepartureOptimizerTests(SimpleTestCase):
+    def test_static_cycle_is_one_piece(self):
+        result = DepartureOptimizer.execute(SKELETON, 30.0, EARLIEST, LATEST)
+        self.assertEqual(result["departure"], EARLIEST)
+        self.assertEqual(result["evaluated"], 1)
+        self.assertEqual(len(result["pieces"]), 1)
+
+    def test_rolling_cycle_matches_per_minute_search(self):
+        for objective in ("arrival", "elapsed"):
+            result = DepartureOptimizer.execute(
+                SKELETON, 0.0, EARLIEST, LATEST, objective, None, HISTORY
+            )
+            self.assertEqual(
+                (result["departure"], result["arrival"]), per_minute(objective)
+            )
+            self.assertLess(result["evaluated"], 60)
+
+    def test_departing_after_midnight_skips_the_wait(self):
+        result = DepartureOptimizer.execute(
+            SKELETON, 0.0, EARLIEST, LATEST, "arrival", None, HISTORY
+        )
+        self.assertEqual(
+            result["departure"], datetime(2025, 1, 16, tzinfo=timezone.utc)
+        )
+        self.assertGreater(len(result["pieces"]), 1)
+
+    def test_history_for_the_chosen_departure_is_returned(self):
+        result = DepartureOptimizer.execute(
+            SKELETON, 0.0, EARLIEST, LATEST, "arrival", None, HISTORY
+        )
+        self.assertEqual(result["cycle_history_hours"], HISTORY + [0.0])
+        static = DepartureOptimizer.execute(SKELETON, 30.0, EARLIEST, LATEST)
+        self.assertIsNone(static["cycle_history_hours"])
+
+
+ROUTE = {
+    "geometry": {
+        "type": "LineString",
+        "coordinates": [[-74.0 - i * 0.4, 40.7 - i * 0.06] for i in range(101)],
+    },
+    "total_distance_miles": 1_100.0,
+    "total_duration_hours": 20.0,
+    "legs": [
+        {"distance_miles": 0.0, "duration_hours": 0.0},
+        {"distance_miles": 1_100.0, "duration_hours": 20.0},
+    ],
+}
+
+
+class PlanDepartureTests(SimpleTestCase):
+    def test_plan_arrives_when_the_departure_block_says(self):
+        body = {
+            "start": {"lat": 40.7128, "lng": -74.006},
+            "pickup": {"lat": 40.7489, "lng": -73.968},
+            "dropoff": {"lat": 34.0522, "lng": -118.2437},
+            "earliest_departure": EARLIEST.isoformat(),
+            "latest_departure": LATEST.isoformat(),
+            "cycle_history_hours": HISTORY,
+            # Same arrival for every departure: the latest, a day later, wins
+            "objective": "elapsed",
+        }
+        with mock.patch(
+            "app.controllers.trip_controller.ComputeRouteHandler.execute",
+            return_value=ROUTE,
+        ), mock.patch(
+            "app.controllers.trip_controller.WeatherHandler.get_current_weather",
+            return_value=None,
+        ):
+            response = self.client.post(
+                "/api/trips/plan/departure", body, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        result = response.json()
+        departure, plan = result["departure"], result["plan"]
+        self.assertEqual(plan["segments"][0]["start_datetime"], departure["departure"])
+        self.assertEqual(departure["departure"], LATEST.isoformat())
+        self.assertEqual(plan["segments"][-1]["end_datetime"], departure["arrival"])
@@ -0,0 +1,64 @@
+"""Rolling-cycle limit: wait for hours to roll off unless a restart is sooner."""
+
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from app.handlers import HosRulesHandler
+from app.handlers.duty_cycle import RollingCycle, StaticCycle
+
+START = datetime(2025, 1, 15, 8, tzinfo=timezone.utc)
+LONG_DRIVE = [{"status": "D", "duration_hours": 30.0, "miles": 1650.0}]
+
+
+def off_duty(segments):
+    return [seg for seg in segments if seg.status == "OFF"]
+
+
+class NextRoomTests(SimpleTestCase):
+    def test_room_now(self):
+        cycle = RollingCycle([10.0] * 6, START)
+        self.assertEqual(cycle.next_room(START), START)
+
+    def test_room_at_the_midnight_hours_roll_off(self):
+        cycle = RollingCycle([10.0] * 7, START)
+        self.assertEqual(
+            cycle.next_room(START), datetime(2025, 1, 16, tzinfo=timezone.utc)
+        )
+
+    def test_static_cycle_never_rolls_off(self):
+        self.assertIsNone(StaticCycle(70.0).next_room(START))
+
+
+class CycleLimitRestTests(SimpleTestCase):
+    def test_reset_when_hours_roll_off_overnight(self):
+        # The 60 hours drop out at midnight: a 10-hour reset covers the wait
+        result = HosRulesHandler.execute(LONG_DRIVE, 0.0, START, [60, 0, 0, 0, 0, 0, 0])
+        rests = off_duty(result["segments"])
+        wait = rests[1]
+        self.assertEqual(wait.start, datetime(2025, 1, 15, 18, 30, tzinfo=timezone.utc))
+        self.assertEqual(wait.end, datetime(2025, 1, 16, 4, 30, tzinfo=timezone.utc))
+        self.assertIn("roll off", wait.note)
+        self.assertFalse(any("restart" in seg.note for seg in rests))
+
+    def test_wait_until_midnight_instead_of_restart(self):
+        result = HosRulesHandler.execute(LONG_DRIVE, 0.0, START, [10.0] * 7)
+        wait = result["segments"][0]
+        self.assertEqual(wait.status, "OFF")
+        self.assertEqual(wait.start, START)
+        self.assertEqual(wait.end, datetime(2025, 1, 16, tzinfo=timezone.utc))
+        self.assertFalse(any("restart" in seg.note for seg in result["segments"]))
+
+    def test_restart_when_waiting_takes_longer(self):
+        # The next 24 hours only roll off three midnights away (64 h > 34 h)
+        result = HosRulesHandler.execute(
+            LONG_DRIVE, 0.0, START, [0, 0, 24, 24, 22, 0, 0]
+        )
+        restart = result["segments"][0]
+        self.assertEqual(restart.status, "OFF")
+        self.assertEqual((restart.end - restart.start).total_seconds(), 34 * 3600)
+        self.assertIn("restart", restart.note)
+
+    def test_static_cycle_still_restarts(self):
+        result = HosRulesHandler.execute(LONG_DRIVE, 70.0, START)
+        self.assertIn("restart", result["segments"][0].note)
@@ -0,0 +1,55 @@
+"""Daily logs: the single sweep clips exactly like checking every segment per day."""
+
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from app.handlers import EldLogGenerator, HosRulesHandler
+
+START = datetime(2025, 1, 15, 21, 45, tzinfo=timezone.utc)
+
+
+def per_day(segments):
+    """(date, [(start, end, status, miles)]) for every day, by full rescan."""
+    days = []
+    day = segments[0].start.date()
+    while day <= segments[-1].end.date():
+        day_start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        day_end = day_start + timedelta(days=1)
+        days.append(
+            (
+                day.isoformat(),
+                [
+                    (max(seg.start, day_start), min(seg.end, day_end), seg.status)
+                    for seg in segments
+                    if seg.end > day_start and seg.start < day_end
+                ],
+            )
+        )
+        day += timedelta(days=1)
+    return days
+
+
+class EldSweepTests(SimpleTestCase):
+    def test_matches_a_full_rescan(self):
+        skeleton = []
+        for index in range(40):
+            skeleton.append(
+                {"status": "D", "duration_hours": 3.7, "miles": 200.0, "note": "Leg"}
+            )
+            skeleton.append(
+                {"status": "ON", "duration_hours": 0.0, "miles": 0, "note": "Check"}
+            )
+        segments = HosRulesHandler.execute(skeleton, 0, START)["segments"]
+        logs = EldLogGenerator.execute(segments)
+        self.assertGreater(len(logs), 10)
+        self.assertEqual(
+            [
+                (
+                    log["date"],
+                    [(seg.start, seg.end, seg.status) for seg in log["segments"]],
+                )
+                for log in logs
+            ],
+            per_day(segments),
+        )
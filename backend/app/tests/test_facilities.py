@@ -0,0 +1,124 @@
+"""Facility snapping: only back along the route, inside the window and detour budget."""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.controllers.trip_controller import _generate_stops
+from app.handlers import Segment
+from app.handlers.facilities import METERS_PER_MILE, FacilityIndex
+from app.handlers.geometry import METERS_PER_DEG_LAT, RouteIndex
+
+# West-east route along 40°N, one vertex every 0.01° of longitude (~850 m)
+ROUTE = RouteIndex([[-100.0 + index * 0.01, 40.0] for index in range(150)])
+DETOUR_M = 3 * METERS_PER_MILE
+WINDOW_M = 25 * METERS_PER_MILE
+
+
+def beside(miles_along, miles_off=0.0):
+    """(lng, lat) `miles_off` north of the route point `miles_along` from the start."""
+    ((lng, lat),) = ROUTE.points_at_distances([miles_along * METERS_PER_MILE])
+    return lng, lat + miles_off * METERS_PER_MILE / METERS_PER_DEG_LAT
+
+
+def index_of(*facilities):
+    return FacilityIndex.from_rows(
+        (*beside(along, off), name, kind) for name, kind, along, off in facilities
+    )
+
+
+def snap(index, ideal_miles, kinds=("truck_stop", "fuel")):
+    return index.snap(ROUTE, ideal_miles * METERS_PER_MILE, DETOUR_M, WINDOW_M, kinds)
+
+
+class FacilitySnapTests(SimpleTestCase):
+    def test_snaps_back_within_the_window_and_detour_budget(self):
+        index = index_of(
+            ("Behind", "truck_stop", 50.0, 1.0),
+            ("Ahead", "truck_stop", 64.0, 0.0),
+            ("Outside window", "truck_stop", 20.0, 0.0),
+            ("Too far off", "truck_stop", 59.0, 4.0),
+        )
+        facility = snap(index, 60.0)
+        self.assertEqual(facility["name"], "Behind")
+        self.assertAlmostEqual(facility["off_route_miles"], 1.0, delta=0.05)
+        self.assertAlmostEqual(facility["miles_before_ideal"], 10.0, delta=0.3)
+        self.assertLessEqual(facility["off_route_miles"], 3.0)
+        self.assertLessEqual(facility["miles_before_ideal"], 25.0)
+
+    def test_prefers_the_least_moved_back_plus_detour(self):
+        index = index_of(
+            ("Far back on route", "fuel", 45.0, 0.0),
+            ("Near but off route", "fuel", 58.0, 2.0),
+        )
+        # 2 back + 2 × 2 off beats 15 back
+        self.assertEqual(snap(index, 60.0)["name"], "Near but off route")
+
+    def test_none_when_nothing_fits(self):
+        index = index_of(
+            ("Ahead", "truck_stop", 65.0, 0.0),
+            ("Outside window", "truck_stop", 30.0, 0.0),
+            ("Too far off", "truck_stop", 59.0, 4.0),
+        )
+        self.assertIsNone(snap(index, 60.0))
+
+    def test_kinds_filter_candidates(self):
+        index = index_of(
+            ("Rest area", "rest_area", 59.0, 0.0),
+            ("Truck stop", "truck stop", 40.0, 0.0),
+        )
+        self.assertEqual(snap(index, 60.0)["name"], "Truck stop")
+        self.assertEqual(
+            snap(index, 60.0, ("truck_stop", "rest_area", "parking"))["name"],
+            "Rest area",
+        )
+
+    def test_within_returns_nearest_first_inside_the_radius(self):
+        index = index_of(
+            ("Two", "fuel", 2.0, 0.0),
+            ("One", "fuel", 1.0, 0.0),
+            ("Far", "fuel", 30.0, 0.0),
+        )
+        found, distances = index.within(*beside(0.0), 5 * METERS_PER_MILE)
+        self.assertEqual(
+            [str(name) for name in index.records[found]["name"]], ["One", "Two"]
+        )
+        self.assertTrue((distances <= 5 * METERS_PER_MILE).all())
+
+    def test_compiled_index_round_trips(self):
+        index = index_of(("Behind", "truck_stop", 50.0, 1.0))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "facilities.npy")
+            index.save(path)
+            loaded = FacilityIndex.load(path)
+            self.assertEqual(snap(loaded, 60.0), snap(index, 60.0))
+            del loaded
+
+
+class StopSnappingTests(SimpleTestCase):
+    def test_stops_move_to_their_facility(self):
+        start = datetime(2025, 1, 15, 6, 0, tzinfo=timezone.utc)
+        hour = timedelta(hours=1)
+        total = ROUTE.length_m / METERS_PER_MILE
+        segments = [
+            Segment(start, start + hour, "D", total / 2, "Drive"),
+            Segment(start + hour, start + 2 * hour, "ON", 0.0, "Fuel stop (30 min)"),
+            Segment(start + 2 * hour, start + 3 * hour, "D", total / 2, "Drive"),
+            Segment(start + 3 * hour, start + 13 * hour, "OFF", 0.0, "10-hour reset"),
+        ]
+        index = index_of(("Fuel", "fuel", total / 2 - 5.0, 0.5))
+        with mock.patch(
+            "app.controllers.trip_controller.get_facility_index", return_value=index
+        ):
+            fuel, rest = _generate_stops(segments, ROUTE)
+
+        self.assertEqual(fuel["facility"]["name"], "Fuel")
+        self.assertEqual((fuel["lng"], fuel["lat"]), beside(total / 2 - 5.0, 0.5))
+        # The rest stop at the end of the route has no facility in reach
+        self.assertIsNone(rest["facility"])
+        self.assertEqual(
+            [rest["lng"], rest["lat"]], ROUTE.points_at_fractions([1.0])[0]
+        )
@@ -0,0 +1,151 @@
+"""Geometry: simplification in meters, polyline encoding and the route index."""
+
+import random
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import polyline
+from django.test import SimpleTestCase
+
+from app.controllers.trip_controller import _generate_stops
+from app.handlers import Segment
+from app.handlers.geometry import (
+    METERS_PER_DEG_LAT,
+    RouteIndex,
+    cumulative_distances_m,
+    encode_polyline,
+    resolve_tolerance,
+    simplify_coordinates,
+    simplify_route,
+    tolerance_for_zoom,
+)
+
+# A west-east line at 40°N with ±5 m of north-south jitter every ~85 m
+JITTER_DEG = 5.0 / METERS_PER_DEG_LAT
+COORDS = [
+    [-74.0 - index * 0.001, 40.0 + (JITTER_DEG if index % 2 else -JITTER_DEG)]
+    for index in range(200)
+]
+
+
+class SimplifyTests(SimpleTestCase):
+    def test_tolerance_is_in_meters(self):
+        self.assertEqual(len(simplify_coordinates(COORDS, 20.0)), 2)
+        self.assertEqual(len(simplify_coordinates(COORDS, 2.0)), len(COORDS))
+        kept = simplify_coordinates(COORDS, 20.0)
+        self.assertEqual(kept, [COORDS[0], COORDS[-1]])
+
+    def test_zoom_maps_to_one_pixel(self):
+        self.assertAlmostEqual(
+            tolerance_for_zoom(10) / tolerance_for_zoom(11), 2.0, places=9
+        )
+        self.assertAlmostEqual(
+            tolerance_for_zoom(10, 60.0), tolerance_for_zoom(10) * 0.5, places=9
+        )
+        # An explicit tolerance wins over zoom
+        self.assertEqual(resolve_tolerance(COORDS, 7.5, zoom=3), 7.5)
+        self.assertAlmostEqual(
+            resolve_tolerance(COORDS, zoom=12),
+            tolerance_for_zoom(12, 40.0),
+            delta=tolerance_for_zoom(12, 40.0) * 1e-6,
+        )
+        self.assertIsNone(resolve_tolerance(COORDS))
+
+    def test_route_and_legs_are_simplified_on_a_copy(self):
+        route = {
+            "geometry": {"type": "LineString", "coordinates": COORDS},
+            "legs": [
+                {"geometry": {"type": "LineString", "coordinates": COORDS[:100]}},
+                {"geometry": {"type": "LineString", "coordinates": COORDS[99:]}},
+            ],
+        }
+        simplified = simplify_route(route, 20.0)
+        self.assertEqual(
+            simplified["simplification"],
+            {"tolerance_m": 20.0, "original_points": 200, "points": 2},
+        )
+        for leg in simplified["legs"]:
+            self.assertEqual(len(leg["geometry"]["coordinates"]), 2)
+        self.assertEqual(len(route["geometry"]["coordinates"]), 200)
+        self.assertEqual(len(route["legs"][0]["geometry"]["coordinates"]), 100)
+        self.assertEqual(
+            simplified["legs"][1]["geometry"]["coordinates"][-1], COORDS[-1]
+        )
+
+
+class EncodePolylineTests(SimpleTestCase):
+    def test_matches_the_reference_encoder(self):
+        rng = random.Random(5)
+        coords = [[0.0, 0.0], [-179.99999, 89.99999], [179.99999, -89.99999]]
+        coords += [[rng.uniform(-180, 180), rng.uniform(-90, 90)] for _ in range(500)]
+        coords += [[coords[-1][0] + 0.00001, coords[-1][1]]] * 3
+        self.assertEqual(
+            encode_polyline(coords),
+            polyline.encode([(lat, lng) for lng, lat in coords]),
+        )
+        self.assertEqual(encode_polyline([]), "")
+
+
+# Dense vertices over the first 10 km, then sparse ones over the next 90 km
+UNEVEN = [[-100.0 + index * 0.001, 40.0] for index in range(118)] + [
+    [-100.0 + 0.117 + index * 0.117, 40.0] for index in range(1, 10)
+]
+
+
+def walk(coords, distance_m):
+    """Reference point at `distance_m` by walking the line segment by segment."""
+    travelled = 0.0
+    for a, b in zip(coords, coords[1:]):
+        step = float(cumulative_distances_m([a, b])[-1])
+        if travelled + step >= distance_m and step > 0:
+            t = (distance_m - travelled) / step
+            return [a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t]
+        travelled += step
+    return list(coords[-1])
+
+
+class RouteIndexTests(SimpleTestCase):
+    def test_lookups_match_a_linear_walk(self):
+        index = RouteIndex(UNEVEN)
+        for distance_m in (0.0, 1.0, 5_000.0, 12_345.0, 60_000.0, index.length_m):
+            (point,) = index.points_at_distances([distance_m])
+            expected = walk(UNEVEN, distance_m)
+            self.assertAlmostEqual(point[0], expected[0], places=9)
+            self.assertAlmostEqual(point[1], expected[1], places=9)
+
+    def test_distances_are_clamped_to_the_route(self):
+        index = RouteIndex(UNEVEN)
+        self.assertEqual(
+            index.points_at_distances([-5.0, index.length_m + 5.0]),
+            [UNEVEN[0], UNEVEN[-1]],
+        )
+        self.assertEqual(
+            index.points_at_fractions([0.5]),
+            index.points_at_distances([index.length_m / 2]),
+        )
+
+
+class StopPlacementTests(SimpleTestCase):
+    def test_stops_sit_at_their_share_of_driven_miles(self):
+        start = datetime(2025, 1, 15, 6, 0, tzinfo=timezone.utc)
+        hour = timedelta(hours=1)
+        segments = [
+            Segment(start, start + 2 * hour, "D", 20.0, "Drive"),
+            Segment(start + 2 * hour, start + 3 * hour, "ON", 0.0, "Fuel stop"),
+            Segment(start + 3 * hour, start + 9 * hour, "D", 60.0, "Drive"),
+            Segment(start + 9 * hour, start + 19 * hour, "OFF", 0.0, "10-hour reset"),
+            Segment(start + 19 * hour, start + 21 * hour, "D", 20.0, "Drive"),
+        ]
+        index = RouteIndex(UNEVEN)
+        with mock.patch(
+            "app.controllers.trip_controller.get_facility_index", return_value=None
+        ):
+            stops = _generate_stops(segments, index)
+
+        self.assertEqual([stop["type"] for stop in stops], ["fuel", "rest"])
+        for stop, share in zip(stops, (0.2, 0.8)):
+            # By distance, not by vertex count (the vertices are uneven)
+            expected = walk(UNEVEN, share * index.length_m)
+            self.assertAlmostEqual(stop["lng"], expected[0], places=9)
+            self.assertAlmostEqual(stop["lat"], expected[1], places=9)
+        self.assertEqual(stops[0]["estimated_arrival"], (start + 2 * hour).isoformat())
@@ -0,0 +1,44 @@
+"""What-if grid: cycle-hours columns simulated once match a full run per cell."""
+
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from app.handlers import HosGridSimulator, HosRulesHandler
+
+SKELETON = [
+    {"status": "D", "duration_hours": 9.5, "miles": 560.0, "note": "Start"},
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup"},
+    {"status": "D", "duration_hours": 26.0, "miles": 1_500.0, "note": "Leg 2"},
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff"},
+]
+STARTS = [
+    datetime(2025, 1, 15, 4, tzinfo=timezone.utc) + timedelta(hours=7 * index)
+    for index in range(4)
+]
+CYCLES = [0.0, 35.5, 62.0, 70.0]
+
+
+class HosGridTests(SimpleTestCase):
+    def test_every_cell_matches_a_full_simulation(self):
+        grid = HosGridSimulator.execute(SKELETON, STARTS, CYCLES)
+        self.assertEqual(grid["elapsed_hours"].shape, (len(STARTS), len(CYCLES)))
+        for row, start in enumerate(STARTS):
+            for column, cycle in enumerate(CYCLES):
+                segments = HosRulesHandler.execute(SKELETON, cycle, start)["segments"]
+                notes = [seg.note for seg in segments]
+                self.assertEqual(grid["arrivals"][row][column], segments[-1].end)
+                self.assertEqual(
+                    grid["restarts"][row][column],
+                    sum("cycle restart" in note for note in notes),
+                )
+                self.assertEqual(
+                    grid["resets"][row][column],
+                    sum(note.startswith("10-hour reset") for note in notes),
+                )
+
+    def test_rows_differ_only_by_departure(self):
+        grid = HosGridSimulator.execute(SKELETON, STARTS, CYCLES)
+        for row in grid["elapsed_hours"]:
+            self.assertEqual(row.tolist(), grid["elapsed_hours"][0].tolist())
+        self.assertGreater(len(set(grid["restarts"][0].tolist())), 1)
@@ -0,0 +1,30 @@
+"""Fuel-interval overrides apply per call and never grow the compiled cache."""
+
+from django.test import SimpleTestCase
+
+from app.handlers import RuleSet, get_rule_set
+from app.handlers.hos_rule_sets import FUEL, RULE_SETS, _compiled
+
+
+class FuelIntervalOverrideTests(SimpleTestCase):
+    def test_override_matches_a_compiled_rule_set(self):
+        for name, rule_set in RULE_SETS.items():
+            for miles in (None, 250.5, 1000.0):
+                copy = RuleSet(**{**vars(rule_set), "fuel_interval_miles": miles})
+                expected = copy.compile()
+                compiled = get_rule_set(name).with_fuel_interval(miles)
+                for slot in compiled.__slots__:
+                    self.assertEqual(
+                        getattr(compiled, slot), getattr(expected, slot), slot
+                    )
+
+    def test_overrides_are_not_cached(self):
+        before = dict(_compiled)
+        for miles in range(100, 5_000, 7):
+            self.assertIn(FUEL, get_rule_set(None, float(miles)).events)
+        self.assertEqual(_compiled, before)
+        self.assertIs(get_rule_set("property_60_7"), before["property_60_7"])
+
+    def test_unknown_rule_set(self):
+        with self.assertRaises(ValueError):
+            get_rule_set("bus_60_7", 500.0)
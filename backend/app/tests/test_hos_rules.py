@@ -0,0 +1,98 @@
+"""HOS simulation: long drive legs are split wherever a limit binds."""
+
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from app.handlers import HosRulesHandler
+
+START = datetime(2025, 1, 15, 6, 0, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def drive(hours, miles, note="Pickup → Dropoff"):
+    return {"status": "D", "duration_hours": hours, "miles": miles, "note": note}
+
+
+def stop(status, hours, note):
+    return {"status": status, "duration_hours": hours, "miles": 0, "note": note}
+
+
+def plan(skeleton, cycle_used=0):
+    return HosRulesHandler.execute(skeleton, cycle_used, START)["segments"]
+
+
+def check_property_carrier_limits(testcase, segments):
+    """Replay the segments and assert the 11/14/8-hour limits hold throughout."""
+    shift_start = segments[0].start
+    shift_driving = timedelta()
+    since_break = timedelta()
+    for seg in segments:
+        length = seg.end - seg.start
+        if seg.status in ("OFF", "SB") and length >= 10 * HOUR:
+            shift_start, shift_driving, since_break = seg.end, timedelta(), timedelta()
+            continue
+        if seg.status != "D":
+            if length >= timedelta(minutes=30):
+                since_break = timedelta()
+            continue
+        shift_driving += length
+        since_break += length
+        testcase.assertLessEqual(shift_driving, 11 * HOUR, seg)
+        testcase.assertLessEqual(seg.end - shift_start, 14 * HOUR, seg)
+        testcase.assertLessEqual(since_break, 8 * HOUR, seg)
+
+
+class DriveSplitTests(SimpleTestCase):
+    def test_long_leg_is_split_into_compliant_pieces(self):
+        segments = plan(
+            [stop("ON", 1, "Pickup"), drive(40, 2_200), stop("ON", 1, "Dropoff")], 60
+        )
+        check_property_carrier_limits(self, segments)
+        driving = [seg for seg in segments if seg.status == "D"]
+        self.assertGreater(len(driving), 4)
+        self.assertEqual(
+            sum((seg.end - seg.start for seg in driving), timedelta()), 40 * HOUR
+        )
+        self.assertAlmostEqual(sum(seg.miles for seg in driving), 2_200.0)
+        for before, after in zip(segments, segments[1:]):
+            self.assertEqual(before.end, after.start)
+
+    def test_restart_when_the_cycle_runs_out(self):
+        segments = plan([drive(10, 550)], 65)
+        driving = [seg for seg in segments if seg.status == "D"]
+        self.assertEqual(driving[0].end - driving[0].start, 5 * HOUR)
+        restart = segments[segments.index(driving[0]) + 1]
+        self.assertIn("34-hour", restart.note)
+        self.assertEqual(restart.end - restart.start, 34 * HOUR)
+
+    def test_fuel_stops_split_drives_by_distance(self):
+        segments = plan([drive(40, 2_200)], 0)
+        miles = 0.0
+        for seg in segments:
+            if seg.note.startswith("Fuel stop"):
+                self.assertLessEqual(miles, 1_000.0 + 1e-6)
+                miles = 0.0
+            miles += seg.miles
+        self.assertTrue(any(seg.note.startswith("Fuel stop") for seg in segments))
+
+    def test_on_duty_stops_are_not_delayed(self):
+        segments = plan(
+            [drive(11, 600, "A"), stop("ON", 1, "Dropoff"), drive(1, 50, "B")]
+        )
+        check_property_carrier_limits(self, segments)
+        notes = [seg.note for seg in segments]
+        dropoff = segments[notes.index("Dropoff")]
+        # Driving hit the 11-hour limit just before; the reset waits for "B"
+        self.assertEqual(dropoff.start, START + 11.5 * HOUR)
+        self.assertIn("10-hour reset", notes[notes.index("Dropoff") + 1])
+
+    def test_only_ten_hours_off_resets_the_shift(self):
+        short = plan([drive(6, 300), stop("OFF", 9, "Rest"), drive(6, 300)])
+        check_property_carrier_limits(self, short)
+        self.assertTrue(any("10-hour reset" in seg.note for seg in short))
+
+        full = plan([drive(6, 300), stop("OFF", 10, "Rest"), drive(6, 300)])
+        self.assertEqual(
+            [seg.note for seg in full], ["Pickup → Dropoff", "Rest", "Pickup → Dropoff"]
+        )
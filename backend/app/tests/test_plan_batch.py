@@ -0,0 +1,77 @@
+"""Batch planning: shared routes are fetched once and every item gets a record."""
+
+import json
+import time
+from concurrent.futures import Future
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.controllers.trip_controller import _batch_weather
+
+ROUTE = {
+    "geometry": {
+        "type": "LineString",
+        "coordinates": [[-74.0 - i * 0.05, 40.7] for i in range(40)],
+    },
+    "total_distance_miles": 120.0,
+    "total_duration_hours": 2.0,
+    "legs": [
+        {"distance_miles": 0.0, "duration_hours": 0.0},
+        {"distance_miles": 120.0, "duration_hours": 2.0},
+    ],
+}
+TRIP = {
+    "start": {"lat": 40.7, "lng": -74.0},
+    "pickup": {"lat": 40.7, "lng": -74.0},
+    "dropoff": {"lat": 40.7, "lng": -76.0},
+    "current_cycle_used_hours": 0,
+    "start_datetime": "2025-01-15T06:00:00Z",
+}
+
+
+class PlanBatchTests(SimpleTestCase):
+    def test_items_share_routes_and_invalid_items_are_reported(self):
+        other = dict(TRIP, dropoff={"lat": 41.0, "lng": -75.0})
+        invalid = {key: value for key, value in TRIP.items() if key != "dropoff"}
+        with mock.patch(
+            "app.controllers.trip_controller.ComputeRouteHandler.execute",
+            return_value=ROUTE,
+        ) as route, mock.patch(
+            "app.controllers.trip_controller.WeatherHandler.get_current_weather",
+            return_value=None,
+        ) as weather:
+            response = self.client.post(
+                "/api/trips/plan/batch",
+                [TRIP, other, TRIP, invalid],
+                content_type="application/json",
+            )
+            records = [
+                json.loads(line)
+                for line in b"".join(response.streaming_content).splitlines()
+            ]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(route.call_count, 2)
+        self.assertEqual(weather.call_count, 3)  # Start, two dropoffs
+        by_index = {record["index"]: record for record in records}
+        self.assertEqual(sorted(by_index), [0, 1, 2, 3])
+        self.assertFalse(by_index[3]["ok"])
+        for index in (0, 1, 2):
+            self.assertTrue(by_index[index]["ok"], by_index[index])
+            self.assertTrue(by_index[index]["result"]["segments"])
+        self.assertEqual(
+            by_index[0]["result"]["segments"], by_index[2]["result"]["segments"]
+        )
+
+    def test_weather_wait_is_bounded_per_point(self):
+        futures = {(1.0, 2.0): Future()}
+        deadlines = {}
+        location = {"lat": 1.0, "lng": 2.0}
+        started = time.monotonic()
+        self.assertIsNone(_batch_weather(futures, deadlines, location, 0.2))
+        # A later item sharing the point waits no longer than the first did
+        self.assertIsNone(_batch_weather(futures, deadlines, location, 0.2))
+        self.assertLess(time.monotonic() - started, 0.35)
+        failed = Future()
+        failed.set_exception(RuntimeError("upstream down"))
+        self.assertIsNone(_batch_weather({(1.0, 2.0): failed}, {}, location, 1.0))
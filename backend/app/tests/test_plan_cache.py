@@ -0,0 +1,121 @@
+"""Plan cache: canonical request keys, shared computations and ETag / 304."""
+
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from app.handlers import PlanCache
+
+ROUTE = {
+    "geometry": {
+        "type": "LineString",
+        "coordinates": [[-74.0 - i * 0.05, 40.7] for i in range(40)],
+    },
+    "total_distance_miles": 120.0,
+    "total_duration_hours": 2.0,
+    "legs": [
+        {"distance_miles": 0.0, "duration_hours": 0.0},
+        {"distance_miles": 120.0, "duration_hours": 2.0},
+    ],
+}
+TRIP = {
+    "start": {"lat": 40.7, "lng": -74.0},
+    "pickup": {"lat": 40.7, "lng": -74.0},
+    "dropoff": {"lat": 40.7, "lng": -76.0},
+    "current_cycle_used_hours": 12.5,
+    "start_datetime": "2025-01-15T06:00:00Z",
+}
+# The same trip as a client might resend it
+NEARBY = dict(
+    TRIP,
+    dropoff={"lat": 40.700001, "lng": -75.999998},
+    current_cycle_used_hours=12.500001,
+    start_datetime="2025-01-15T06:00:00+00:00",
+)
+
+
+class PlanCacheKeyTests(SimpleTestCase):
+    def test_equivalent_requests_share_a_key(self):
+        self.assertEqual(
+            PlanCache.key_for(PlanCache.canonical(TRIP)),
+            PlanCache.key_for(PlanCache.canonical(dict(NEARBY, debug=False))),
+        )
+
+    def test_plan_changing_fields_change_the_key(self):
+        key = PlanCache.key_for(PlanCache.canonical(TRIP))
+        for change in (
+            {"dropoff": {"lat": 40.71, "lng": -76.0}},
+            {"current_cycle_used_hours": 13.0},
+            {"start_datetime": "2025-01-15T07:00:00Z"},
+            {"cycle_history_hours": [8.0] * 7},
+        ):
+            self.assertNotEqual(
+                key, PlanCache.key_for(PlanCache.canonical(dict(TRIP, **change)))
+            )
+
+
+class PlanCacheViewTests(SimpleTestCase):
+    def setUp(self):
+        caches["plan_responses"].clear()
+        route = mock.patch(
+            "app.controllers.trip_controller.ComputeRouteHandler.execute",
+            return_value=ROUTE,
+        )
+        weather = mock.patch(
+            "app.controllers.trip_controller.WeatherHandler.get_current_weather",
+            return_value=None,
+        )
+        self.route = route.start()
+        weather.start()
+        self.addCleanup(route.stop)
+        self.addCleanup(weather.stop)
+
+    def post(self, trip, path="/api/trips/plan", if_none_match=None):
+        headers = {"If-None-Match": if_none_match} if if_none_match else {}
+        return self.client.post(
+            path, trip, content_type="application/json", headers=headers
+        )
+
+    def test_equivalent_requests_share_one_plan_and_etag(self):
+        first = self.post(TRIP)
+        second = self.post(NEARBY)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.route.call_count, 1)
+        self.assertEqual(first.json(), second.json())
+        self.assertTrue(first["ETag"])
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_matching_if_none_match_gets_304(self):
+        etag = self.post(TRIP)["ETag"]
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            response = self.post(NEARBY, if_none_match=header)
+            self.assertEqual(response.status_code, 304, header)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+        stale = self.post(TRIP, if_none_match='"stale-json"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(self.route.call_count, 1)
+
+    def test_etags_differ_per_representation(self):
+        json_etag = self.post(TRIP)["ETag"]
+        compact = self.post(TRIP, "/api/trips/plan?format=compact")
+        self.assertNotEqual(compact["ETag"], json_etag)
+        self.assertEqual(
+            self.post(TRIP, if_none_match=compact["ETag"]).status_code, 200
+        )
+
+    def test_recomputed_plans_get_a_new_etag(self):
+        etag = self.post(TRIP)["ETag"]
+        caches["plan_responses"].clear()
+        response = self.post(TRIP, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_debug_requests_bypass_the_cache(self):
+        self.post(TRIP)
+        response = self.post(dict(TRIP, debug=True))
+        self.assertEqual(self.route.call_count, 2)
+        self.assertNotIn("ETag", response)
+        self.assertIn("timings", response.json())
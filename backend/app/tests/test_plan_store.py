@@ -0,0 +1,38 @@
+"""PlanStore keeps built indexes within a byte budget and rebuilds evicted ones."""
+
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase, override_settings
+
+from app.handlers import HosRulesHandler, PlanStore
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+COORDS = [[-74.0 - i * 0.01, 40.7] for i in range(5_000)]
+
+
+def stored_plan():
+    segments = HosRulesHandler.execute(
+        [{"status": "D", "duration_hours": 20.0, "miles": 1_100.0}], 0.0, START
+    )["segments"]
+    return PlanStore.save(segments, COORDS)
+
+
+class PlanStoreIndexBudgetTests(SimpleTestCase):
+    def test_indexes_stay_within_the_byte_budget(self):
+        plan_id = stored_plan()
+        one = PlanStore.get(plan_id).nbytes
+        with override_settings(PLAN_STORE={"INDEX_CACHE_MAX_BYTES": one * 3}):
+            plan_ids = [stored_plan() for _ in range(6)]
+            stats = PlanStore.stats()
+            self.assertLessEqual(stats["index_bytes"], one * 3)
+            self.assertLessEqual(stats["indexes"], 3)
+            # The oldest index was evicted; it is rebuilt from the cache alias
+            positions = PlanStore.get(plan_ids[0])
+            self.assertIsNotNone(positions)
+            self.assertEqual(positions.at([START])[0]["phase"], "en_route")
+
+    def test_index_larger_than_the_budget_is_not_kept(self):
+        with override_settings(PLAN_STORE={"INDEX_CACHE_MAX_BYTES": 1}):
+            plan_id = stored_plan()
+            self.assertIsNotNone(PlanStore.get(plan_id))
+            self.assertNotIn(plan_id, PlanStore._indexes)
@@ -0,0 +1,104 @@
+"""Streaming plans: NDJSON records carry the same plan as the buffered response."""
+
+import inspect
+import json
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from app.handlers import EldLogGenerator, HosRulesHandler
+from app.handlers.segments import serialize_daily_logs
+
+TRIP_START = datetime(2025, 1, 15, 6, 0, tzinfo=timezone.utc)
+ROUTE = {
+    "geometry": {
+        "type": "LineString",
+        "coordinates": [[-74.0 - i * 0.25, 40.7] for i in range(120)],
+    },
+    "total_distance_miles": 2_000.0,
+    "total_duration_hours": 34.0,
+    "legs": [
+        {"distance_miles": 0.0, "duration_hours": 0.0},
+        {"distance_miles": 2_000.0, "duration_hours": 34.0},
+    ],
+}
+TRIP = {
+    "start": {"lat": 40.7, "lng": -74.0},
+    "pickup": {"lat": 40.7, "lng": -74.0},
+    "dropoff": {"lat": 40.7, "lng": -103.75},
+    "current_cycle_used_hours": 0,
+    "start_datetime": "2025-01-15T06:00:00Z",
+}
+
+
+class PlanStreamTests(SimpleTestCase):
+    def setUp(self):
+        caches["plan_responses"].clear()
+
+    def post(self, path, route=ROUTE):
+        patch_route = (
+            mock.patch(
+                "app.controllers.trip_controller.ComputeRouteHandler.execute",
+                return_value=route,
+            )
+            if route is not None
+            else mock.patch(
+                "app.controllers.trip_controller.ComputeRouteHandler.execute",
+                side_effect=Exception("upstream down"),
+            )
+        )
+        with patch_route, mock.patch(
+            "app.controllers.trip_controller.WeatherHandler.get_current_weather",
+            return_value=None,
+        ):
+            response = self.client.post(path, TRIP, content_type="application/json")
+            if response.streaming:
+                lines = b"".join(response.streaming_content).splitlines()
+                return response, [json.loads(line) for line in lines]
+            return response, response.json()
+
+    def test_stream_matches_the_buffered_plan(self):
+        _, plan = self.post("/api/trips/plan")
+        response, records = self.post("/api/trips/plan?stream=ndjson")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [record["type"] for record in records[:4]],
+            ["route", "segments", "stops", "weather"],
+        )
+        self.assertEqual(records[-1]["type"], "end")
+
+        by_type = {record["type"]: record for record in records}
+        for key in ("route", "segments", "stops", "weather"):
+            self.assertEqual(by_type[key][key], plan[key])
+        self.assertEqual(
+            [
+                record["daily_log"]
+                for record in records
+                if record["type"] == "daily_log"
+            ],
+            plan["daily_logs"],
+        )
+        self.assertGreater(len(plan["daily_logs"]), 2)
+        self.assertEqual(records[-1]["warnings"], plan["warnings"])
+
+    def test_routing_failure_ends_the_stream(self):
+        _, records = self.post("/api/trips/plan?stream=ndjson", route=None)
+        self.assertEqual([record["type"] for record in records], ["route", "end"])
+        self.assertIsNone(records[0]["route"])
+        self.assertIn("upstream down", records[1]["warnings"][0])
+
+    def test_daily_logs_are_generated_one_day_at_a_time(self):
+        skeleton = [
+            {"status": "D", "duration_hours": 30.0, "miles": 1_650.0, "note": "Drive"}
+        ]
+        segments = HosRulesHandler.execute(skeleton, 0, TRIP_START)["segments"]
+        days = EldLogGenerator.iter_days(segments)
+        self.assertTrue(inspect.isgenerator(days))
+        first = next(days)
+        self.assertEqual(first["date"], "2025-01-15")
+        self.assertEqual(
+            serialize_daily_logs([first, *days]),
+            serialize_daily_logs(EldLogGenerator.execute(segments)),
+        )
@@ -0,0 +1,121 @@
+"""Compact plan encoding: polylines and columnar segments that decode losslessly."""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import polyline
+from django.test import SimpleTestCase
+
+from app.renderers import columnar_segments, compact_plan
+
+COORDS = [[-74.0 - index * 0.01, 40.7 + index * 0.005] for index in range(50)]
+SEGMENTS = [
+    {
+        "start_datetime": "2025-01-15T06:00:00+00:00",
+        "end_datetime": "2025-01-15T07:00:00+00:00",
+        "status": "ON",
+        "miles": 0.0,
+        "note": "Pickup",
+    },
+    {
+        "start_datetime": "2025-01-15T07:00:00+00:00",
+        "end_datetime": "2025-01-15T15:00:00+00:00",
+        "status": "D",
+        "miles": 440.123,
+        "note": "Leg",
+    },
+    {
+        "start_datetime": "2025-01-15T15:00:00+00:00",
+        "end_datetime": "2025-01-15T15:30:00+00:00",
+        "status": "OFF",
+        "miles": 0.0,
+        "note": "Pickup",
+    },
+]
+
+
+class CompactEncodingTests(SimpleTestCase):
+    def test_segments_round_trip(self):
+        packed = columnar_segments(SEGMENTS)
+        self.assertEqual(packed["notes"], ["Pickup", "Leg"])
+        base = datetime.fromisoformat(SEGMENTS[0]["start_datetime"])
+        for index, seg in enumerate(SEGMENTS):
+            start = base + timedelta(seconds=packed["offset_s"][index])
+            end = start + timedelta(seconds=packed["duration_s"][index])
+            self.assertEqual(start.isoformat(), seg["start_datetime"])
+            self.assertEqual(end.isoformat(), seg["end_datetime"])
+            self.assertEqual(packed["notes"][packed["note_index"][index]], seg["note"])
+            self.assertEqual(packed["miles"][index], round(seg["miles"], 2))
+        self.assertIsNone(columnar_segments([])["base_epoch_s"])
+
+    def test_route_geometry_is_an_encoded_polyline(self):
+        line = {"type": "LineString", "coordinates": COORDS}
+        plan = {
+            "route": {"geometry": line, "legs": [{"geometry": line}, {}]},
+            "segments": SEGMENTS,
+            "daily_logs": [{"date": "2025-01-15", "segments": SEGMENTS}],
+        }
+        compact = compact_plan(plan)
+        self.assertEqual(compact["encoding"], "compact-v1")
+        decoded = polyline.decode(compact["route"]["geometry"]["polyline"])
+        self.assertEqual(
+            decoded, [(round(lat, 5), round(lng, 5)) for lng, lat in COORDS]
+        )
+        self.assertEqual(compact["route"]["legs"][1], {})
+        self.assertEqual(
+            compact["daily_logs"][0]["segments"]["status"], ["ON", "D", "OFF"]
+        )
+        # The plain plan is left as it was
+        self.assertIs(plan["route"]["geometry"], line)
+
+
+ROUTE = {
+    "geometry": {"type": "LineString", "coordinates": COORDS},
+    "total_distance_miles": 300.0,
+    "total_duration_hours": 5.0,
+    "legs": [
+        {"distance_miles": 0.0, "duration_hours": 0.0},
+        {"distance_miles": 300.0, "duration_hours": 5.0},
+    ],
+}
+
+
+class CompactFormatViewTests(SimpleTestCase):
+    def plan(self, path, **headers):
+        with mock.patch(
+            "app.controllers.trip_controller.ComputeRouteHandler.execute",
+            return_value=ROUTE,
+        ), mock.patch(
+            "app.controllers.trip_controller.WeatherHandler.get_current_weather",
+            return_value=None,
+        ):
+            return self.client.post(
+                path,
+                {
+                    "start": {"lat": 40.7, "lng": -74.0},
+                    "pickup": {"lat": 40.7, "lng": -74.0},
+                    "dropoff": {"lat": 40.9, "lng": -74.5},
+                    "current_cycle_used_hours": 0,
+                    "start_datetime": "2025-01-15T06:00:00Z",
+                },
+                content_type="application/json",
+                **headers,
+            )
+
+    def test_compact_is_opt_in(self):
+        plain = self.plan("/api/trips/plan")
+        self.assertEqual(plain["Content-Type"], "application/json")
+        self.assertEqual(plain.json()["route"]["geometry"]["type"], "LineString")
+        for response in (
+            self.plan("/api/trips/plan?format=compact"),
+            self.plan(
+                "/api/trips/plan",
+                HTTP_ACCEPT="application/vnd.trip-plan.compact+json",
+            ),
+        ):
+            self.assertEqual(
+                response["Content-Type"], "application/vnd.trip-plan.compact+json"
+            )
+            body = response.json()
+            self.assertEqual(body["encoding"], "compact-v1")
+            self.assertEqual(body["route"]["geometry"]["type"], "EncodedPolyline")
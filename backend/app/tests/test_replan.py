@@ -0,0 +1,103 @@
+"""Re-plan daily logs: the checkpoint's day keeps the hours logged before it."""
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+ROUTE = {
+    "geometry": {
+        "type": "LineString",
+        "coordinates": [[-82.99 - i * 0.2, 39.96 - i * 0.05] for i in range(101)],
+    },
+    "total_distance_miles": 600.0,
+    "total_duration_hours": 10.0,
+    "legs": [{"distance_miles": 600.0, "duration_hours": 10.0}],
+}
+CHECKPOINT = {
+    "at": "2025-01-16T11:00:00+00:00",
+    "shift_started_at": "2025-01-16T06:00:00+00:00",
+    "drive_in_shift_hours": 4.0,
+    "drive_since_break_hours": 4.0,
+    "distance_since_fuel_miles": 220.0,
+    "cycle": {"used_hours": 20.0},
+    "split": None,
+}
+BEFORE_CHECKPOINT = [
+    {
+        "status": "OFF",
+        "start_datetime": "2025-01-16T00:00:00+00:00",
+        "end_datetime": "2025-01-16T06:00:00+00:00",
+    },
+    {
+        "status": "ON",
+        "start_datetime": "2025-01-16T06:00:00+00:00",
+        "end_datetime": "2025-01-16T07:00:00+00:00",
+        "note": "Pickup",
+    },
+    {
+        "status": "D",
+        "start_datetime": "2025-01-16T07:00:00+00:00",
+        "end_datetime": "2025-01-16T11:00:00+00:00",
+        "miles": 220.0,
+    },
+]
+AFTER_CHECKPOINT = [
+    {
+        "status": "D",
+        "start_datetime": "2025-01-16T11:00:00+00:00",
+        "end_datetime": "2025-01-16T12:00:00+00:00",
+        "miles": 55.0,
+    }
+]
+
+
+class ReplanDailyLogTests(SimpleTestCase):
+    def replan(self, events):
+        body = {
+            "checkpoint": CHECKPOINT,
+            "events": events,
+            "current_position": {"lat": 39.96, "lng": -82.99},
+            "remaining_stops": [{"lat": 38.6, "lng": -90.2, "type": "dropoff"}],
+        }
+        with mock.patch(
+            "app.controllers.trip_controller.ComputeRouteHandler.execute_locations",
+            return_value=ROUTE,
+        ):
+            response = self.client.post(
+                "/api/trips/replan", body, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_first_day_without_earlier_events_is_partial(self):
+        result = self.replan(AFTER_CHECKPOINT)
+        first = result["daily_logs"][0]
+        self.assertTrue(first["partial"])
+        self.assertLess(sum(first["totals"].values()), 24.0)
+        self.assertFalse(any(log["partial"] for log in result["daily_logs"][1:]))
+
+    def test_earlier_events_complete_the_first_day(self):
+        result = self.replan(BEFORE_CHECKPOINT + AFTER_CHECKPOINT)
+        first = result["daily_logs"][0]
+        self.assertFalse(first["partial"])
+        self.assertAlmostEqual(sum(first["totals"].values()), 24.0, places=2)
+        self.assertAlmostEqual(first["totals"]["ON_hours"] % 1.0, 0.0, places=2)
+        # Events before the checkpoint are logged, not replayed
+        self.assertEqual(
+            result["segments"][0]["start_datetime"], "2025-01-16T11:00:00+00:00"
+        )
+        self.assertEqual(result["checkpoint"]["drive_in_shift_hours"], 5.0)
+
+    def test_event_spanning_the_checkpoint_is_rejected(self):
+        spanning = dict(BEFORE_CHECKPOINT[2], end_datetime="2025-01-16T12:00:00Z")
+        response = self.client.post(
+            "/api/trips/replan",
+            {
+                "checkpoint": CHECKPOINT,
+                "events": [spanning],
+                "current_position": {"lat": 39.96, "lng": -82.99},
+                "remaining_stops": [{"lat": 38.6, "lng": -90.2}],
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
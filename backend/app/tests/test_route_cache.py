@@ -0,0 +1,81 @@
+"""Route cache: quantized waypoint keys and a byte-bounded backend."""
+
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from app.caching import ByteBoundedLocMemCache
+from app.handlers import ComputeRouteHandler, RouteCache
+from app.handlers.routing_providers import OsrmRoutingProvider
+
+START = {"lat": 40.71281, "lng": -74.00601}
+PICKUP = {"lat": 40.7489, "lng": -73.968}
+DROPOFF = {"lat": 34.0522, "lng": -118.2437}
+
+
+def osrm_route(waypoints):
+    line = {"type": "LineString", "coordinates": [list(point) for point in waypoints]}
+    return {
+        "geometry": line,
+        "total_distance_miles": 2_800.0,
+        "total_duration_hours": 41.0,
+        "legs": [
+            {"distance_miles": 3.0, "duration_hours": 0.2, "geometry": line},
+            {"distance_miles": 2_797.0, "duration_hours": 40.8, "geometry": line},
+        ],
+    }
+
+
+class RouteCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches["routes"].clear()
+
+    def test_nearby_waypoints_share_a_key(self):
+        waypoints = [(-74.00601, 40.71281), (-73.968, 40.7489)]
+        nearby = [(-74.00598, 40.71279), (-73.968, 40.7489)]
+        self.assertEqual(RouteCache.key_for(waypoints), RouteCache.key_for(nearby))
+        self.assertNotEqual(
+            RouteCache.key_for(waypoints), RouteCache.key_for(waypoints, "local")
+        )
+        moved = [(-74.0071, 40.71281), (-73.968, 40.7489)]
+        self.assertNotEqual(RouteCache.key_for(waypoints), RouteCache.key_for(moved))
+
+    def test_repeated_lane_is_routed_once(self):
+        with mock.patch.object(
+            OsrmRoutingProvider, "route", side_effect=osrm_route
+        ) as route:
+            first = ComputeRouteHandler.execute(
+                START,
+                PICKUP,
+                DROPOFF,
+                include_leg_geometry=False,
+                routing_provider="osrm",
+            )
+            again = ComputeRouteHandler.execute(
+                {"lat": 40.71279, "lng": -74.00598},
+                PICKUP,
+                DROPOFF,
+                routing_provider="osrm",
+            )
+        self.assertEqual(route.call_count, 1)
+        self.assertNotIn("geometry", first["legs"][0])
+        # Dropping leg geometry for one caller does not strip the cached copy
+        self.assertIn("geometry", again["legs"][0])
+
+
+class ByteBoundedCacheTests(SimpleTestCase):
+    def test_total_bytes_stay_within_the_budget(self):
+        cache = ByteBoundedLocMemCache(
+            "test-byte-bounded", {"OPTIONS": {"MAX_BYTES": 4_000}}
+        )
+        cache.clear()
+        for index in range(10):
+            cache.set(f"key-{index}", "x" * 1_000)
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 4_000)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNotNone(cache.get("key-9"))
+        self.assertIsNone(cache.get("key-0"))
+        cache.set("too-big", "x" * 10_000)
+        self.assertIsNone(cache.get("too-big"))
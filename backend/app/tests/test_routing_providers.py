@@ -0,0 +1,188 @@
+"""Routing providers: per-leg geometry and the in-process road graph."""
+
+import heapq
+import math
+import os
+import tempfile
+from unittest import mock
+
+import polyline
+from django.test import SimpleTestCase
+
+from app.handlers.local_routing import RoadGraph
+from app.handlers.routing_providers import LocalRoutingProvider, OsrmRoutingProvider
+
+# (lat, lng) along a straight line; the pickup snaps near point 3
+POINTS = [(40.0, -74.0 - index * 0.1) for index in range(10)]
+
+
+def osrm_response(waypoints=True):
+    response = {
+        "code": "Ok",
+        "routes": [
+            {
+                "geometry": polyline.encode(POINTS),
+                "legs": [
+                    {"distance": 30_000.0, "duration": 1_800.0},
+                    {"distance": 60_000.0, "duration": 3_600.0},
+                ],
+            }
+        ],
+    }
+    if waypoints:
+        response["waypoints"] = [
+            {"location": [-74.0, 40.0]},
+            {"location": [-74.301, 40.0001]},
+            {"location": [-74.9, 40.0]},
+        ]
+    return response
+
+
+class OsrmLegGeometryTests(SimpleTestCase):
+    def legs(self, response):
+        route = OsrmRoutingProvider()._parse_response(response)
+        return route, [leg["geometry"]["coordinates"] for leg in route["legs"]]
+
+    def test_legs_split_at_the_snapped_waypoint(self):
+        route, (first, second) = self.legs(osrm_response())
+        coords = route["geometry"]["coordinates"]
+        self.assertEqual(first, coords[:4])
+        self.assertEqual(second, coords[3:])
+        self.assertEqual(first[-1], second[0])
+
+    def test_legs_split_by_distance_without_waypoints(self):
+        route, (first, second) = self.legs(osrm_response(waypoints=False))
+        coords = route["geometry"]["coordinates"]
+        # One third of the distance: round(9 / 3) = point 3
+        self.assertEqual(first, coords[:4])
+        self.assertEqual(second, coords[3:])
+        self.assertAlmostEqual(route["total_duration_hours"], 1.5)
+
+
+def grid_roads(size=5, spacing=0.01):
+    """A size x size lattice of two-way roads with mixed speeds."""
+    features = []
+    for row in range(size):
+        for col in range(size):
+            here = [-100.0 + col * spacing, 35.0 + row * spacing]
+            for d_row, d_col in ((0, 1), (1, 0)):
+                if row + d_row < size and col + d_col < size:
+                    there = [here[0] + d_col * spacing, here[1] + d_row * spacing]
+                    features.append(
+                        {
+                            "type": "Feature",
+                            "geometry": {
+                                "type": "LineString",
+                                "coordinates": [here, there],
+                            },
+                            "properties": {
+                                "highway": "residential",
+                                # One fast avenue and one fast street
+                                "maxspeed": "100" if row == 2 or col == 4 else None,
+                            },
+                        }
+                    )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def dijkstra_s(graph, source, target):
+    """Reference travel time by plain Dijkstra over the forward CSR."""
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == target:
+            return d
+        if d > dist[u]:
+            continue
+        for edge in range(graph.indptr[u], graph.indptr[u + 1]):
+            v = int(graph.indices[edge])
+            nd = d + float(graph.durations_s[edge])
+            if nd < dist.get(v, math.inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return None
+
+
+class RoadGraphTests(SimpleTestCase):
+    def setUp(self):
+        self.graph = RoadGraph.from_geojson(grid_roads())
+
+    def test_shared_vertices_join_roads(self):
+        self.assertEqual(self.graph.node_count, 25)
+        # 40 two-way segments
+        self.assertEqual(self.graph.edge_count, 80)
+
+    def test_shortest_path_matches_dijkstra(self):
+        for source in range(self.graph.node_count):
+            for target in range(self.graph.node_count):
+                nodes, duration_s, _ = self.graph.shortest_path(source, target)
+                self.assertEqual((nodes[0], nodes[-1]), (source, target))
+                self.assertAlmostEqual(
+                    duration_s, dijkstra_s(self.graph, source, target), places=3
+                )
+
+    def test_oneway_roads_are_one_directional(self):
+        graph = RoadGraph.from_geojson(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "geometry": {
+                            "type": "LineString",
+                            "coordinates": [[-100.0, 35.0], [-100.01, 35.0]],
+                        },
+                        "properties": {"oneway": "yes"},
+                    }
+                ],
+            }
+        )
+        self.assertIsNotNone(graph.shortest_path(0, 1))
+        self.assertIsNone(graph.shortest_path(1, 0))
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "roads.npz")
+            self.graph.save(path)
+            loaded = RoadGraph.load(path)
+        self.assertEqual(loaded.edge_count, self.graph.edge_count)
+        self.assertEqual(
+            loaded.shortest_path(0, 24)[1:], self.graph.shortest_path(0, 24)[1:]
+        )
+
+    def test_route_legs_share_boundary_points(self):
+        legs = self.graph.route([(-100.0, 35.0), (-99.96, 35.0), (-99.96, 35.04)])
+        self.assertEqual(legs[0]["coordinates"][-1], legs[1]["coordinates"][0])
+        self.assertEqual(legs[0]["coordinates"][0], [-100.0, 35.0])
+        self.assertEqual(legs[1]["coordinates"][-1], [-99.96, 35.04])
+
+
+class LocalRoutingProviderTests(SimpleTestCase):
+    def test_route_data_from_graph(self):
+        graph = RoadGraph.from_geojson(grid_roads())
+        waypoints = [(-100.0, 35.0), (-99.96, 35.0), (-99.96, 35.04)]
+        with mock.patch(
+            "app.handlers.routing_providers.get_road_graph", return_value=graph
+        ):
+            route = LocalRoutingProvider().route(waypoints)
+
+        legs = graph.route(waypoints)
+        coords = route["geometry"]["coordinates"]
+        # Boundary point appears once in the full line
+        self.assertEqual(
+            len(coords), len(legs[0]["coordinates"]) + len(legs[1]["coordinates"]) - 1
+        )
+        self.assertEqual(len(route["legs"]), 2)
+        self.assertAlmostEqual(
+            route["total_duration_hours"],
+            sum(leg["duration_hours"] for leg in route["legs"]),
+        )
+
+    def test_missing_graph_is_reported(self):
+        with mock.patch(
+            "app.handlers.routing_providers.get_road_graph",
+            side_effect=ValueError("LOCAL_ROUTING_GRAPH is not set"),
+        ):
+            with self.assertRaisesMessage(Exception, "Local routing failed"):
+                LocalRoutingProvider().route([(-100.0, 35.0), (-99.96, 35.0)])
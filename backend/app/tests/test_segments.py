@@ -0,0 +1,102 @@
+"""Segments: typed records through the pipeline, ISO dicts only in responses."""
+
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.handlers import EldLogGenerator, HosRulesHandler, Segment
+from app.handlers.segments import serialize_daily_logs
+
+START = datetime(2025, 1, 15, 6, 0, tzinfo=timezone.utc)
+SKELETON = [
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup"},
+    {"status": "D", "duration_hours": 14.0, "miles": 800.0, "note": "Drive"},
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff"},
+]
+ROUTE = {
+    "geometry": {
+        "type": "LineString",
+        "coordinates": [[-74.0 - i * 0.25, 40.7] for i in range(60)],
+    },
+    "total_distance_miles": 800.0,
+    "total_duration_hours": 14.0,
+    "legs": [
+        {"distance_miles": 0.0, "duration_hours": 0.0},
+        {"distance_miles": 800.0, "duration_hours": 14.0},
+    ],
+}
+TRIP = {
+    "start": {"lat": 40.7, "lng": -74.0},
+    "pickup": {"lat": 40.7, "lng": -74.0},
+    "dropoff": {"lat": 40.7, "lng": -88.75},
+    "current_cycle_used_hours": 0,
+    "start_datetime": "2025-01-15T06:00:00Z",
+}
+
+
+class SegmentPipelineTests(SimpleTestCase):
+    def test_hos_emits_contiguous_segment_records(self):
+        segments = HosRulesHandler.execute(SKELETON, 0, START)["segments"]
+        self.assertTrue(all(isinstance(seg, Segment) for seg in segments))
+        self.assertEqual(segments[0].start, START)
+        for before, after in zip(segments, segments[1:]):
+            self.assertEqual(before.end, after.start)
+        driven = sum(seg.miles for seg in segments if seg.status == "D")
+        self.assertAlmostEqual(driven, 800.0)
+
+    def test_to_dict_serializes_iso_times(self):
+        segment = Segment(START, START.replace(hour=8), "D", 110.0, "Drive")
+        self.assertEqual(
+            segment.to_dict(),
+            {
+                "start_datetime": "2025-01-15T06:00:00+00:00",
+                "end_datetime": "2025-01-15T08:00:00+00:00",
+                "status": "D",
+                "miles": 110.0,
+                "note": "Drive",
+            },
+        )
+        self.assertEqual(segment.duration_hours, 2.0)
+
+    def test_daily_logs_serialize_without_touching_the_records(self):
+        segments = HosRulesHandler.execute(SKELETON, 0, START)["segments"]
+        logs = EldLogGenerator.execute(segments)
+        serialized = serialize_daily_logs(logs)
+        self.assertTrue(
+            all(isinstance(seg, Segment) for log in logs for seg in log["segments"])
+        )
+        for log, out in zip(logs, serialized):
+            self.assertEqual(
+                out["segments"], [seg.to_dict() for seg in log["segments"]]
+            )
+            self.assertEqual(out["date"], log["date"])
+
+    def test_plan_response_matches_the_records(self):
+        with mock.patch(
+            "app.controllers.trip_controller.ComputeRouteHandler.execute",
+            return_value=ROUTE,
+        ), mock.patch(
+            "app.controllers.trip_controller.WeatherHandler.get_current_weather",
+            return_value=None,
+        ):
+            response = self.client.post(
+                "/api/trips/plan", TRIP, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        plan = response.json()
+        times = [
+            (
+                datetime.fromisoformat(seg["start_datetime"]),
+                datetime.fromisoformat(seg["end_datetime"]),
+            )
+            for seg in plan["segments"]
+        ]
+        self.assertEqual(times[0][0], START)
+        for before, after in zip(times, times[1:]):
+            self.assertEqual(before[1], after[0])
+        logged = [seg for log in plan["daily_logs"] for seg in log["segments"]]
+        self.assertTrue(all(isinstance(seg["start_datetime"], str) for seg in logged))
+        self.assertEqual(
+            datetime.fromisoformat(logged[-1]["end_datetime"]), times[-1][1]
+        )
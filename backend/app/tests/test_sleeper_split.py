@@ -0,0 +1,75 @@
+"""Sleeper-berth splits: valid 7/3 or 8/2 pairs, never slower than the default."""
+
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from app.handlers import HosRulesHandler, SleeperSplitPlanner
+
+START = datetime(2025, 1, 15, 6, 0, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def trip(drive_hours):
+    return [
+        {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup"},
+        {
+            "status": "D",
+            "duration_hours": drive_hours,
+            "miles": drive_hours * 55.0,
+            "note": "Pickup → Dropoff",
+        },
+        {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff"},
+    ]
+
+
+def split_periods(segments):
+    return [seg for seg in segments if "split)" in seg.note]
+
+
+class SleeperSplitTests(SimpleTestCase):
+    def test_never_slower_than_the_default_plan(self):
+        for drive_hours in (6, 12, 20, 30, 45):
+            for start_hour in (0, 6, 17):
+                for cycle_used in (0, 40, 65):
+                    start = START.replace(hour=start_hour)
+                    default = HosRulesHandler.execute(
+                        trip(drive_hours), cycle_used, start
+                    )["segments"]
+                    split = SleeperSplitPlanner.execute(
+                        trip(drive_hours), cycle_used, start
+                    )["segments"]
+                    self.assertLessEqual(split[-1].end, default[-1].end)
+                    self.assertAlmostEqual(
+                        sum(seg.miles for seg in split),
+                        sum(seg.miles for seg in default),
+                    )
+
+    def test_long_trips_arrive_earlier_with_valid_pairs(self):
+        default = HosRulesHandler.execute(trip(30), 0, START)["segments"]
+        split = SleeperSplitPlanner.execute(trip(30), 0, START)["segments"]
+        self.assertLess(split[-1].end, default[-1].end)
+
+        periods = split_periods(split)
+        self.assertTrue(periods)
+        self.assertEqual(len(periods) % 2, 0)
+        for first, second in zip(periods[::2], periods[1::2]):
+            lengths = sorted([first.end - first.start, second.end - second.start])
+            self.assertIn(lengths, ([2 * HOUR, 8 * HOUR], [3 * HOUR, 7 * HOUR]))
+            sleeper = first if first.end - first.start == lengths[1] else second
+            self.assertEqual(sleeper.status, "SB")
+
+    def test_segments_stay_contiguous(self):
+        segments = SleeperSplitPlanner.execute(trip(30), 0, START)["segments"]
+        self.assertEqual(segments[0].start, START)
+        for before, after in zip(segments, segments[1:]):
+            self.assertEqual(before.end, after.start)
+
+    def test_no_expansions_keeps_the_default_plan(self):
+        default = HosRulesHandler.execute(trip(30), 0, START)["segments"]
+        split = SleeperSplitPlanner.execute(trip(30), 0, START, max_expansions=0)[
+            "segments"
+        ]
+        self.assertEqual(
+            [seg.to_dict() for seg in split], [seg.to_dict() for seg in default]
+        )
@@ -0,0 +1,234 @@
+"""
+Pooled client: keep-alive reuse, retries, deadlines and the circuit breaker.
+Circuit breaker: a half-open probe that ends without a verdict is handed back.
+Async sessions: loops that end with their request do not keep a session.
+"""
+
+import asyncio
+import gc
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from app.handlers.upstream_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamClient,
+    UpstreamError,
+    get_upstream_client,
+)
+
+RESET_SECONDS = 0.05
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/down"):
+            self._reply(503, b"{}")
+        elif self.path.startswith("/slow"):
+            time.sleep(1.0)
+            self._reply(200, b"{}")
+        elif self.path.startswith("/broken"):
+            # Invalid chunk length: requests raises ChunkedEncodingError
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"zz\r\n")
+        elif self.path.startswith("/not-json"):
+            self._reply(200, b"<html>")
+        else:
+            self._reply(200, json.dumps({"ok": True}).encode())
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # Cancelled probes hang up before the slow reply is written
+
+
+class StubServerTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StubServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+
+def open_sessions():
+    gc.collect()
+    return sum(
+        type(obj) is aiohttp.ClientSession and not obj.closed
+        for obj in gc.get_objects()
+    )
+
+
+class PooledClientTests(StubServerTestCase):
+    def client_with(self, **config):
+        return UpstreamClient({"BACKOFF_BASE_SECONDS": 0.01, **config})
+
+    def stats(self, client):
+        return client.stats()[self.base.split("://")[1]]
+
+    def test_connections_are_kept_alive(self):
+        client = self.client_with()
+        for _ in range(3):
+            self.assertEqual(client.get_json(f"{self.base}/ok"), {"ok": True})
+        stats = self.stats(client)
+        self.assertEqual((stats["pool_misses"], stats["pool_hits"]), (1, 2))
+
+    def test_server_errors_are_retried(self):
+        client = self.client_with(MAX_RETRIES=2)
+        with self.assertRaises(UpstreamError):
+            client.get_json(f"{self.base}/down")
+        stats = self.stats(client)
+        self.assertEqual(
+            (stats["requests"], stats["retries"], stats["errors"]), (3, 2, 1)
+        )
+
+    def test_deadline_covers_all_attempts(self):
+        client = self.client_with(MAX_RETRIES=5)
+        started = time.monotonic()
+        with self.assertRaises(UpstreamError):
+            client.get_json(f"{self.base}/slow", timeout=0.2, deadline=0.3)
+        self.assertLess(time.monotonic() - started, 0.8)
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        client = self.client_with(MAX_RETRIES=0, BREAKER_FAILURE_THRESHOLD=2)
+        for _ in range(2):
+            with self.assertRaises(UpstreamError):
+                client.get_json(f"{self.base}/down")
+        with self.assertRaises(CircuitOpenError):
+            client.get_json(f"{self.base}/ok")
+        stats = self.stats(client)
+        self.assertEqual((stats["requests"], stats["circuit_rejections"]), (2, 1))
+
+
+class BreakerProbeTests(StubServerTestCase):
+    def setUp(self):
+        self.client = UpstreamClient(
+            {
+                "MAX_RETRIES": 0,
+                "BREAKER_FAILURE_THRESHOLD": 1,
+                "BREAKER_RESET_SECONDS": RESET_SECONDS,
+            }
+        )
+        self.host = self.base.split("://")[1]
+
+    def half_open(self):
+        with self.assertRaises(UpstreamError):
+            self.client.get_json(f"{self.base}/down")
+        time.sleep(RESET_SECONDS * 2)
+        self.assertEqual(
+            self.client._breaker(self.host).state, CircuitBreaker.HALF_OPEN
+        )
+
+    def assert_probe_available(self):
+        self.assertEqual(self.client.get_json(f"{self.base}/ok"), {"ok": True})
+        self.assertEqual(self.client._breaker(self.host).state, CircuitBreaker.CLOSED)
+
+    def test_unexpected_error_releases_probe(self):
+        self.half_open()
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self.client.get_json(f"{self.base}/broken")
+        self.assert_probe_available()
+
+    def test_invalid_json_settles_probe(self):
+        self.half_open()
+        with self.assertRaises(UpstreamError):
+            self.client.get_json(f"{self.base}/not-json")
+        self.assert_probe_available()
+
+    def test_cancelled_async_probe_releases_probe(self):
+        self.half_open()
+
+        async def cancel_probe():
+            probe = asyncio.ensure_future(self.client.aget_json(f"{self.base}/slow"))
+            await asyncio.sleep(0.1)
+            probe.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await probe
+            await self.client.aclose()
+
+        asyncio.run(cancel_probe())
+        self.assert_probe_available()
+
+    def test_async_deadline_cancellation_releases_probe(self):
+        self.half_open()
+
+        async def timed_out_probe():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self.client.aget_json(f"{self.base}/slow"), timeout=0.1
+                )
+            await self.client.aclose()
+
+        asyncio.run(timed_out_probe())
+        self.assert_probe_available()
+
+
+class AsyncSessionTests(StubServerTestCase):
+    def test_request_session_is_closed_with_its_loop(self):
+        client = UpstreamClient({})
+        before = open_sessions()
+
+        async def request():
+            async with client.request_session():
+                for _ in range(2):
+                    await client.aget_json(f"{self.base}/ok")
+
+        for _ in range(3):
+            asyncio.run(request())
+        self.assertEqual(len(client._async_sessions), 0)
+        self.assertEqual(open_sessions(), before)
+        # Calls after the first in each request reuse its connection
+        self.assertEqual(client.stats()[self.host()]["pool_hits"], 3)
+
+    def test_async_view_under_wsgi_keeps_no_session(self):
+        client = get_upstream_client()
+        before = open_sessions()
+        with override_settings(
+            OSRM_BASE_URL=f"{self.base}/route",
+            OPEN_METEO_BASE_URL=f"{self.base}/ok",
+        ):
+            for index in range(3):
+                response = self.client.post(
+                    "/api/trips/plan/async",
+                    {
+                        "start": {"lat": 40.7 + index, "lng": -74.0},
+                        "pickup": {"lat": 40.8, "lng": -73.9},
+                        "dropoff": {"lat": 34.0, "lng": -118.2},
+                        "current_cycle_used_hours": 0,
+                    },
+                    content_type="application/json",
+                )
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(client._async_sessions), 0)
+        self.assertEqual(open_sessions(), before)
+
+    def host(self):
+        return self.base.split("://")[1]
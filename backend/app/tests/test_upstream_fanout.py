@@ -0,0 +1,52 @@
+"""Plan upstream fan-out: route and weather run concurrently under one deadline."""
+
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from app.controllers.trip_controller import _fetch_upstream
+
+START = {"lat": 40.7, "lng": -74.0}
+DROPOFF = {"lat": 34.0, "lng": -118.2}
+
+
+def slow(seconds, value):
+    def call(*args, **kwargs):
+        time.sleep(seconds)
+        return value
+
+    return call
+
+
+class UpstreamFanOutTests(SimpleTestCase):
+    def fetch(self, route_seconds, weather_seconds):
+        timings = {}
+        with mock.patch(
+            "app.controllers.trip_controller.ComputeRouteHandler.execute",
+            side_effect=slow(route_seconds, {"legs": []}),
+        ), mock.patch(
+            "app.controllers.trip_controller.WeatherHandler.get_current_weather",
+            side_effect=slow(weather_seconds, {"temperature_c": 1.0}),
+        ):
+            started = time.monotonic()
+            result = _fetch_upstream(START, START, DROPOFF, True, None, timings)
+        return result, time.monotonic() - started, timings
+
+    def test_lookups_overlap(self):
+        (route, start, dropoff), elapsed, timings = self.fetch(0.3, 0.3)
+        self.assertEqual(route, {"legs": []})
+        self.assertEqual(start, dropoff)
+        self.assertLess(elapsed, 0.55)
+        self.assertIn("weather_dropoff", timings)
+
+    @override_settings(PLAN_UPSTREAM_DEADLINE_SECONDS=0.3)
+    def test_late_weather_is_dropped(self):
+        (route, start, dropoff), elapsed, _ = self.fetch(0.05, 1.0)
+        self.assertEqual((route, start, dropoff), ({"legs": []}, None, None))
+        self.assertLess(elapsed, 0.6)
+
+    @override_settings(PLAN_UPSTREAM_DEADLINE_SECONDS=0.3)
+    def test_late_route_fails_the_plan(self):
+        with self.assertRaises(TimeoutError):
+            self.fetch(1.0, 0.05)
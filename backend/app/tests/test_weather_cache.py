@@ -0,0 +1,123 @@
+"""Weather cache: geo-tile / time-bucket keys and single-flight loads."""
+
+import asyncio
+import threading
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from app.handlers import WeatherHandler
+from app.handlers.weather_cache import WeatherCache
+
+WEATHER = {"temperature_c": 21.0, "conditions": "Clear"}
+
+
+class WeatherCacheKeyTests(SimpleTestCase):
+    def test_nearby_points_share_a_tile(self):
+        self.assertEqual(
+            WeatherCache.tile_for(39.961, -82.998), WeatherCache.tile_for(39.99, -82.91)
+        )
+        self.assertNotEqual(
+            WeatherCache.tile_for(39.961, -82.998),
+            WeatherCache.tile_for(40.01, -82.998),
+        )
+
+    def test_tile_center_lies_inside_the_tile(self):
+        tile = WeatherCache.tile_for(-33.87, 151.21)
+        self.assertEqual(WeatherCache.tile_for(*WeatherCache.tile_center(tile)), tile)
+
+    def test_keys_change_with_the_time_bucket(self):
+        tile = (399, -830)
+        self.assertEqual(
+            WeatherCache.key_for(tile, now=900.0),
+            WeatherCache.key_for(tile, now=1799.0),
+        )
+        self.assertNotEqual(
+            WeatherCache.key_for(tile, now=1799.0),
+            WeatherCache.key_for(tile, now=1800.0),
+        )
+
+
+class WeatherCacheLookupTests(SimpleTestCase):
+    def setUp(self):
+        caches["weather"].clear()
+
+    def test_points_in_one_tile_fetch_once_at_the_center(self):
+        with mock.patch.object(
+            WeatherHandler, "_fetch_current", return_value=WEATHER
+        ) as fetch:
+            first = WeatherHandler.get_current_weather(39.961, -82.998)
+            second = WeatherHandler.get_current_weather(39.99, -82.91)
+        self.assertEqual(first, WEATHER)
+        self.assertEqual(second, WEATHER)
+        fetch.assert_called_once_with(
+            *WeatherCache.tile_center(WeatherCache.tile_for(39.961, -82.998))
+        )
+
+    def test_failed_lookups_are_not_cached(self):
+        with mock.patch.object(
+            WeatherHandler, "_fetch_current", side_effect=[None, WEATHER]
+        ) as fetch:
+            self.assertIsNone(WeatherHandler.get_current_weather(39.961, -82.998))
+            self.assertEqual(
+                WeatherHandler.get_current_weather(39.961, -82.998), WEATHER
+            )
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_concurrent_misses_share_one_fetch(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch(lat, lng):
+            calls.append((lat, lng))
+            release.wait(5)
+            return WEATHER
+
+        results = []
+        with mock.patch.object(
+            WeatherHandler, "_fetch_current", side_effect=slow_fetch
+        ):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(
+                        WeatherHandler.get_current_weather(39.961, -82.998)
+                    )
+                )
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            while not calls:
+                threading.Event().wait(0.01)
+            # Let the joiners reach the in-flight load before it finishes
+            threading.Event().wait(0.1)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [WEATHER] * 4)
+
+    def test_concurrent_async_misses_share_one_fetch(self):
+        calls = []
+
+        async def slow_fetch(lat, lng):
+            calls.append((lat, lng))
+            await asyncio.sleep(0.05)
+            return WEATHER
+
+        async def lookup_all():
+            return await asyncio.gather(
+                *(
+                    WeatherHandler.aget_current_weather(39.961, -82.998)
+                    for _ in range(4)
+                )
+            )
+
+        with mock.patch.object(
+            WeatherHandler, "_afetch_current", side_effect=slow_fetch
+        ):
+            results = asyncio.run(lookup_all())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [WEATHER] * 4)
@@ -0,0 +1,45 @@
+"""Forecast points outside Open-Meteo's range do not fail the others."""
+
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from app.handlers import WeatherHandler
+from app.handlers.weather_cache import WeatherCache
+
+
+def fake_fetch(tiles, start, end):
+    if (datetime.now(timezone.utc).date() - start).days > 92:
+        return {}  # Open-Meteo rejects the whole request
+    entries = {}
+    day = start
+    while day <= end:
+        for tile in tiles:
+            entries[WeatherCache.forecast_key_for(tile, day)] = {
+                f"{day.isoformat()}T{hour:02d}:00": {"temperature_c": hour}
+                for hour in range(24)
+            }
+        day += timedelta(days=1)
+    return entries
+
+
+@override_settings(WEATHER_CACHE={"ENABLED": False})
+class ForecastPointTests(SimpleTestCase):
+    def test_out_of_range_points_are_none_on_their_own(self):
+        now = datetime.now(timezone.utc).replace(hour=12)
+        points = [
+            (39.96, -82.99, now),
+            (39.0, -84.5, now - timedelta(days=400)),
+            (38.6, -90.2, now + timedelta(days=1)),
+            (37.0, -95.0, now + timedelta(days=30)),
+        ]
+        with mock.patch.object(
+            WeatherHandler, "_fetch_hourly", side_effect=fake_fetch
+        ) as fetch:
+            forecasts = WeatherHandler.get_forecast_points(points)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(forecasts[0], {"temperature_c": 12})
+        self.assertIsNone(forecasts[1])
+        self.assertEqual(forecasts[2], {"temperature_c": 12})
+        self.assertIsNone(forecasts[3])
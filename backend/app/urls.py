@@ -1,6 +1,38 @@
 from django.urls import path
-from .views import TripPlanView
+from .views import (
+    TripPlanView,
+    TripPlanBatchView,
+    TripDepartureView,
+    TripWhatIfView,
+    TripReplanView,
+    TripPositionsView,
+    AsyncTripPlanView,
+    MetricsView,
+)
 
 urlpatterns = [
     path("api/trips/plan", TripPlanView.as_view(), name="trip-plan"),
+    path(
+        "api/trips/plan/batch",
+        TripPlanBatchView.as_view(),
+        name="trip-plan-batch",
+    ),
+    path(
+        "api/trips/plan/departure",
+        TripDepartureView.as_view(),
+        name="trip-plan-departure",
+    ),
+    path("api/trips/what-if", TripWhatIfView.as_view(), name="trip-what-if"),
+    path("api/trips/replan", TripReplanView.as_view(), name="trip-replan"),
+    path(
+        "api/trips/plan/<str:plan_id>/positions",
+        TripPositionsView.as_view(),
+        name="trip-plan-positions",
+    ),
+    path(
+        "api/trips/plan/async",
+        AsyncTripPlanView.as_view(),
+        name="trip-plan-async",
+    ),
+    path("api/metrics", MetricsView.as_view(), name="metrics"),
 ]
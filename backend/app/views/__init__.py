@@ -1,3 +1,21 @@
-from .trip_views import TripPlanView
+from .trip_views import (
+    TripPlanView,
+    TripPlanBatchView,
+    TripDepartureView,
+    TripWhatIfView,
+    TripReplanView,
+    TripPositionsView,
+    AsyncTripPlanView,
+)
+from .metrics_views import MetricsView
 
-__all__ = ["TripPlanView"]
+__all__ = [
+    "TripPlanView",
+    "TripPlanBatchView",
+    "TripDepartureView",
+    "TripWhatIfView",
+    "TripReplanView",
+    "TripPositionsView",
+    "AsyncTripPlanView",
+    "MetricsView",
+]
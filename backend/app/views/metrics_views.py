@@ -0,0 +1,30 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from ..handlers import (
+    PlanCache,
+    PlanStore,
+    RouteCache,
+    WeatherCache,
+    get_upstream_client,
+)
+
+
+class MetricsView(APIView):
+    """GET /api/metrics
+
+    Process-local counters for upstream pools, latency, circuit breakers
+    and caches.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return Response(
+            {
+                "upstream": get_upstream_client().stats(),
+                "route_cache": RouteCache.stats(),
+                "weather_cache": WeatherCache.stats(),
+                "plan_store": PlanStore.stats(),
+                "plan_cache": PlanCache.stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
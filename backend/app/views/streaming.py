@@ -0,0 +1,20 @@
+"""NDJSON streaming helpers shared by streaming endpoints."""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def ndjson_response(records, status=200):
+    """Stream an iterable of JSON-serializable records, one per line."""
+    return StreamingHttpResponse(
+        (
+            json.dumps(record, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n"
+            for record in records
+        ),
+        content_type=NDJSON_CONTENT_TYPE,
+        status=status,
+    )
@@ -1,17 +1,57 @@
+import contextlib
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags, quote_etag
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework import status
-from ..controllers.trip_controller import plan_trip
-from ..serializers import TripPlanSerializer
-from drf_spectacular.utils import extend_schema
+from ..controllers.trip_controller import (
+    plan_departure,
+    plan_positions,
+    plan_replan,
+    plan_trip_batch,
+    plan_trip_cached,
+    plan_trip_cached_async,
+    plan_trip_stream,
+    plan_what_if,
+)
+from ..handlers import PlanCache, get_upstream_client
+from ..renderers import CompactPlanRenderer
+from ..serializers import (
+    PlanPositionsSerializer,
+    TripDepartureSerializer,
+    TripPlanSerializer,
+    TripReplanSerializer,
+    TripWhatIfSerializer,
+)
+from .streaming import ndjson_response
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 
 
 class TripPlanView(APIView):
     """POST /api/trips/plan
 
-    Delegates to `controllers.trip_controller.plan_trip` for business logic.
+    Delegates to `controllers.trip_controller.plan_trip` (through
+    `plan_trip_cached`) for business logic.
+    `?format=compact` (or the compact Accept media type) selects
+    CompactPlanRenderer; plain JSON is the default. `?stream=ndjson` streams
+    the plan as NDJSON records instead (see `plan_trip_stream`), sending each
+    daily log as soon as it is generated.
+
+    Identical requests are served from PlanCache. Cached responses carry an
+    ETag; a request whose If-None-Match still matches gets 304 Not Modified.
     """
 
+    renderer_classes = [JSONRenderer, CompactPlanRenderer]
+
     @extend_schema(
         request=TripPlanSerializer,
         responses={
@@ -30,18 +70,267 @@ class TripPlanView(APIView):
             # Controller line 48: datetime.fromisoformat(...)
             # So controller expects string. Serializer returns datetime object.
 
-            validated_data = serializer.validated_data
+            validated_data = controller_payload(serializer.validated_data)
 
-            # Convert datetime back to string for controller compatibility,
-            # OR ideally update controller to handle datetime objects.
-            # Improving controller to handle both is safer best practice.
-            # But for least invasion, let's adapt here.
-            if validated_data.get("start_datetime"):
-                validated_data["start_datetime"] = validated_data[
-                    "start_datetime"
-                ].isoformat()
+            if request.query_params.get("stream") == "ndjson":
+                return ndjson_response(plan_trip_stream(validated_data))
 
-            result = plan_trip(validated_data)
-            return Response(result, status=status.HTTP_200_OK)
+            entry = plan_trip_cached(validated_data)
+            etag = plan_etag(entry, request.accepted_renderer.format)
+            if etag_matches(request, etag):
+                PlanCache.not_modified()
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+            return Response(
+                entry["result"],
+                status=status.HTTP_200_OK,
+                headers={"ETag": etag} if etag else None,
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TripPlanBatchView(APIView):
+    """POST /api/trips/plan/batch
+
+    Body: a JSON array of TripPlanSerializer payloads. Streams NDJSON, one
+    record per item in completion order:
+        {"index": 0, "ok": true, "result": {...plan...}}
+        {"index": 1, "ok": false, "errors": {...}}
+    A bad item never fails the rest of the batch.
+    """
+
+    def post(self, request, *args, **kwargs):
+        payloads = request.data
+        max_items = getattr(settings, "PLAN_BATCH_MAX_ITEMS", 500)
+        if not isinstance(payloads, list):
+            return Response(
+                {"non_field_errors": ["Expected a list of trip plan payloads."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(payloads) > max_items:
+            return Response(
+                {"non_field_errors": [f"Batch is limited to {max_items} items."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        valid_items = []
+        invalid_records = []
+        for index, payload in enumerate(payloads):
+            serializer = TripPlanSerializer(data=payload)
+            if serializer.is_valid():
+                valid_items.append(
+                    (index, controller_payload(serializer.validated_data))
+                )
+            else:
+                invalid_records.append(
+                    {"index": index, "ok": False, "errors": serializer.errors}
+                )
+
+        return ndjson_response(_batch_records(invalid_records, valid_items))
+
+
+def _batch_records(invalid_records, valid_items):
+    yield from invalid_records
+    for index, outcome in plan_trip_batch(valid_items):
+        if isinstance(outcome, Exception):
+            yield {
+                "index": index,
+                "ok": False,
+                "errors": {"non_field_errors": [str(outcome)]},
+            }
+        else:
+            yield {"index": index, "ok": True, "result": outcome}
+
+
+class TripDepartureView(APIView):
+    """POST /api/trips/plan/departure
+
+    Plan payload plus a departure window. Returns the departure minimizing
+    arrival (or elapsed) time and the full plan for it, from one route
+    fetch (see `plan_departure`).
+    """
+
+    @extend_schema(request=TripDepartureSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = TripDepartureSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        validated_data = controller_payload(serializer.validated_data)
+        for key in ("earliest_departure", "latest_departure"):
+            validated_data[key] = validated_data[key].isoformat()
+        return Response(plan_departure(validated_data), status=status.HTTP_200_OK)
+
+
+class TripWhatIfView(APIView):
+    """POST /api/trips/what-if
+
+    One route evaluated for every start_datetimes × current_cycle_used_hours
+    combination in a single vectorized HOS pass. Returns per-cell arrival
+    times and break/reset/restart counts (see `plan_what_if`).
+    """
+
+    @extend_schema(request=TripWhatIfSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = TripWhatIfSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        validated_data = serializer.validated_data
+        validated_data["start_datetimes"] = [
+            start.isoformat() for start in validated_data["start_datetimes"]
+        ]
+        return Response(plan_what_if(validated_data), status=status.HTTP_200_OK)
+
+
+class TripReplanView(APIView):
+    """POST /api/trips/replan
+
+    Mid-trip re-plan: a checkpoint plus the driver's actual ELD events,
+    the current position and the remaining stops. Routes only the remaining
+    distance and returns logs for the affected days (see `plan_replan`).
+    """
+
+    @extend_schema(request=TripReplanSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = TripReplanSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            plan_replan(replan_payload(serializer.validated_data)),
+            status=status.HTTP_200_OK,
+        )
+
+
+class TripPositionsView(APIView):
+    """GET/POST /api/trips/plan/<plan_id>/positions
+
+    Where a stored plan puts the truck at given times (see `plan_positions`).
+    GET takes one or more `?at=` datetimes; POST takes {"times": [...]} for
+    large batches. 404 once the plan is unknown or expired.
+    """
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("at", OpenApiTypes.DATETIME, many=True, required=True)
+        ]
+    )
+    def get(self, request, plan_id, *args, **kwargs):
+        return self._positions(plan_id, {"times": request.query_params.getlist("at")})
+
+    @extend_schema(request=PlanPositionsSerializer)
+    def post(self, request, plan_id, *args, **kwargs):
+        return self._positions(plan_id, request.data)
+
+    @staticmethod
+    def _positions(plan_id, data):
+        serializer = PlanPositionsSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        times = [at.isoformat() for at in serializer.validated_data["times"]]
+        positions = plan_positions(plan_id, times)
+        if positions is None:
+            return Response(
+                {"detail": "Plan not found or expired."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {"plan_id": plan_id, "positions": positions}, status=status.HTTP_200_OK
+        )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncTripPlanView(View):
+    """POST /api/trips/plan/async
+
+    Native async twin of TripPlanView for ASGI deployments. Upstream waits
+    hold no worker thread, so one process can keep many plans in flight.
+    Same payload and response as /api/trips/plan (JSON only), including
+    the plan cache and ETag handling.
+
+    Under WSGI each call runs in its own short-lived event loop, so its
+    upstream calls share one session closed with the request.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse(
+                {"detail": "JSON parse error"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = TripPlanSerializer(data=payload)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        scope = (
+            contextlib.nullcontext()
+            if isinstance(request, ASGIRequest)
+            else get_upstream_client().request_session()
+        )
+        async with scope:
+            entry = await plan_trip_cached_async(
+                controller_payload(serializer.validated_data)
+            )
+        etag = plan_etag(entry, "json")
+        if etag_matches(request, etag):
+            PlanCache.not_modified()
+            response = HttpResponseNotModified()
+        else:
+            response = JsonResponse(entry["result"], status=status.HTTP_200_OK)
+        if etag:
+            response["ETag"] = etag
+        return response
+
+
+def plan_etag(entry, renderer_format):
+    """Strong ETag for a cached plan in one representation (None if uncached)."""
+    if entry["tag"] is None:
+        return None
+    return quote_etag(f"{entry['tag']}-{renderer_format}")
+
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match names `etag` (weak comparison)."""
+    header = request.headers.get("If-None-Match")
+    if not header or etag is None:
+        return False
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == etag
+        for candidate in parse_etags(header)
+    )
+
+
+def controller_payload(validated_data):
+    """Adapt serializer output to the controller's input contract.
+
+    The controller expects `start_datetime` as an ISO string, while the
+    serializer returns a datetime object.
+    """
+    if validated_data.get("start_datetime"):
+        validated_data["start_datetime"] = validated_data["start_datetime"].isoformat()
+    return validated_data
+
+
+def replan_payload(validated_data):
+    """Adapt TripReplanSerializer output: dates and datetimes become ISO strings."""
+    checkpoint = validated_data.get("checkpoint")
+    if checkpoint is not None:
+        checkpoint["at"] = checkpoint["at"].isoformat()
+        if checkpoint.get("shift_started_at") is not None:
+            checkpoint["shift_started_at"] = checkpoint["shift_started_at"].isoformat()
+        if "day" in checkpoint["cycle"]:
+            checkpoint["cycle"]["day"] = checkpoint["cycle"]["day"].isoformat()
+        if checkpoint.get("split") is not None:
+            checkpoint["split"]["ended_at"] = checkpoint["split"][
+                "ended_at"
+            ].isoformat()
+    for event in validated_data.get("events", []):
+        event["start_datetime"] = event["start_datetime"].isoformat()
+        event["end_datetime"] = event["end_datetime"].isoformat()
+    return validated_data
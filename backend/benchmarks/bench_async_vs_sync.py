@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""Load comparison: sync worker pool vs one asyncio loop against a slow OSRM stub.
+
+Starts a local OSRM/Open-Meteo stub that answers after a fixed delay, then
+plans N trips:
+- sync:  `plan_trip` on W threads, standing in for W sync gunicorn workers
+- async: `plan_trip_async` for all N plans on a single event loop
+
+Usage: python benchmarks/bench_async_vs_sync.py [plans] [sync_workers] [delay_s]
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import polyline
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ["ROUTE_CACHE_ENABLED"] = "False"  # Every plan must reach the stub
+
+PLANS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+SYNC_WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+DELAY = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(DELAY)
+        if self.path.startswith("/route"):
+            coords = [(40.0 + i * 0.01, -74.0 - i * 0.05) for i in range(400)]
+            body = {
+                "code": "Ok",
+                "routes": [
+                    {
+                        "geometry": polyline.encode(coords),
+                        "legs": [
+                            {"distance": 5000.0, "duration": 600.0},
+                            {"distance": 1_500_000.0, "duration": 60_000.0},
+                        ],
+                    }
+                ],
+            }
+        else:
+            body = {"current_weather": {"temperature": 10.0, "windspeed": 5.0}}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def serve_stub(port_queue):
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_stub():
+    """Run the stub in its own process so it doesn't compete for our GIL."""
+    port_queue = multiprocessing.Queue()
+    multiprocessing.Process(target=serve_stub, args=(port_queue,), daemon=True).start()
+    base = f"http://127.0.0.1:{port_queue.get()}"
+    os.environ["OSRM_BASE_URL"] = f"{base}/route/v1/driving"
+    os.environ["OPEN_METEO_BASE_URL"] = f"{base}/forecast"
+
+
+def payload(i):
+    return {
+        "start": {"lat": 40.7128 + i * 0.01, "lng": -74.006},
+        "pickup": {"lat": 40.7489, "lng": -73.968},
+        "dropoff": {"lat": 34.0522, "lng": -118.2437},
+        "start_datetime": "2025-01-15T06:00:00+00:00",
+        "current_cycle_used_hours": 10,
+    }
+
+
+def run_sync(plan_trip):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as pool:
+        results = list(pool.map(plan_trip, (payload(i) for i in range(PLANS))))
+    return time.perf_counter() - started, results
+
+
+def run_async(plan_trip_async):
+    from app.handlers import get_upstream_client
+
+    async def main():
+        try:
+            return await asyncio.gather(
+                *(plan_trip_async(payload(i)) for i in range(PLANS))
+            )
+        finally:
+            await get_upstream_client().aclose()
+
+    started = time.perf_counter()
+    results = asyncio.run(main())
+    return time.perf_counter() - started, results
+
+
+if __name__ == "__main__":
+    start_stub()
+
+    import django
+
+    django.setup()
+
+    from app.controllers.trip_controller import plan_trip, plan_trip_async
+
+    print(f"{PLANS} plans, upstream delay {DELAY * 1000:.0f} ms")
+    for name, runner, fn in (
+        (f"sync ({SYNC_WORKERS} workers)", run_sync, plan_trip),
+        ("async (1 loop)", run_async, plan_trip_async),
+    ):
+        elapsed, results = runner(fn)
+        failed = sum(1 for r in results if r["route"] is None)
+        print(
+            f"{name:<20} {elapsed:7.2f} s  {PLANS / elapsed:8.1f} plans/s  failed={failed}"
+        )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Benchmark default JSON vs compact plan encoding on a synthetic long haul.
+
+Usage: python benchmarks/bench_compact_encoding.py [route_points]
+"""
+
+import math
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+
+from app.handlers import EldLogGenerator, HosRulesHandler
+from app.handlers.segments import serialize_daily_logs, serialize_segments
+from app.renderers import CompactPlanRenderer
+
+
+def synthetic_plan(points):
+    # NYC → LA-ish polyline at OSRM's 5-decimal precision
+    coords = [
+        [
+            round(
+                -74.006 + (-118.2437 + 74.006) * i / points + 0.02 * math.sin(i / 50), 5
+            ),
+            round(40.7128 + (34.0522 - 40.7128) * i / points, 5),
+        ]
+        for i in range(points + 1)
+    ]
+    skeleton = [
+        {"status": "D", "duration_hours": 0.5, "miles": 5.0, "note": "Start → Pickup"},
+        {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup (1 hour)"},
+    ]
+    for _ in range(8):
+        skeleton.append(
+            {
+                "status": "D",
+                "duration_hours": 5.0,
+                "miles": 300.0,
+                "note": "Pickup → Dropoff",
+            }
+        )
+    skeleton.append(
+        {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff (1 hour)"}
+    )
+    hos = HosRulesHandler.execute(
+        skeleton, 0, datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+    )
+    return {
+        "route": {
+            "geometry": {"type": "LineString", "coordinates": coords},
+            "total_distance_miles": 2795.4,
+            "total_duration_hours": 42.5,
+            "legs": [],
+        },
+        "stops": [],
+        "segments": serialize_segments(hos["segments"]),
+        "daily_logs": serialize_daily_logs(EldLogGenerator.execute(hos["segments"])),
+        "warnings": hos["warnings"],
+    }
+
+
+def measure(renderer, data, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = renderer.render(data)
+    return len(body), (time.perf_counter() - started) * 1000.0 / repeat
+
+
+if __name__ == "__main__":
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+    plan = synthetic_plan(points)
+    json_bytes, json_ms = measure(JSONRenderer(), plan)
+    compact_bytes, compact_ms = measure(CompactPlanRenderer(), plan)
+    print(f"route points: {points}")
+    print(f"json:    {json_bytes:>10,} bytes  {json_ms:8.2f} ms/render")
+    print(f"compact: {compact_bytes:>10,} bytes  {compact_ms:8.2f} ms/render")
+    print(
+        f"size ratio: {json_bytes / compact_bytes:.1f}x  time ratio: {json_ms / compact_ms:.1f}x"
+    )
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""Benchmark departure search: per-minute re-simulation vs piecewise optimizer.
+
+The brute-force baseline runs HosRulesHandler for every minute of the
+window and keeps the best departure. DepartureOptimizer simulates only the
+ends of each piece of the elapsed-time profile. Both must choose the same
+departure and arrival, for both objectives, with a static cycle (one piece)
+and with a rolling 8-day history whose hours roll off during the window.
+
+Usage: python benchmarks/bench_departure_optimizer.py [window_hours] [cycle_hours]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import DepartureOptimizer, HosRulesHandler
+
+HISTORY = [11.0, 9.5, 10.0, 12.0, 8.0, 6.5, 11.0]
+SKELETON = [
+    {"status": "D", "duration_hours": 9.5, "miles": 560.0, "note": "Start → Pickup"},
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup (1 hour)"},
+    {
+        "status": "D",
+        "duration_hours": 30.0,
+        "miles": 1850.0,
+        "note": "Pickup → Dropoff",
+    },
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff (1 hour)"},
+]
+
+
+def brute_force(cycle_hours, history, earliest, latest, objective):
+    """(departure, arrival) from one full simulation per minute."""
+    best = None
+    departure = earliest
+    while departure <= latest:
+        if history is not None:
+            days_waited = (departure.date() - earliest.date()).days
+            history_then = history + [0.0] * days_waited
+        else:
+            history_then = None
+        segments = HosRulesHandler.execute(
+            SKELETON, cycle_hours, departure, history_then
+        )["segments"]
+        arrival = segments[-1].end
+        score = arrival if objective == "arrival" else arrival - departure
+        if best is None or score < best[0]:
+            best = (score, departure, arrival)
+        departure += timedelta(minutes=1)
+    return best[1], best[2]
+
+
+def optimized(cycle_hours, history, earliest, latest, objective):
+    result = DepartureOptimizer.execute(
+        SKELETON, cycle_hours, earliest, latest, objective, None, history
+    )
+    return result["departure"], result["arrival"], result["evaluated"]
+
+
+if __name__ == "__main__":
+    window_hours = float(sys.argv[1]) if len(sys.argv) > 1 else 24.0
+    cycle_hours = float(sys.argv[2]) if len(sys.argv) > 2 else 40.0
+    earliest = datetime(2025, 1, 15, 4, tzinfo=timezone.utc)
+    latest = earliest + timedelta(hours=window_hours)
+
+    for cycle, history in (("static", None), ("rolling", HISTORY)):
+        for objective in ("arrival", "elapsed"):
+            timings = {}
+            started = time.perf_counter()
+            expected = brute_force(cycle_hours, history, earliest, latest, objective)
+            timings["per-minute"] = (time.perf_counter() - started) * 1000.0
+            started = time.perf_counter()
+            departure, arrival, evaluated = optimized(
+                cycle_hours, history, earliest, latest, objective
+            )
+            timings["piecewise"] = (time.perf_counter() - started) * 1000.0
+            assert (departure, arrival) == expected, "answers differ"
+
+            print(
+                f"{cycle} cycle, objective={objective}: depart {departure.isoformat()}"
+            )
+            print(f"  arrive {arrival.isoformat()} ({evaluated} simulations)")
+            for name, ms in timings.items():
+                print(f"  {name:10} {ms:9.2f} ms")
+            print(f"  speedup: {timings['per-minute'] / timings['piecewise']:.0f}x")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""Benchmark daily log clipping: per-day rescan vs single sweep.
+
+The rescan is the previous EldLogGenerator loop, which checks every segment
+against every day (O(days × segments)). The sweep keeps one pointer into the
+time-ordered segments as the midnights advance (O(segments + days)).
+Timelines are synthetic HOS outputs from a few days (a long-haul trip) to a
+quarter (a re-plan replaying up to 1,000 ELD events); both paths must
+produce identical logs.
+
+Usage: python benchmarks/bench_eld_sweep.py [days,...] [repeat]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import EldLogGenerator, HosRulesHandler
+from app.handlers.segments import Segment, serialize_daily_logs
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+
+
+def synthetic_segments(days):
+    # Local delivery routes: 1 h legs with 20 min stops → many segments/day
+    skeleton = []
+    for index in range(days * 12):
+        skeleton.append(
+            {
+                "status": "D",
+                "duration_hours": 1.0,
+                "miles": 55.0,
+                "note": f"Leg {index}",
+            }
+        )
+        skeleton.append(
+            {"status": "ON", "duration_hours": 0.34, "miles": 0, "note": "Delivery"}
+        )
+    segments = HosRulesHandler.execute(skeleton, 0, START)["segments"]
+    last_day = (START + timedelta(days=days)).date()
+    return [seg for seg in segments if seg.start.date() < last_day]
+
+
+def rescan_daily_logs(segments):
+    """Previous EldLogGenerator loop: every segment is checked for every day."""
+    logs = []
+    current_date = segments[0].start.date()
+    while current_date <= segments[-1].end.date():
+        day_start = datetime.combine(
+            current_date, datetime.min.time(), tzinfo=timezone.utc
+        )
+        day_end = datetime.combine(
+            current_date + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc
+        )
+        clipped_segments = []
+        totals = {"OFF_hours": 0.0, "SB_hours": 0.0, "D_hours": 0.0, "ON_hours": 0.0}
+        total_miles = 0.0
+        remarks = set()
+        for seg in segments:
+            seg_start = seg.start
+            seg_end = seg.end
+            if seg_end <= day_start or seg_start >= day_end:
+                continue
+            clipped_start = max(seg_start, day_start)
+            clipped_end = min(seg_end, day_end)
+            clipped_duration = (clipped_end - clipped_start).total_seconds() / 3600.0
+            clipped_miles = seg.miles * (
+                clipped_duration / ((seg_end - seg_start).total_seconds() / 3600.0)
+                if (seg_end - seg_start).total_seconds() > 0
+                else 0
+            )
+            clipped_segments.append(
+                Segment(clipped_start, clipped_end, seg.status, clipped_miles, seg.note)
+            )
+            totals[f"{seg.status}_hours"] += clipped_duration
+            total_miles += clipped_miles
+            if seg.note:
+                remarks.add(seg.note)
+        total_hours = sum(totals.values())
+        if total_hours > 0:
+            scale = 24.0 / total_hours if total_hours > 24 else 1.0
+            if 23.9 < total_hours < 24.1:
+                scale = 24.0 / total_hours
+            for key in totals:
+                totals[key] *= scale if total_hours > 24 else 1.0
+        logs.append(
+            {
+                "date": current_date.isoformat(),
+                "segments": clipped_segments,
+                "totals": {k: round(v, 2) for k, v in totals.items()},
+                "miles": round(total_miles, 2),
+                "remarks": sorted(list(remarks)),
+            }
+        )
+        current_date += timedelta(days=1)
+    return logs
+
+
+def measure(generate, segments, repeat):
+    """(daily logs, ms per call)."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        logs = generate(segments)
+    return logs, (time.perf_counter() - started) * 1000.0 / repeat
+
+
+if __name__ == "__main__":
+    sizes = sys.argv[1] if len(sys.argv) > 1 else "3,7,14,31,90"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(
+        f"{'days':>5} {'segments':>9} {'rescan ms':>10} {'sweep ms':>9} {'speedup':>8}"
+    )
+    for days in (int(size) for size in sizes.split(",")):
+        segments = synthetic_segments(days)
+        rescan = measure(rescan_daily_logs, segments, repeat)
+        sweep = measure(EldLogGenerator.execute, segments, repeat)
+        assert json.dumps(serialize_daily_logs(rescan[0])) == json.dumps(
+            serialize_daily_logs(sweep[0])
+        ), "outputs differ"
+        print(
+            f"{days:5} {len(segments):9} {rescan[1]:10.3f} {sweep[1]:9.3f} "
+            f"{rescan[1] / sweep[1]:7.1f}x"
+        )
+    print("(identical output)")
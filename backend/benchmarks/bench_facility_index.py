@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""Benchmark the facility grid index used to snap rest and fuel stops.
+
+Builds a FacilityIndex over random facilities spread across the lower 48
+states, saves it as .npy and reloads it memory-mapped. Then times radius
+lookups (checked against a brute-force scan of every facility) and stop
+snapping along a synthetic cross-country route.
+
+Usage: python benchmarks/bench_facility_index.py [facilities] [queries]
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+import numpy as np
+
+from app.handlers.facilities import METERS_PER_MILE, FacilityIndex
+from app.handlers.geometry import (
+    METERS_PER_DEG_LAT,
+    METERS_PER_DEG_LNG_EQUATOR,
+    RouteIndex,
+)
+
+RADIUS_M = 5 * METERS_PER_MILE
+
+
+def random_facilities(count, rng):
+    kinds = ("truck_stop", "fuel", "rest_area", "parking")
+    return [
+        (
+            rng.uniform(-124.0, -67.0),
+            rng.uniform(25.0, 49.0),
+            f"Facility {index}",
+            rng.choice(kinds),
+        )
+        for index in range(count)
+    ]
+
+
+def brute_force(index, lng, lat, radius_m):
+    records = np.asarray(index.records)
+    cos_lat = math.cos(math.radians(lat))
+    dx = (records["lng"] - lng) * METERS_PER_DEG_LNG_EQUATOR * cos_lat
+    dy = (records["lat"] - lat) * METERS_PER_DEG_LAT
+    return set(np.flatnonzero(np.hypot(dx, dy) <= radius_m).tolist())
+
+
+def timed(func, queries):
+    started = time.perf_counter()
+    for query in queries:
+        func(*query)
+    return (time.perf_counter() - started) * 1e6 / len(queries)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = random.Random(17)
+
+    rows = random_facilities(count, rng)
+    started = time.perf_counter()
+    built = FacilityIndex.from_rows(rows)
+    build_ms = (time.perf_counter() - started) * 1000.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "facilities.npy")
+        built.save(path)
+        started = time.perf_counter()
+        index = FacilityIndex.load(path)
+        load_ms = (time.perf_counter() - started) * 1000.0
+        size_mb = os.path.getsize(path) / 1e6
+
+        points = [
+            (rng.uniform(-120.0, -70.0), rng.uniform(28.0, 47.0))
+            for _ in range(queries)
+        ]
+        for lng, lat in points[:50]:
+            found, _ = index.within(lng, lat, RADIUS_M)
+            assert set(found.tolist()) == brute_force(index, lng, lat, RADIUS_M)
+        within_us = timed(lambda lng, lat: index.within(lng, lat, RADIUS_M), points)
+        brute_us = timed(
+            lambda lng, lat: brute_force(index, lng, lat, RADIUS_M), points[:50]
+        )
+
+        # New York → Los Angeles-like line, a vertex every ~250 m
+        vertices = 18_000
+        route = RouteIndex(
+            np.column_stack(
+                (
+                    np.linspace(-74.0, -118.2, vertices),
+                    40.7 - 6.7 * np.linspace(0.0, 1.0, vertices) ** 2,
+                )
+            ).tolist()
+        )
+        stops = [
+            (rng.uniform(0.0, route.length_m), rng.choice(["fuel", "rest"]))
+            for _ in range(queries)
+        ]
+        snapped = 0
+        started = time.perf_counter()
+        for distance_m, stop_type in stops:
+            facility = index.snap(
+                route,
+                distance_m,
+                3 * METERS_PER_MILE,
+                25 * METERS_PER_MILE,
+                ("truck_stop", "fuel") if stop_type == "fuel" else None,
+            )
+            if facility is not None:
+                snapped += 1
+                assert facility["off_route_miles"] <= 3.0 + 1e-6
+                assert 0.0 <= facility["miles_before_ideal"] <= 25.0 + 1e-6
+        snap_us = (time.perf_counter() - started) * 1e6 / len(stops)
+        del index
+
+    print(f"{count} facilities, {size_mb:.1f} MB .npy")
+    print(f"{'build (rows)':24} {build_ms:9.1f} ms")
+    print(f"{'load (mmap)':24} {load_ms:9.3f} ms")
+    print(f"{'within 5 mi, brute force':24} {brute_us:9.1f} µs/query")
+    print(f"{'within 5 mi, grid':24} {within_us:9.1f} µs/query")
+    print(f"{'snap (3 mi detour)':24} {snap_us:9.1f} µs/stop ({snapped} snapped)")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Benchmark the event-driven HOS simulation on ever longer drive legs.
+
+Runs HosRulesHandler on a pickup plus one drive leg of 10 to 2,000 hours.
+Each leg is cut wherever a limit binds, so time per plan should grow with
+the number of emitted segments, and µs/seg should stay flat as legs grow.
+Every plan is checked for compliance: no more than 11 hours driving or 14
+hours elapsed per shift, 8 hours driving between breaks, and leg miles
+preserved across the split pieces.
+
+Usage: python benchmarks/bench_hos_events.py [repeat]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import HosRulesHandler
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+TOLERANCE = 1e-6
+
+
+def skeleton(hours):
+    return [
+        {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup"},
+        {"status": "D", "duration_hours": hours, "miles": hours * 55.0, "note": "Leg"},
+    ]
+
+
+def check_compliance(segments, miles):
+    shift_start = None
+    shift_drive = since_break = 0.0
+    for seg in segments:
+        hours = (seg.end - seg.start) / HOUR
+        if seg.status in ("D", "ON") and shift_start is None:
+            shift_start = seg.start
+        if seg.status == "D":
+            shift_drive += hours
+            since_break += hours
+            assert shift_drive <= 11.0 + TOLERANCE, "11-hour limit"
+            assert (seg.end - shift_start) / HOUR <= 14.0 + TOLERANCE, "14-hour window"
+            assert since_break <= 8.0 + TOLERANCE, "8-hour break rule"
+        elif hours >= 10.0:
+            shift_start, shift_drive, since_break = None, 0.0, 0.0
+        elif hours >= 0.5:
+            since_break = 0.0
+    driven = sum(seg.miles for seg in segments if seg.note == "Leg")
+    assert abs(driven - miles) < TOLERANCE, "miles not preserved"
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'drive h':>8} {'segments':>8} {'µs/plan':>9} {'µs/seg':>7}")
+    for hours in (10, 40, 100, 400, 2000):
+        trip = skeleton(float(hours))
+        started = time.perf_counter()
+        for _ in range(repeat):
+            segments = HosRulesHandler.execute(trip, 0.0, START)["segments"]
+        plan_us = (time.perf_counter() - started) * 1e6 / repeat
+        check_compliance(segments, trip[1]["miles"])
+        print(
+            f"{hours:8d} {len(segments):8d} {plan_us:9.1f} "
+            f"{plan_us / len(segments):7.2f}"
+        )
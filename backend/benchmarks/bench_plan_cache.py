@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""Benchmark the full-response plan cache on /api/trips/plan.
+
+Starts a local OSRM/Open-Meteo stub that answers after a fixed delay, then
+sends requests through the Django test client:
+- cold: a distinct trip per request (every request computes)
+- warm: the same trip again, with coordinate and cycle-hour noise below
+  the canonical precision (served from the cache, same ETag)
+- 304: the same trip with If-None-Match
+- burst: N concurrent identical requests for a new trip; the stub counts
+  route calls to show only one of them computed
+
+Usage: python benchmarks/bench_plan_cache.py [requests] [burst] [delay_s]
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import polyline
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ["ROUTE_CACHE_ENABLED"] = "False"  # Cold plans must reach the stub
+os.environ["WEATHER_CACHE_ENABLED"] = "False"
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+BURST = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+DELAY = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+
+route_calls = multiprocessing.Value("i", 0)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(DELAY)
+        if self.path.startswith("/route"):
+            with route_calls.get_lock():
+                route_calls.value += 1
+            coords = [(40.0 + i * 0.01, -74.0 - i * 0.05) for i in range(400)]
+            body = {
+                "code": "Ok",
+                "routes": [
+                    {
+                        "geometry": polyline.encode(coords),
+                        "legs": [
+                            {"distance": 5000.0, "duration": 600.0},
+                            {"distance": 1_500_000.0, "duration": 60_000.0},
+                        ],
+                    }
+                ],
+            }
+        else:
+            body = {"current_weather": {"temperature": 10.0, "windspeed": 5.0}}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def serve_stub(port_queue):
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_stub():
+    """Run the stub in its own process so it doesn't compete for our GIL."""
+    port_queue = multiprocessing.Queue()
+    multiprocessing.Process(target=serve_stub, args=(port_queue,), daemon=True).start()
+    base = f"http://127.0.0.1:{port_queue.get()}"
+    os.environ["OSRM_BASE_URL"] = f"{base}/route/v1/driving"
+    os.environ["OPEN_METEO_BASE_URL"] = f"{base}/forecast"
+
+
+def payload(i, noise=0.0):
+    return {
+        "start": {"lat": 40.7128 + i * 0.01 + noise, "lng": -74.006},
+        "pickup": {"lat": 40.7489, "lng": -73.968},
+        "dropoff": {"lat": 34.0522, "lng": -118.2437},
+        "start_datetime": "2025-01-15T06:00:00+00:00",
+        "current_cycle_used_hours": 10 + noise,
+    }
+
+
+def timed_ms(send, count):
+    started = time.perf_counter()
+    for i in range(count):
+        send(i)
+    return (time.perf_counter() - started) * 1000.0 / count
+
+
+if __name__ == "__main__":
+    start_stub()
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.test import Client
+
+    from app.handlers import PlanCache
+
+    settings.ALLOWED_HOSTS = ["*"]
+    client = Client()
+
+    def post(body, **headers):
+        return client.post(
+            "/api/trips/plan",
+            json.dumps(body),
+            content_type="application/json",
+            **headers,
+        )
+
+    cold_ms = timed_ms(lambda i: post(payload(i)), REQUESTS)
+
+    first = post(payload(0))
+    etag = first["ETag"]
+    for i in range(5):
+        again = post(payload(0, noise=1e-7 * (i + 1)))
+        assert again.status_code == 200 and again["ETag"] == etag, "cache miss"
+        assert again.json() == first.json(), "cached response differs"
+    warm_ms = timed_ms(lambda i: post(payload(0, noise=1e-7)), REQUESTS)
+
+    def not_modified(i):
+        response = post(payload(0), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304 and not response.content
+
+    not_modified_ms = timed_ms(not_modified, REQUESTS)
+
+    before = route_calls.value
+    with ThreadPoolExecutor(max_workers=BURST) as pool:
+        etags = set(
+            pool.map(lambda _: post(payload(REQUESTS + 1))["ETag"], range(BURST))
+        )
+    burst_routes = route_calls.value - before
+    assert len(etags) == 1, "burst produced several computations"
+    assert burst_routes == 1, f"burst routed {burst_routes} times"
+
+    print(f"{REQUESTS} requests, upstream delay {DELAY * 1000:.0f} ms")
+    print(f"{'cold (computed)':24} {cold_ms:8.2f} ms/request")
+    print(f"{'warm (cached)':24} {warm_ms:8.2f} ms/request")
+    print(f"{'304 Not Modified':24} {not_modified_ms:8.2f} ms/request")
+    print(f"{f'burst of {BURST}':24} {burst_routes:8d} route call(s)")
+    print(f"plan_cache {json.dumps(PlanCache.stats())}")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Benchmark position-at-time lookups on a stored plan.
+
+Plans a synthetic cross-country trip (HOS resets, breaks and fuel stops
+included), stores it with PlanStore, then times lookups one at a time and
+in batches, directly on PlanPositions and through the positions endpoint.
+Every position is checked against a linear walk over the segments and the
+route's vertices.
+
+Usage: python benchmarks/bench_plan_positions.py [lookups] [batch]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.test import Client
+
+from app.handlers import HosRulesHandler, PlanStore
+from app.handlers.geometry import cumulative_distances_m
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+TOLERANCE = 1e-7
+
+
+def synthetic_route(points, rng):
+    """A wandering NY → LA-like line with `points` vertices."""
+    lng, lat = -74.0, 40.7
+    coords = [[lng, lat]]
+    for _ in range(points - 1):
+        lng -= rng.uniform(0.0, 88.0 / points)
+        lat += rng.uniform(-6.0, 6.0) / points
+        coords.append([lng, lat])
+    return coords
+
+
+def linear_position(segments, coords, cumulative, at):
+    """(phase, miles, [lng, lat]) by walking every segment and vertex."""
+    driven = sum(seg.miles for seg in segments if seg.status == "D")
+    if at < segments[0].start:
+        return "not_started", 0.0, list(coords[0])
+    miles = 0.0
+    for seg in segments:
+        seg_miles = seg.miles if seg.status == "D" else 0.0
+        if at < seg.end:
+            span = (seg.end - seg.start).total_seconds()
+            elapsed = (at - seg.start).total_seconds()
+            miles += seg_miles * (elapsed / span if span > 0 else 0.0)
+            phase = "en_route"
+            break
+        miles += seg_miles
+    else:
+        phase = "completed"
+
+    distance = miles / driven * cumulative[-1]
+    for index in range(1, len(coords)):
+        if cumulative[index] >= distance:
+            span = cumulative[index] - cumulative[index - 1]
+            t = (distance - cumulative[index - 1]) / span if span > 0 else 0.0
+            (lng0, lat0), (lng1, lat1) = coords[index - 1], coords[index]
+            return phase, miles, [lng0 + (lng1 - lng0) * t, lat0 + (lat1 - lat0) * t]
+    return phase, miles, list(coords[-1])
+
+
+def rate(started, lookups):
+    return lookups / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = random.Random(5)
+    settings.ALLOWED_HOSTS = ["*"]
+
+    coords = synthetic_route(20_000, rng)
+    skeleton = [
+        {"status": "D", "duration_hours": 20.0, "miles": 1_100.0},
+        {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup"},
+        {"status": "D", "duration_hours": 30.0, "miles": 1_700.0},
+        {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff"},
+    ]
+    segments = HosRulesHandler.execute(skeleton, 10.0, START)["segments"]
+    plan_id = PlanStore.save(segments, coords)
+    assert plan_id is not None, "plan store disabled"
+    positions = PlanStore.get(plan_id)
+
+    span_s = (segments[-1].end - START).total_seconds()
+    times = [
+        START + timedelta(seconds=rng.uniform(-3_600.0, span_s + 3_600.0))
+        for _ in range(lookups)
+    ]
+
+    cumulative = cumulative_distances_m(coords).tolist()
+    for at, found in zip(times[:300], positions.at(times[:300])):
+        phase, miles, (lng, lat) = linear_position(segments, coords, cumulative, at)
+        assert found["phase"] == phase, "phase mismatch"
+        assert math.isclose(found["miles"], miles, abs_tol=1e-3), "miles mismatch"
+        assert math.isclose(found["lng"], lng, abs_tol=TOLERANCE), "lng mismatch"
+        assert math.isclose(found["lat"], lat, abs_tol=TOLERANCE), "lat mismatch"
+
+    started = time.perf_counter()
+    for at in times:
+        PlanStore.get(plan_id).at([at])
+    scalar_rate = rate(started, lookups)
+
+    started = time.perf_counter()
+    for first in range(0, lookups, batch):
+        PlanStore.get(plan_id).at(times[first : first + batch])
+    batch_rate = rate(started, lookups)
+
+    client = Client()
+    url = f"/api/trips/plan/{plan_id}/positions"
+    iso = [at.isoformat() for at in times]
+    requests = min(lookups, 1_000)
+    started = time.perf_counter()
+    for value in iso[:requests]:
+        response = client.get(url, {"at": value})
+        assert response.status_code == 200, response.content
+    get_rate = rate(started, requests)
+
+    started = time.perf_counter()
+    for first in range(0, lookups, batch):
+        response = client.post(
+            url, {"times": iso[first : first + batch]}, content_type="application/json"
+        )
+        assert response.status_code == 200, response.content
+    post_rate = rate(started, lookups)
+
+    assert (
+        client.get("/api/trips/plan/unknown/positions", {"at": iso[0]}).status_code
+        == 404
+    )
+
+    print(f"{len(segments)} segments, {len(coords)} route points, {lookups} lookups")
+    print(f"{'PlanPositions, one time':28} {scalar_rate:12,.0f} lookups/s")
+    print(f"{'PlanPositions, batch ' + str(batch):28} {batch_rate:12,.0f} lookups/s")
+    print(f"{'GET ?at=, one per request':28} {get_rate:12,.0f} lookups/s")
+    print(f"{'POST, batch ' + str(batch):28} {post_rate:12,.0f} lookups/s")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Benchmark mid-trip re-planning from a checkpoint against a full re-plan.
+
+Each synthetic trip is a chain of stops. A full re-plan simulates the whole
+skeleton again; the incremental one replays the first half's segments as
+recorded events (HosRulesHandler.record) and simulates only the stops left
+from the resulting checkpoint. The replayed-plus-resumed timeline must
+equal the full plan exactly. Replay is timed separately: a client that
+sends the previous checkpoint replays only the events since then. Routing
+is not timed; a re-plan also routes only the remaining distance.
+
+Usage: python benchmarks/bench_replan.py [trips] [stops]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import HosRulesHandler
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+
+
+def synthetic_trip(rng, stops):
+    """Drive legs of 2–12 h at 55 mph, each followed by a 1-hour stop."""
+    skeleton = []
+    for _ in range(stops):
+        hours = rng.uniform(2.0, 12.0)
+        skeleton.append({"status": "D", "duration_hours": hours, "miles": hours * 55.0})
+        skeleton.append({"status": "ON", "duration_hours": 1.0, "miles": 0})
+    return skeleton
+
+
+def events_from(segments):
+    return [
+        {
+            "status": seg.status,
+            "start": seg.start,
+            "end": seg.end,
+            "miles": seg.miles,
+            "note": seg.note,
+        }
+        for seg in segments
+    ]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    stops = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = random.Random(7)
+    trips = [(synthetic_trip(rng, stops), rng.uniform(0.0, 40.0)) for _ in range(count)]
+
+    full_s = replay_s = resume_s = 0.0
+    for skeleton, cycle in trips:
+        half = len(skeleton) // 2
+        started = time.perf_counter()
+        full = HosRulesHandler.execute(skeleton, cycle, START)
+        full_s += time.perf_counter() - started
+
+        # Driven so far: the first half of the same plan, as the ELD logged it
+        done = HosRulesHandler.execute(skeleton[:half], cycle, START)
+        events = events_from(done["segments"])
+
+        started = time.perf_counter()
+        recorded = HosRulesHandler.record(events, cycle, START)
+        replay_s += time.perf_counter() - started
+
+        started = time.perf_counter()
+        resumed = HosRulesHandler.execute(
+            skeleton[half:], 0.0, None, checkpoint=recorded["checkpoint"]
+        )
+        resume_s += time.perf_counter() - started
+
+        timeline = [seg.to_dict() for seg in recorded["segments"] + resumed["segments"]]
+        assert timeline == [seg.to_dict() for seg in full["segments"]], "mismatch"
+        assert resumed["checkpoint"] == full["checkpoint"], "checkpoint mismatch"
+
+    print(f"{count} trips × {stops} stops, re-plan at the halfway stop")
+    print(f"{'full re-plan':22} {full_s * 1e6 / count:9.1f} µs/trip")
+    print(f"{'replay first half':22} {replay_s * 1e6 / count:9.1f} µs/trip")
+    print(f"{'resume from checkpoint':22} {resume_s * 1e6 / count:9.1f} µs/trip")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Micro-benchmarks for the HOS simulators, per rule set.
+
+For each built-in rule set, times HosRulesHandler (one plan) and
+HosGridSimulator (a departure × cycle-hours grid) on the same synthetic
+multi-week skeleton. `events` is the number of limit events the rule set
+queues; ns/seg is per emitted segment. The grid cell for the plan's cycle
+hours must arrive exactly when the plan does.
+
+Usage: python benchmarks/bench_rule_sets.py [weeks] [repeat]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import HosGridSimulator, HosRulesHandler, get_rule_set
+from app.handlers.hos_rule_sets import RULE_SETS
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+GRID_STARTS = [START + timedelta(hours=hour) for hour in range(24)]
+GRID_CYCLES = [float(hours) for hours in range(0, 71, 5)]
+
+
+def synthetic_skeleton(weeks):
+    # Long-haul days: two drives around a stop, with an overnight every 3rd leg
+    skeleton = []
+    for index in range(weeks * 7 * 3):
+        skeleton.append(
+            {"status": "D", "duration_hours": 5.5, "miles": 330.0, "note": "Leg"}
+        )
+        skeleton.append(
+            {"status": "ON", "duration_hours": 0.75, "miles": 0, "note": "Stop"}
+        )
+        if index % 3 == 2:
+            skeleton.append(
+                {"status": "OFF", "duration_hours": 10.0, "miles": 0, "note": "Night"}
+            )
+    return skeleton
+
+
+def timed(func, repeat, *args):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - started) * 1e6 / repeat
+
+
+if __name__ == "__main__":
+    weeks = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    skeleton = synthetic_skeleton(weeks)
+    cells = len(GRID_STARTS) * len(GRID_CYCLES)
+    print(f"{weeks} weeks: {len(skeleton)} skeleton segments; grid {cells} cells")
+    print(f"{'rule set':16} {'events':>6} {'µs/plan':>9} {'ns/seg':>7} {'grid µs':>9}")
+
+    for name in RULE_SETS:
+        rules = get_rule_set(name)
+        result, plan_us = timed(
+            HosRulesHandler.execute, repeat, skeleton, 30.0, START, None, rules
+        )
+        segments = result["segments"]
+        grid, grid_us = timed(
+            HosGridSimulator.execute,
+            repeat,
+            skeleton,
+            GRID_STARTS,
+            GRID_CYCLES,
+            rules,
+        )
+        cell = grid["arrivals"][0][GRID_CYCLES.index(30.0)]
+        assert cell == segments[-1].end, "grid and plan differ"
+        print(
+            f"{name:16} {len(rules.events):6d} {plan_us:9.1f} "
+            f"{plan_us * 1000 / len(segments):7.0f} {grid_us:9.1f}"
+        )
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""Benchmark HOS → daily logs with Segment records vs ISO-string dicts.
+
+The legacy path is the previous contract between the stages: HOS emits
+dicts with ISO strings and the log generator parses every segment back for
+every day. The typed path keeps aware datetimes in Segment records and
+serializes once at the end. Both produce identical JSON; memory figures are
+what each representation holds between the stages (before serialization).
+
+Usage: python benchmarks/bench_segment_pipeline.py [weeks] [repeat]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import EldLogGenerator, HosRulesHandler
+from app.handlers.segments import serialize_daily_logs, serialize_segments
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+
+
+def synthetic_skeleton(weeks):
+    # Regional hauling: 5 h legs with 1 h stops, roughly 20 h of skeleton/day
+    skeleton = []
+    for index in range(weeks * 7 * 3):
+        skeleton.append(
+            {
+                "status": "D",
+                "duration_hours": 5.0,
+                "miles": 300.0,
+                "note": f"Leg {index}",
+            }
+        )
+        skeleton.append(
+            {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Stop (1 hour)"}
+        )
+    return skeleton
+
+
+def legacy_daily_logs(segments):
+    """Previous EldLogGenerator loop: parses each ISO segment once per day."""
+    parse = datetime.fromisoformat
+    first = parse(segments[0]["start_datetime"].replace("Z", "+00:00"))
+    last = parse(segments[-1]["end_datetime"].replace("Z", "+00:00"))
+    logs = []
+    current = first.date()
+    while current <= last.date():
+        day_start = datetime.combine(current, datetime.min.time(), tzinfo=timezone.utc)
+        day_end = day_start + timedelta(days=1)
+        clipped, totals, miles, remarks = (
+            [],
+            dict.fromkeys(("OFF_hours", "SB_hours", "D_hours", "ON_hours"), 0.0),
+            0.0,
+            set(),
+        )
+        for seg in segments:
+            seg_start = parse(seg["start_datetime"].replace("Z", "+00:00"))
+            seg_end = parse(seg["end_datetime"].replace("Z", "+00:00"))
+            if seg_end <= day_start or seg_start >= day_end:
+                continue
+            start, end = max(seg_start, day_start), min(seg_end, day_end)
+            hours = (end - start).total_seconds() / 3600.0
+            full = (seg_end - seg_start).total_seconds()
+            seg_miles = seg["miles"] * (hours / (full / 3600.0) if full > 0 else 0)
+            clipped.append(
+                {
+                    "start_datetime": start.isoformat(),
+                    "end_datetime": end.isoformat(),
+                    "status": seg["status"],
+                    "miles": seg_miles,
+                    "note": seg["note"],
+                }
+            )
+            totals[f"{seg['status']}_hours"] += hours
+            miles += seg_miles
+            if seg["note"]:
+                remarks.add(seg["note"])
+        total = sum(totals.values())
+        if total > 24:
+            totals = {k: v * 24.0 / total for k, v in totals.items()}
+        logs.append(
+            {
+                "date": current.isoformat(),
+                "segments": clipped,
+                "totals": {k: round(v, 2) for k, v in totals.items()},
+                "miles": round(miles, 2),
+                "remarks": sorted(remarks),
+            }
+        )
+        current += timedelta(days=1)
+    return logs
+
+
+def legacy_stages(skeleton):
+    segments = serialize_segments(
+        HosRulesHandler.execute(skeleton, 0, START)["segments"]
+    )
+    return segments, legacy_daily_logs(segments)
+
+
+def typed_stages(skeleton):
+    segments = HosRulesHandler.execute(skeleton, 0, START)["segments"]
+    return segments, EldLogGenerator.execute(segments)
+
+
+def typed_response(stages):
+    segments, daily_logs = stages
+    return serialize_segments(segments), serialize_daily_logs(daily_logs)
+
+
+def measure(stages, response, skeleton, repeat):
+    """(response, ms per plan, KiB held between stages, allocated blocks)."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = response(stages(skeleton))
+    elapsed_ms = (time.perf_counter() - started) * 1000.0 / repeat
+
+    tracemalloc.start()
+    held = stages(skeleton)
+    held_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+
+    blocks_before = sys.getallocatedblocks()
+    held = stages(skeleton)
+    blocks = sys.getallocatedblocks() - blocks_before
+    return result, elapsed_ms, held_bytes / 1024, blocks
+
+
+if __name__ == "__main__":
+    weeks = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    skeleton = synthetic_skeleton(weeks)
+
+    legacy = measure(legacy_stages, lambda stages: stages, skeleton, repeat)
+    typed = measure(typed_stages, typed_response, skeleton, repeat)
+    assert json.dumps(legacy[0]) == json.dumps(typed[0]), "outputs differ"
+
+    segments, days = len(typed[0][0]), len(typed[0][1])
+    print(f"{weeks} weeks: {segments} segments, {days} days")
+    print(f"ISO parses between stages: {2 * (segments * days + 1)} → 0")
+    for name, (_, ms, kib, blocks) in (("iso dicts", legacy), ("segments", typed)):
+        print(f"{name:10} {ms:9.2f} ms/plan  {kib:7.0f} KiB  {blocks:7d} live blocks")
+    print(f"speedup: {legacy[1] / typed[1]:.1f}x (identical output)")
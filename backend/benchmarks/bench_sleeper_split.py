@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Benchmark the sleeper-berth split search against the standard plan.
+
+Plans a fixed set of synthetic long-haul trips with HosRulesHandler
+(10-hour resets only), then with SleeperSplitPlanner at several expansion
+budgets. Reports trip hours saved and milliseconds per plan; a split plan
+must never arrive later than the standard one.
+
+Usage: python benchmarks/bench_sleeper_split.py [trips] [seed]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import HosRulesHandler, SleeperSplitPlanner
+
+START = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+BUDGETS = (50, 200, 500, 2000)
+
+
+def synthetic_trips(count, seed):
+    """Drive legs of 0.5–30 h at 55 mph with 0.5–5 h pickups/dropoffs."""
+    rng = random.Random(seed)
+    trips = []
+    for _ in range(count):
+        skeleton = []
+        for _ in range(rng.randint(2, 6)):
+            if rng.random() < 0.7:
+                hours = rng.uniform(0.5, 30.0)
+                skeleton.append(
+                    {"status": "D", "duration_hours": hours, "miles": hours * 55.0}
+                )
+            else:
+                hours = rng.uniform(0.5, 5.0)
+                skeleton.append({"status": "ON", "duration_hours": hours, "miles": 0})
+        trips.append((skeleton, rng.uniform(0.0, 40.0)))
+    return trips
+
+
+def arrivals(planner, trips, **kwargs):
+    started = time.perf_counter()
+    result = [
+        planner(skeleton, cycle, START, **kwargs)["segments"][-1].end
+        for skeleton, cycle in trips
+    ]
+    return result, (time.perf_counter() - started) * 1000.0 / len(trips)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    trips = synthetic_trips(count, seed)
+
+    standard, standard_ms = arrivals(HosRulesHandler.execute, trips)
+    print(f"{count} trips")
+    print(f"{'planner':18} {'h saved':>8} {'improved':>8} {'ms/plan':>8}")
+    print(f"{'standard':18} {0.0:8.1f} {0:8d} {standard_ms:8.2f}")
+    for budget in BUDGETS:
+        split, split_ms = arrivals(
+            SleeperSplitPlanner.execute, trips, max_expansions=budget
+        )
+        assert all(a <= b for a, b in zip(split, standard)), "split plan slower"
+        saved = sum((b - a) / HOUR for a, b in zip(split, standard))
+        improved = sum(a < b for a, b in zip(split, standard))
+        print(f"{f'split ({budget})':18} {saved:8.1f} {improved:8d} {split_ms:8.2f}")
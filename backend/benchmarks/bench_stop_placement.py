@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Benchmark placing stops by distance along a route polyline.
+
+Compares rebuilding the cumulative-distance array for every lookup with one
+RouteIndex per plan (one build, then a binary search per point; the build is
+included in its time) on synthetic polylines of growing size. Positions
+are checked against a plain linear walk along the vertices.
+
+Usage: python benchmarks/bench_stop_placement.py [lookups]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers.geometry import (
+    RouteIndex,
+    cumulative_distances_m,
+    points_at_distances,
+)
+
+TOLERANCE = 1e-9
+
+
+def synthetic_route(points, rng):
+    """A wandering NY → LA-like line with `points` vertices."""
+    lng, lat = -74.0, 40.7
+    coords = [[lng, lat]]
+    for _ in range(points - 1):
+        lng -= rng.uniform(0.0, 88.0 / points)
+        lat += rng.uniform(-6.0, 6.0) / points
+        coords.append([lng, lat])
+    return coords
+
+
+def linear_walk(coords, cumulative, distance):
+    for index in range(1, len(coords)):
+        if cumulative[index] >= distance:
+            span = cumulative[index] - cumulative[index - 1]
+            t = (distance - cumulative[index - 1]) / span if span > 0 else 0.0
+            (lng0, lat0), (lng1, lat1) = coords[index - 1], coords[index]
+            return [lng0 + (lng1 - lng0) * t, lat0 + (lat1 - lat0) * t]
+    return list(coords[-1])
+
+
+if __name__ == "__main__":
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(11)
+    print(f"{'points':>8} {'rebuild µs':>11} {'indexed µs':>11} {'speedup':>8}")
+    for points in (1_000, 10_000, 100_000):
+        coords = synthetic_route(points, rng)
+        fractions = [rng.random() for _ in range(lookups)]
+
+        started = time.perf_counter()
+        for frac in fractions:
+            cumulative = cumulative_distances_m(coords)
+            points_at_distances(coords, cumulative, [cumulative[-1] * frac])
+        rebuild_us = (time.perf_counter() - started) * 1e6 / lookups
+
+        started = time.perf_counter()
+        index = RouteIndex(coords)
+        for frac in fractions:
+            placed = index.points_at_fractions([frac])[0]
+        indexed_us = (time.perf_counter() - started) * 1e6 / lookups
+
+        cumulative = index.cumulative_m.tolist()
+        for frac in fractions[:20]:
+            expected = linear_walk(coords, cumulative, frac * index.length_m)
+            placed = index.points_at_fractions([frac])[0]
+            assert all(
+                math.isclose(a, b, abs_tol=TOLERANCE) for a, b in zip(placed, expected)
+            ), "position mismatch"
+
+        print(
+            f"{points:8d} {rebuild_us:11.1f} {indexed_us:11.1f} "
+            f"{rebuild_us / indexed_us:7.0f}x"
+        )
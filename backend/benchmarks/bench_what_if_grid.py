@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""Benchmark what-if HOS: vectorized grid vs one simulation per cell.
+
+Evaluates a cross-country skeleton for departures every 30 minutes over a
+day × every whole cycle-hours value 0–70. The loop baseline runs
+HosRulesHandler once per cell (what a client calling plan_trip per variant
+pays for HOS alone); HosGridSimulator simulates each cycle-hours column
+once in one NumPy pass and shifts it to every departure. Arrivals and
+break/reset/restart counts must match cell for cell.
+
+Usage: python benchmarks/bench_what_if_grid.py [starts] [repeat]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from app.handlers import HosGridSimulator, HosRulesHandler
+
+SKELETON = [
+    {"status": "D", "duration_hours": 9.5, "miles": 560.0, "note": "Start → Pickup"},
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Pickup (1 hour)"},
+    {"status": "D", "duration_hours": 4.0, "miles": 240.0, "note": "Leg 2"},
+    {"status": "OFF", "duration_hours": 10.0, "miles": 0, "note": "Overnight"},
+    {"status": "D", "duration_hours": 11.0, "miles": 650.0, "note": "Leg 3"},
+    {"status": "D", "duration_hours": 3.0, "miles": 180.0, "note": "Leg 4"},
+    {"status": "ON", "duration_hours": 1.0, "miles": 0, "note": "Dropoff (1 hour)"},
+]
+BREAK, RESTART = "30-min break (8-hour rule)", "34-hour cycle restart (70-hour limit)"
+
+
+def loop_grid(starts, cycles):
+    """[row][column] of (arrival, breaks, resets, restarts) via HosRulesHandler."""
+    grid = []
+    for start in starts:
+        row = []
+        for cycle in cycles:
+            segments = HosRulesHandler.execute(SKELETON, cycle, start)["segments"]
+            notes = [seg.note for seg in segments]
+            row.append(
+                (
+                    segments[-1].end,
+                    notes.count(BREAK),
+                    sum(note.startswith("10-hour reset") for note in notes),
+                    notes.count(RESTART),
+                )
+            )
+        grid.append(row)
+    return grid
+
+
+def vector_grid(starts, cycles):
+    result = HosGridSimulator.execute(SKELETON, starts, cycles)
+    counts = zip(
+        result["breaks"].tolist(),
+        result["resets"].tolist(),
+        result["restarts"].tolist(),
+    )
+    return [
+        list(zip(arrivals, *row_counts))
+        for arrivals, row_counts in zip(result["arrivals"], counts)
+    ]
+
+
+def measure(func, starts, cycles, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        grid = func(starts, cycles)
+    return grid, (time.perf_counter() - started) * 1000.0 / repeat
+
+
+if __name__ == "__main__":
+    n_starts = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    base = datetime(2025, 1, 15, tzinfo=timezone.utc)
+    starts = [base + timedelta(minutes=30 * index) for index in range(n_starts)]
+    cycles = [float(hours) for hours in range(71)]
+
+    loop = measure(loop_grid, starts, cycles, repeat)
+    vector = measure(vector_grid, starts, cycles, repeat)
+    assert loop[0] == vector[0], "grids differ"
+
+    print(f"{n_starts} starts × {len(cycles)} cycle values = {n_starts * 71} cells")
+    for name, (_, ms) in (("per-cell", loop), ("vectorized", vector)):
+        print(f"{name:10} {ms:9.2f} ms")
+    print(f"speedup: {loop[1] / vector[1]:.1f}x (identical grid)")
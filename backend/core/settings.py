@@ -147,11 +147,14 @@ CORS_ALLOW_HEADERS = [
     "authorization",
     "content-type",
     "dnt",
+    "if-none-match",
     "origin",
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
 ]
+# Plan responses carry an ETag the app sends back as If-None-Match
+CORS_EXPOSE_HEADERS = ["etag"]
 
 # REST Framework Settings
 
@@ -162,6 +165,190 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Upstream services (OSRM routing, Open-Meteo weather)
+
+OSRM_BASE_URL = os.environ.get(
+    "OSRM_BASE_URL", "https://router.project-osrm.org/route/v1/driving"
+)
+OPEN_METEO_BASE_URL = os.environ.get(
+    "OPEN_METEO_BASE_URL", "https://api.open-meteo.com/v1/forecast"
+)
+
+# Routing provider: "osrm" (HTTP) or "local" (in-process graph loaded from
+# LOCAL_ROUTING_GRAPH, a road GeoJSON export or a compiled .npz)
+ROUTING_PROVIDER = os.environ.get("ROUTING_PROVIDER", "osrm")
+LOCAL_ROUTING_GRAPH = os.environ.get("LOCAL_ROUTING_GRAPH", "")
+
+# Facility dataset (truck stops, fuel, rest areas) that rest and fuel stops
+# snap to: CSV, GeoJSON points or a compiled .npy (manage.py
+# build_facility_index). Empty leaves stops on the route line.
+FACILITIES_DATASET = os.environ.get("FACILITIES_DATASET", "")
+FACILITY_SNAP = {
+    # Max distance from the route to a facility
+    "MAX_DETOUR_MILES": float(os.environ.get("FACILITY_MAX_DETOUR_MILES", "3")),
+    # How far back along the route a stop may move to reach one
+    "WINDOW_MILES": float(os.environ.get("FACILITY_WINDOW_MILES", "25")),
+}
+
+UPSTREAM_HTTP = {
+    "POOL_CONNECTIONS": int(os.environ.get("UPSTREAM_POOL_CONNECTIONS", "10")),
+    "POOL_MAXSIZE": int(os.environ.get("UPSTREAM_POOL_MAXSIZE", "20")),
+    "MAX_RETRIES": int(os.environ.get("UPSTREAM_MAX_RETRIES", "2")),
+    "BACKOFF_BASE_SECONDS": float(os.environ.get("UPSTREAM_BACKOFF_BASE", "0.2")),
+    "BACKOFF_MAX_SECONDS": float(os.environ.get("UPSTREAM_BACKOFF_MAX", "2.0")),
+    "BREAKER_FAILURE_THRESHOLD": int(os.environ.get("UPSTREAM_BREAKER_FAILURES", "5")),
+    "BREAKER_RESET_SECONDS": float(os.environ.get("UPSTREAM_BREAKER_RESET", "30")),
+}
+
+# Plan fan-out: route + weather lookups run concurrently under one deadline
+PLAN_UPSTREAM_WORKERS = int(os.environ.get("PLAN_UPSTREAM_WORKERS", "16"))
+PLAN_UPSTREAM_DEADLINE_SECONDS = float(
+    os.environ.get("PLAN_UPSTREAM_DEADLINE_SECONDS", "12")
+)
+
+# Batch planning: max items per request; HOS/log worker processes
+# (unset = one per CPU)
+PLAN_BATCH_MAX_ITEMS = int(os.environ.get("PLAN_BATCH_MAX_ITEMS", "500"))
+PLAN_BATCH_PROCESSES = (
+    int(os.environ["PLAN_BATCH_PROCESSES"])
+    if os.environ.get("PLAN_BATCH_PROCESSES")
+    else None
+)
+
+# What-if grid: max start_datetimes × current_cycle_used_hours cells
+PLAN_WHAT_IF_MAX_CELLS = int(os.environ.get("PLAN_WHAT_IF_MAX_CELLS", "10000"))
+
+# Sleeper-berth split search (sleeper_berth_split=true): decision states
+# expanded per plan, bounding its cost (each costs a partial simulation)
+HOS_SPLIT_MAX_EXPANSIONS = int(os.environ.get("HOS_SPLIT_MAX_EXPANSIONS", "500"))
+
+# Caches
+# The route, weather and plan caches default to byte-bounded in-process LRUs;
+# set ROUTE_CACHE_REDIS_URL / WEATHER_CACHE_REDIS_URL / PLAN_STORE_REDIS_URL /
+# PLAN_CACHE_REDIS_URL to share them across workers in production.
+
+_route_cache_redis_url = os.environ.get("ROUTE_CACHE_REDIS_URL")
+_weather_cache_redis_url = os.environ.get("WEATHER_CACHE_REDIS_URL")
+_plan_store_redis_url = os.environ.get("PLAN_STORE_REDIS_URL")
+_plan_cache_redis_url = os.environ.get("PLAN_CACHE_REDIS_URL")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "routes": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": _route_cache_redis_url,
+            "TIMEOUT": int(os.environ.get("ROUTE_CACHE_TTL", "21600")),
+        }
+        if _route_cache_redis_url
+        else {
+            "BACKEND": "app.caching.ByteBoundedLocMemCache",
+            "LOCATION": "routes",
+            "TIMEOUT": int(os.environ.get("ROUTE_CACHE_TTL", "21600")),
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.environ.get("ROUTE_CACHE_MAX_ENTRIES", "2000")),
+                "MAX_BYTES": int(
+                    os.environ.get("ROUTE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+                ),
+            },
+        }
+    ),
+    # Entry TTLs are set per key to the end of their time bucket
+    "weather": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": _weather_cache_redis_url,
+        }
+        if _weather_cache_redis_url
+        else {
+            "BACKEND": "app.caching.ByteBoundedLocMemCache",
+            "LOCATION": "weather",
+            "OPTIONS": {
+                "MAX_ENTRIES": int(
+                    os.environ.get("WEATHER_CACHE_MAX_ENTRIES", "20000")
+                ),
+                "MAX_BYTES": int(
+                    os.environ.get("WEATHER_CACHE_MAX_BYTES", str(8 * 1024 * 1024))
+                ),
+            },
+        }
+    ),
+    # Stored plans for position-at-time lookups (GET .../plan/<id>/positions)
+    "plans": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": _plan_store_redis_url,
+            "TIMEOUT": int(os.environ.get("PLAN_STORE_TTL", "86400")),
+        }
+        if _plan_store_redis_url
+        else {
+            "BACKEND": "app.caching.ByteBoundedLocMemCache",
+            "LOCATION": "plans",
+            "TIMEOUT": int(os.environ.get("PLAN_STORE_TTL", "86400")),
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.environ.get("PLAN_STORE_MAX_ENTRIES", "5000")),
+                "MAX_BYTES": int(
+                    os.environ.get("PLAN_STORE_MAX_BYTES", str(64 * 1024 * 1024))
+                ),
+            },
+        }
+    ),
+    # Full /api/trips/plan responses; short TTL keeps current weather fresh
+    "plan_responses": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": _plan_cache_redis_url,
+            "TIMEOUT": int(os.environ.get("PLAN_CACHE_TTL", "300")),
+        }
+        if _plan_cache_redis_url
+        else {
+            "BACKEND": "app.caching.ByteBoundedLocMemCache",
+            "LOCATION": "plan_responses",
+            "TIMEOUT": int(os.environ.get("PLAN_CACHE_TTL", "300")),
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.environ.get("PLAN_CACHE_MAX_ENTRIES", "500")),
+                "MAX_BYTES": int(
+                    os.environ.get("PLAN_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+                ),
+            },
+        }
+    ),
+}
+
+ROUTE_CACHE = {
+    "ENABLED": os.environ.get("ROUTE_CACHE_ENABLED", "True") == "True",
+    "ALIAS": "routes",
+    "PRECISION": int(os.environ.get("ROUTE_CACHE_PRECISION", "3")),
+}
+
+WEATHER_CACHE = {
+    "ENABLED": os.environ.get("WEATHER_CACHE_ENABLED", "True") == "True",
+    "ALIAS": "weather",
+    "TILE_DEGREES": float(os.environ.get("WEATHER_CACHE_TILE_DEGREES", "0.1")),
+    "BUCKET_SECONDS": int(os.environ.get("WEATHER_CACHE_BUCKET_SECONDS", "900")),
+}
+
+# INDEX_CACHE_MAX_BYTES: memory for built position indexes kept per process
+PLAN_STORE = {
+    "ENABLED": os.environ.get("PLAN_STORE_ENABLED", "True") == "True",
+    "ALIAS": "plans",
+    "INDEX_CACHE_MAX_BYTES": int(
+        os.environ.get("PLAN_STORE_INDEX_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    ),
+}
+
+PLAN_CACHE = {
+    "ENABLED": os.environ.get("PLAN_CACHE_ENABLED", "True") == "True",
+    "ALIAS": "plan_responses",
+    "COORD_PRECISION": int(os.environ.get("PLAN_CACHE_COORD_PRECISION", "5")),
+    "HOURS_PRECISION": int(os.environ.get("PLAN_CACHE_HOURS_PRECISION", "2")),
+}
+
+# Position lookups: max times per request
+PLAN_POSITIONS_MAX_TIMES = int(os.environ.get("PLAN_POSITIONS_MAX_TIMES", "10000"))
+
 # drf-spectacular / OpenAPI
 
 SPECTACULAR_SETTINGS = {